@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Drive a large batch through AsyncMaveDigitalUploader and the threaded pipeline for comparison"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader.mave_async import AsyncMaveDigitalUploader  # noqa: E402
+from podcast_loader import MaveDigitalUploader, PollPolicy  # noqa: E402
+
+
+def make_episodes(audio_files):
+    return [{'audio_file': path, 'title': os.path.basename(path), 'description': ''} for path in audio_files]
+
+
+async def run_async(base_url, audio_files, concurrency, poll_policy):
+    uploader = AsyncMaveDigitalUploader()
+    uploader.base_url = base_url
+    uploader.poll_policy = poll_policy
+    await uploader.login('bench@example.com', 'password')
+    episodes = make_episodes(audio_files)
+    await uploader.process_episodes('podcast', episodes, concurrency=concurrency)
+    await uploader.close()
+    return episodes
+
+
+def run_threads(base_url, audio_files, concurrency, poll_policy):
+    uploader = MaveDigitalUploader()
+    uploader.base_url = base_url
+    uploader.poll_policy = poll_policy
+    uploader.login('bench@example.com', 'password')
+    episodes = make_episodes(audio_files)
+    uploader.process_episodes('podcast', episodes, concurrency=concurrency)
+    return episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the asyncio uploader')
+    parser.add_argument('--files', type=int, default=200, help='Number of episodes in the batch')
+    parser.add_argument('--size-mb', type=float, default=0.5, help='Size of each audio file in MB')
+    parser.add_argument('--latency', type=float, default=0.1, help='Artificial latency per request in seconds')
+    parser.add_argument('--processing-delay', type=float, default=1.0,
+                        help='Seconds the mock server takes to process each upload')
+    parser.add_argument('--concurrency', type=int, default=50, help='Uploads in flight at once')
+    args = parser.parse_args()
+
+    server = MockMaveServer(latency=args.latency, processing_delay=args.processing_delay).start()
+    poll_policy = PollPolicy(base_delay=0.5, max_delay=2)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_files = []
+        for i in range(args.files):
+            path = os.path.join(tmp_dir, f'episode{i:04d}.mp3')
+            with open(path, 'wb') as f:
+                f.truncate(int(args.size_mb * 1024 ** 2))
+            audio_files.append(path)
+
+        print(f"{args.files} episodes, concurrency={args.concurrency}, {args.latency:g} s latency")
+        for name in ('asyncio', 'threads'):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if name == 'asyncio':
+                    episodes = asyncio.run(run_async(server.base_url, audio_files, args.concurrency, poll_policy))
+                else:
+                    episodes = run_threads(server.base_url, audio_files, args.concurrency, poll_policy)
+            elapsed = time.perf_counter() - started
+            published = sum(1 for episode in episodes if episode['status'] == 'published')
+            print(f"{name:<8} published={published:<5} wall time={elapsed:.2f} s")
+
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
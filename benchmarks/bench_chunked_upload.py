@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Compare single-request and chunked uploads while the mock server drops connections mid-upload"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader import MaveDigitalUploader  # noqa: E402
+
+
+def run_upload(audio_path, chunked, chunk_size, reset_every_mb, retries):
+    """Upload one file, retrying a failed single-request upload from scratch like a user would"""
+    server = MockMaveServer(reset_every_mb=reset_every_mb).start()
+    uploader = MaveDigitalUploader()
+    uploader.base_url = server.base_url
+    uploader.chunked_upload = chunked
+    uploader.chunk_size = chunk_size
+    uploader.chunk_retries = retries
+
+    succeeded = False
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploader.login('bench@example.com', 'password')
+        # Chunked uploads retry internally; whole-file uploads get the same number of attempts
+        for _ in range(1 if chunked else retries + 1):
+            try:
+                uploader.upload_audio('podcast', audio_path, wait_for_processing=False)
+                succeeded = True
+                break
+            except Exception:
+                continue
+    elapsed = time.perf_counter() - started
+
+    server.stop()
+    return succeeded, elapsed, server.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chunked uploads under injected connection resets')
+    parser.add_argument('--size-mb', type=float, default=256, help='Size of the audio file in MB')
+    parser.add_argument('--chunk-mb', type=float, default=8, help='Chunk size in MB')
+    parser.add_argument('--reset-every-mb', default='0,1024,256,64',
+                        help='Comma-separated mean MB uploaded between connection resets (0 for none)')
+    parser.add_argument('--retries', type=int, default=5, help='Retries per chunk / whole-file attempts')
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 ** 2)
+    chunk_size = int(args.chunk_mb * 1024 ** 2)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_path = os.path.join(tmp_dir, 'episode.mp3')
+        with open(audio_path, 'wb') as f:
+            f.truncate(size)
+
+        print(f"File size {args.size_mb:.0f} MB, chunk size {args.chunk_mb:.0f} MB")
+        for reset_every_mb in (float(mb) for mb in args.reset_every_mb.split(',')):
+            for name, chunked in [('single request', False), ('chunked', True)]:
+                succeeded, elapsed, stats = run_upload(audio_path, chunked, chunk_size, reset_every_mb, args.retries)
+                sent_mb = stats['bytes_received'] / 1024 ** 2
+                print(f"reset every {reset_every_mb:>6.0f} MB  {name:<15} {'ok' if succeeded else 'FAILED':<7} "
+                      f"wall time={elapsed:6.2f} s  received={sent_mb:7.0f} MB "
+                      f"({sent_mb / args.size_mb:.2f}x)  resets={stats['resets']}")
+
+
+if __name__ == '__main__':
+    main()
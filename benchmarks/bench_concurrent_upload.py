@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Compare batch upload wall time at different --concurrency levels against the mock server"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader import MaveDigitalUploader  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent batch uploads')
+    parser.add_argument('--files', type=int, default=20, help='Number of audio files in the batch')
+    parser.add_argument('--size-mb', type=float, default=8, help='Size of each audio file in MB')
+    parser.add_argument('--latency', type=float, default=0.2, help='Artificial latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Concurrency levels to compare')
+    args = parser.parse_args()
+
+    server = MockMaveServer(latency=args.latency).start()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_files = []
+        for i in range(args.files):
+            path = os.path.join(tmp_dir, f'episode{i:03d}.mp3')
+            with open(path, 'wb') as f:
+                f.truncate(int(args.size_mb * 1024 ** 2))
+            audio_files.append(path)
+
+        uploader = MaveDigitalUploader()
+        uploader.base_url = server.base_url
+        with contextlib.redirect_stdout(io.StringIO()):
+            uploader.login('bench@example.com', 'password')
+
+        print(f"{args.files} files x {args.size_mb:g} MB, {args.latency:g} s latency per request")
+        for concurrency in args.concurrency:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                episode_ids = uploader.upload_multiple_audios('podcast', audio_files, concurrency=concurrency)
+            elapsed = time.perf_counter() - started
+            print(f"concurrency={concurrency:<3} uploaded={len(episode_ids):<4} wall time={elapsed:.2f} s")
+
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
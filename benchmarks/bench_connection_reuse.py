@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Count TCP connections opened per batch with the pooled transport and with a plain urllib opener"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader import MaveDigitalUploader, PollPolicy  # noqa: E402
+
+
+def run_batch(transport, audio_files, concurrency, processing_delay):
+    server = MockMaveServer(processing_delay=processing_delay).start()
+    uploader = MaveDigitalUploader()
+    uploader.base_url = server.base_url
+    uploader.poll_policy = PollPolicy(base_delay=0.1, max_delay=0.5)
+    if transport is not None:
+        uploader.transport = transport
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploader.login('bench@example.com', 'password')
+        episodes = [{'audio_file': path, 'title': os.path.basename(path), 'description': ''} for path in audio_files]
+        uploader.process_episodes('podcast', episodes, concurrency=concurrency)
+    elapsed = time.perf_counter() - started
+
+    server.stop()
+    return server.stats, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTTP connection reuse')
+    parser.add_argument('--files', type=int, default=20, help='Number of episodes in the batch')
+    parser.add_argument('--size-mb', type=float, default=1, help='Size of each audio file in MB')
+    parser.add_argument('--concurrency', type=int, default=4, help='Upload workers')
+    parser.add_argument('--processing-delay', type=float, default=1.0,
+                        help='Seconds the mock server takes to process each upload')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_files = []
+        for i in range(args.files):
+            path = os.path.join(tmp_dir, f'episode{i:03d}.mp3')
+            with open(path, 'wb') as f:
+                f.truncate(int(args.size_mb * 1024 ** 2))
+            audio_files.append(path)
+
+        print(f"{args.files} episodes, concurrency={args.concurrency}")
+        for name, transport in [('urllib opener', urllib.request.build_opener()), ('connection pool', None)]:
+            stats, elapsed = run_batch(transport, audio_files, args.concurrency, args.processing_delay)
+            print(f"{name:<16} connections={stats['connections']:<5} requests={stats['requests']:<5} "
+                  f"wall time={elapsed:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Time the pre-flight check and the delay before the first episode reaches the pipeline for a large manifest"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from podcast_loader.episode_manifest import read_manifest, validate_manifest  # noqa: E402
+
+
+def load_all(path):
+    # What the CSV mode did before manifests were streamed: parse every row up front
+    return list(read_manifest(path))
+
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms   peak memory {peak / 1024 ** 2:6.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark manifest validation and streaming')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows in the generated manifest')
+    parser.add_argument('--files', type=int, default=100, help='Distinct audio files referenced by the rows')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_files = []
+        for i in range(args.files):
+            path = os.path.join(tmp_dir, f'episode{i:03d}.mp3')
+            with open(path, 'wb') as f:
+                f.truncate(1024)
+            audio_files.append(path)
+
+        manifest = os.path.join(tmp_dir, 'episodes.csv')
+        with open(manifest, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['audio_file', 'title', 'description', 'season', 'number', 'is_explicit', 'is_private'])
+            for i in range(args.rows):
+                writer.writerow([audio_files[i % args.files], f'Episode {i}', 'Description ' * 20,
+                                 1 + i // 100, 1 + i % 100, 'false', 'false'])
+
+        print(f"{args.rows} rows, {os.path.getsize(manifest) / 1024 ** 2:.1f} MB manifest")
+        measure('pre-flight check', lambda: validate_manifest(manifest))
+        measure('load whole manifest', lambda: load_all(manifest))
+        measure('first streamed episode', lambda: next(read_manifest(manifest)))
+        measure('stream every episode', lambda: sum(1 for _ in read_manifest(manifest)))
+
+
+if __name__ == '__main__':
+    main()
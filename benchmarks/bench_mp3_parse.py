@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Parse synthetic multi-hour MP3 files and record the time and peak memory per check"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from podcast_loader.mp3_info import check_mp3, parse_mp3  # noqa: E402
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo; bit 9 adds a padding byte
+FRAME_HEADER = 0xFFFB9040
+FRAME_SAMPLES = 1152
+SAMPLE_RATE = 44100
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak /= 1024
+    return peak / 1024
+
+
+def private_mb():
+    """Resident memory that is not file pages of the mapping (Linux only), or None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('RssAnon:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def frame(padding):
+    return (FRAME_HEADER | padding << 9).to_bytes(4, 'big') + bytes(417 + padding - 4)
+
+
+def id3_tag():
+    """ID3v2.3 tag with the frames that can fill in episode metadata"""
+    def text_frame(frame_id, body):
+        return frame_id + len(body).to_bytes(4, 'big') + b'\0\0' + body
+
+    frames = (text_frame(b'TIT2', b'\x03Synthetic episode')
+              + text_frame(b'TRCK', b'\x007/12')
+              + text_frame(b'TPOS', b'\x002')
+              + text_frame(b'COMM', b'\x01eng\xff\xfe\0\0' + 'Long recording'.encode('utf-16-le')))
+    size = len(frames)
+    syncsafe = bytes([(size >> 21) & 127, (size >> 14) & 127, (size >> 7) & 127, size & 127])
+    return b'ID3\x03\x00\x00' + syncsafe + frames
+
+
+def write_mp3(path, hours, info_header=True, cut=0):
+    """Write a constant bitrate stream of silent frames, optionally cut short by `cut` bytes"""
+    count = int(hours * 3600 * SAMPLE_RATE / FRAME_SAMPLES)
+    # 128 kbps at 44.1 kHz averages 417.96 bytes per frame: pad 47 of every 49 frames
+    block = b''.join(frame(0 if i % 49 in (0, 25) else 1) for i in range(49))
+    total = count // 49 * len(block)
+    with open(path, 'wb') as f:
+        f.write(id3_tag())
+        if info_header:
+            # Info (Xing for constant bitrate) header frame: frame count and byte count flags
+            first = bytearray(frame(0))
+            first[36:52] = b'Info' + (3).to_bytes(4, 'big') + (count // 49 * 49).to_bytes(4, 'big') \
+                + (total + len(first)).to_bytes(4, 'big')
+            f.write(first)
+        for _ in range(count // 49):
+            f.write(block)
+        if cut:
+            f.truncate(f.tell() - cut)
+    return count // 49 * 49
+
+
+def measure(name, path, **kwargs):
+    started = time.perf_counter()
+    info, problem = check_mp3(path, **kwargs)
+    elapsed = time.perf_counter() - started
+    # Peak RSS includes the mapped file pages, which the kernel can drop at any time
+    private = private_mb()
+    print(f"{name:<24} {elapsed * 1000:8.1f} ms  {info.duration / 3600:5.2f} h  {info.bitrate:4d} kbps  "
+          f"{info.frames:7d} frames  peak RSS {peak_rss_mb():6.1f} MB"
+          f"{f', private {private:.1f} MB' if private is not None else ''}  {problem or 'ok'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the MP3 frame and tag parser')
+    parser.add_argument('--hours', type=float, nargs='+', default=[1, 3, 6], help='Lengths of the test files')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'episode.mp3')
+        for hours in args.hours:
+            write_mp3(path, hours)
+            print(f"{hours:g} h file: {os.path.getsize(path) / 1024 ** 2:.0f} MB, tags {parse_mp3(path, scan=False).tags}")
+            measure('Info header', path)
+            measure('every frame (scan=True)', path, scan=True)
+            write_mp3(path, hours, info_header=False)
+            measure('no header, every frame', path)
+            write_mp3(path, hours, cut=100_000)
+            measure('truncated, Info header', path)
+            measure('truncated, every frame', path, scan=True)
+            print()
+
+
+if __name__ == '__main__':
+    main()
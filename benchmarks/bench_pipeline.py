@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Compare the old upload-then-wait flow with the staged upload/poll/publish pipeline"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader import MaveDigitalUploader  # noqa: E402
+
+
+def make_episodes(tmp_dir, count, size_mb):
+    episodes = []
+    for i in range(count):
+        path = os.path.join(tmp_dir, f'episode{i:03d}.mp3')
+        with open(path, 'wb') as f:
+            f.truncate(int(size_mb * 1024 ** 2))
+        episodes.append({'audio_file': path, 'title': f'Episode {i}', 'description': 'Benchmark episode'})
+    return episodes
+
+
+def run_sequential(uploader, episodes):
+    for episode in episodes:
+        episode_id = uploader.upload_audio('podcast', episode['audio_file'])
+        uploader.publish_episode(episode_id, episode['title'], episode['description'])
+
+
+def run_pipeline(uploader, episodes, concurrency):
+    uploader.process_episodes('podcast', episodes, concurrency=concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the staged upload pipeline')
+    parser.add_argument('--files', type=int, default=5, help='Number of episodes in the batch')
+    parser.add_argument('--size-mb', type=float, default=8, help='Size of each audio file in MB')
+    parser.add_argument('--latency', type=float, default=0.3, help='Artificial latency per request in seconds')
+    parser.add_argument('--processing-delay', type=float, default=2.0,
+                        help='Seconds the mock server takes to process each upload')
+    parser.add_argument('--concurrency', type=int, default=1, help='Upload workers for the pipeline run')
+    parser.add_argument('--poll-rate', type=float, help='Maximum status requests per second for the pipeline run')
+    args = parser.parse_args()
+
+    server = MockMaveServer(latency=args.latency, processing_delay=args.processing_delay).start()
+    uploader = MaveDigitalUploader()
+    uploader.base_url = server.base_url
+    uploader.poll_rate_limit = args.poll_rate
+
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        uploader.login('bench@example.com', 'password')
+
+        started = time.perf_counter()
+        run_sequential(uploader, make_episodes(tmp_dir, args.files, args.size_mb))
+        sequential_time = time.perf_counter() - started
+        sequential_polls = server.stats['status_polls']
+
+        started = time.perf_counter()
+        run_pipeline(uploader, make_episodes(tmp_dir, args.files, args.size_mb), args.concurrency)
+        pipeline_time = time.perf_counter() - started
+        pipeline_polls = server.stats['status_polls'] - sequential_polls
+
+    server.stop()
+
+    print(f"{args.files} episodes, {args.latency:g} s latency, {args.processing_delay:g} s processing")
+    print(f"upload then wait:  {sequential_time:.2f} s, {sequential_polls / args.files:.1f} status polls per episode")
+    print(f"staged pipeline:   {pipeline_time:.2f} s, {pipeline_polls / args.files:.1f} status polls per episode "
+          f"(concurrency={args.concurrency})")
+    print(f"published:         {server.stats['publishes']}")
+
+
+if __name__ == '__main__':
+    main()
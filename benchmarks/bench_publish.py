@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Compare the time to (re-)publish a batch of existing episodes at different concurrency levels"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader import MaveDigitalUploader  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk publishing')
+    parser.add_argument('--episodes', type=int, default=200, help='Number of episodes to publish')
+    parser.add_argument('--latency', type=float, default=0.1, help='Artificial latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                        help='Concurrency levels to compare')
+    args = parser.parse_args()
+
+    server = MockMaveServer(latency=args.latency).start()
+    uploader = MaveDigitalUploader()
+    uploader.base_url = server.base_url
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploader.login('bench@example.com', 'password')
+
+    print(f"{args.episodes} episodes, {args.latency:g} s latency per request")
+    for concurrency in args.concurrency:
+        episodes = [{'episode_id': f'episode{i:04d}', 'title': f'Episode {i}', 'description': ''}
+                    for i in range(args.episodes)]
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = uploader.publish_episodes(episodes, concurrency=concurrency)
+        elapsed = time.perf_counter() - started
+        print(f"concurrency={concurrency:<3} published={len(report.published):<4} failed={len(report.failed):<4} "
+              f"wall time={elapsed:.2f} s")
+
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Run a batch against a rate-limited mock server with and without retries and client-side limiting"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader.mave_transport import TokenBucket  # noqa: E402
+from podcast_loader import MaveDigitalUploader, PollPolicy  # noqa: E402
+
+
+def run_batch(audio_files, concurrency, server_rate, max_retries, client_rate):
+    server = MockMaveServer(processing_delay=0.5, rate_limit=server_rate).start()
+    uploader = MaveDigitalUploader()
+    uploader.base_url = server.base_url
+    uploader.poll_policy = PollPolicy(base_delay=0.2, max_delay=1.0)
+    uploader.transport.policy.max_retries = max_retries
+    if client_rate:
+        uploader.transport.rate_limiter = TokenBucket(client_rate)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            uploader.login('bench@example.com', 'password')
+            episodes = [{'audio_file': path, 'title': os.path.basename(path), 'description': ''}
+                        for path in audio_files]
+            uploader.process_episodes('podcast', episodes, concurrency=concurrency)
+        except Exception:
+            episodes = []
+    elapsed = time.perf_counter() - started
+
+    server.stop()
+    published = sum(1 for episode in episodes if episode.get('status') == 'published')
+    return published, elapsed, server.stats, uploader.transport.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark retry and rate-limit handling')
+    parser.add_argument('--files', type=int, default=100, help='Number of episodes in the batch')
+    parser.add_argument('--size-mb', type=float, default=0.25, help='Size of each audio file in MB')
+    parser.add_argument('--concurrency', type=int, default=16, help='Upload workers')
+    parser.add_argument('--server-rate', type=float, default=40, help='Requests per second the mock server accepts')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_files = []
+        for i in range(args.files):
+            path = os.path.join(tmp_dir, f'episode{i:03d}.mp3')
+            with open(path, 'wb') as f:
+                f.truncate(int(args.size_mb * 1024 ** 2))
+            audio_files.append(path)
+
+        print(f"{args.files} episodes, concurrency={args.concurrency}, server limit {args.server_rate:g} req/s")
+        variants = [
+            ('no retries', 0, None),
+            ('retries', 5, None),
+            ('retries + client limit', 5, args.server_rate),
+        ]
+        for name, max_retries, client_rate in variants:
+            published, elapsed, server_stats, client_stats = run_batch(
+                audio_files, args.concurrency, args.server_rate, max_retries, client_rate)
+            print(f"{name:<23} published={published:<4} 429s={server_stats['throttled']:<5} "
+                  f"retries={client_stats['retries']:<5} limiter waits={client_stats['throttle_waits']:<5} "
+                  f"wall time={elapsed:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
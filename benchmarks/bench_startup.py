@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Time how long the command lines and the package take to start, best of several fresh interpreters"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ('python (no imports)', ['-c', 'pass']),
+    ('python -m podcast_loader --help', ['-m', 'podcast_loader', '--help']),
+    ('podcast_loader upload --help', ['-m', 'podcast_loader', 'upload', '--help']),
+    ('multiple_upload.py --help', ['multiple_upload.py', '--help']),
+    ('native_execution.py --help', ['native_execution.py', '--help']),
+    ('import podcast_loader', ['-c', 'import podcast_loader']),
+    ('construct MaveDigitalUploader', ['-c', 'from podcast_loader import MaveDigitalUploader; MaveDigitalUploader()']),
+]
+
+
+def best_of(command, runs):
+    best = float('inf')
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CLI and import startup time')
+    parser.add_argument('--runs', type=int, default=10, help='Interpreter starts per case; the fastest is reported')
+    args = parser.parse_args()
+
+    for label, command in CASES:
+        elapsed = best_of([sys.executable, *command], args.runs)
+        print(f"{label:<34} {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
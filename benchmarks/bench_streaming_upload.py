@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Upload a large sparse file to the local mock server and record peak memory"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak /= 1024
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming multipart upload memory usage')
+    parser.add_argument('--size-gb', type=float, default=2, help='Size of the sparse audio file in GB')
+    parser.add_argument('--script', choices=['multiple', 'native'], default='multiple',
+                        help='Which uploader implementation to benchmark')
+    args = parser.parse_args()
+
+    if args.script == 'native':
+        from native_execution import MaveDigitalUploader
+    else:
+        from podcast_loader import MaveDigitalUploader
+
+    server = MockMaveServer().start()
+    size = int(args.size_gb * 1024 ** 3)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_path = os.path.join(tmp_dir, 'episode.mp3')
+        with open(audio_path, 'wb') as f:
+            f.truncate(size)
+
+        uploader = MaveDigitalUploader()
+        uploader.base_url = server.base_url
+        uploader.login('bench@example.com', 'password')
+
+        rss_before = peak_rss_mb()
+        started = time.perf_counter()
+        uploader.upload_audio('podcast', audio_path)
+        elapsed = time.perf_counter() - started
+        rss_after = peak_rss_mb()
+
+    server.stop()
+
+    print(f"File size:        {size / 1024 ** 2:.0f} MB")
+    print(f"Bytes received:   {server.stats['bytes_received'] / 1024 ** 2:.0f} MB")
+    print(f"Wall time:        {elapsed:.2f} s ({size / 1024 ** 2 / elapsed:.0f} MB/s)")
+    print(f"Peak RSS before:  {rss_before:.1f} MB")
+    print(f"Peak RSS after:   {rss_after:.1f} MB")
+    print(f"Peak RSS growth:  {rss_after - rss_before:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
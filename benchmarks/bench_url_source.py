@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Upload a large file straight from a local HTTP server and from a pipe, and record peak memory"""
+import argparse
+import functools
+import http.server
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+from podcast_loader.audio_source import StdinSource, URLSource  # noqa: E402
+from podcast_loader import MaveDigitalUploader  # noqa: E402
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak /= 1024
+    return peak / 1024
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def feed_pipe(write_fd, size, chunk_size=1024 * 1024):
+    """Write `size` zero bytes into a pipe, as a producer process would"""
+    chunk = b'\0' * chunk_size
+    with os.fdopen(write_fd, 'wb') as pipe:
+        remaining = size
+        while remaining > 0:
+            remaining -= pipe.write(chunk[:min(chunk_size, remaining)])
+
+
+def measure(name, uploader, source, size, server):
+    received_before = server.stats['bytes_received']
+    started = time.perf_counter()
+    uploader.upload_audio('podcast', source, wait_for_processing=False)
+    elapsed = time.perf_counter() - started
+    received = server.stats['bytes_received'] - received_before
+    print(f"{name:<6} {received / 1024 ** 2:>8.0f} MB received in {elapsed:6.2f} s "
+          f"({size / 1024 ** 2 / elapsed:6.0f} MB/s), peak RSS so far {peak_rss_mb():.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark uploads streamed from a URL and from stdin')
+    parser.add_argument('--size-gb', type=float, default=2, help='Size of the audio file in GB')
+    args = parser.parse_args()
+
+    server = MockMaveServer().start()
+    size = int(args.size_gb * 1024 ** 3)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(os.path.join(tmp_dir, 'episode.mp3'), 'wb') as f:
+            f.truncate(size)
+        storage = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), functools.partial(QuietHandler, directory=tmp_dir))
+        threading.Thread(target=storage.serve_forever, daemon=True).start()
+
+        uploader = MaveDigitalUploader()
+        uploader.base_url = server.base_url
+        uploader.login('bench@example.com', 'password')
+        print(f"File size: {size / 1024 ** 2:.0f} MB, peak RSS before: {peak_rss_mb():.1f} MB")
+
+        url = f"http://127.0.0.1:{storage.server_address[1]}/episode.mp3"
+        measure('url', uploader, URLSource(url), size, server)
+
+        read_fd, write_fd = os.pipe()
+        threading.Thread(target=feed_pipe, args=(write_fd, size), daemon=True).start()
+        with os.fdopen(read_fd, 'rb') as pipe:
+            measure('stdin', uploader, StdinSource('episode.mp3', pipe), size, server)
+
+        storage.shutdown()
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
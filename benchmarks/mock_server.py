@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""Local stand-in for the mave.digital API used by the benchmarks.
+
+Run it on its own to point the scripts at it with --base-url:
+
+    python benchmarks/mock_server.py --port 8080 --latency 0.05 --bandwidth-mb 20 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import socket
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockMaveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY keep-alive responses stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _drain_body(self, may_reset=False):
+        """Read and discard the request body.
+
+        Returns (bytes received, whether the whole body arrived). With may_reset and a
+        server reset_every_mb, the connection is cut after a random, exponentially
+        distributed number of bytes, as a flaky network would.
+        """
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            return self._drain_chunked_body(), True
+
+        length = int(self.headers.get('Content-Length', 0))
+        remaining = length
+        if may_reset and self.server.reset_every_mb:
+            remaining = min(length, int(random.expovariate(1 / (self.server.reset_every_mb * 1024 * 1024))))
+        received = 0
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 256 * 1024))
+            if not chunk:
+                break
+            received += len(chunk)
+            remaining -= len(chunk)
+            self.server.throttle_bandwidth(len(chunk))
+
+        with self.server.lock:
+            self.server.stats['bytes_received'] += received
+        if received < length:
+            self._reset_connection()
+            return received, False
+        return received, True
+
+    def _drain_chunked_body(self):
+        """Read and discard a body sent with Transfer-Encoding: chunked; returns the bytes received"""
+        received = 0
+        while True:
+            size = int(self.rfile.readline().split(b';', 1)[0], 16)
+            if size == 0:
+                break
+            remaining = size
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, 256 * 1024))
+                if not chunk:
+                    raise ConnectionError("connection closed inside a chunk")
+                remaining -= len(chunk)
+                self.server.throttle_bandwidth(len(chunk))
+            self.rfile.readline()
+            received += size
+        # Trailer section, ended by an empty line
+        while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+            pass
+        with self.server.lock:
+            self.server.stats['bytes_received'] += received
+        return received
+
+    def _reset_connection(self):
+        """Drop the connection with a TCP RST and without sending a response"""
+        with self.server.lock:
+            self.server.stats['resets'] += 1
+        self.close_connection = True
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+
+    def _start_request(self):
+        """Count the request and apply latency; returns False if it was rejected with a 429 or 401"""
+        with self.server.lock:
+            self.server.stats['requests'] += 1
+            throttled = not self.server.take_rate_token()
+            if throttled:
+                self.server.stats['throttled'] += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if throttled:
+            self._refuse(429, 'too many requests', {'Retry-After': '1'})
+            return False
+        if '/auth/' not in self.path and not self.server.token_valid(self.headers.get('Authorization', '')):
+            with self.server.lock:
+                self.server.stats['unauthorized'] += 1
+            self._refuse(401, 'invalid or expired token')
+            return False
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            with self.server.lock:
+                self.server.stats['injected_errors'] += 1
+            self._refuse(random.choice(self.server.error_statuses), 'injected failure')
+            return False
+        return True
+
+    def _refuse(self, status, error, headers=None):
+        # Refused before the body is processed, as a proxy or auth gateway would
+        self._drain_body()
+        payload = json.dumps({'error': error}).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_POST(self):
+        stats = self.server.stats
+        if not self._start_request():
+            return
+        if self.path.endswith('/auth/login'):
+            self._drain_body()
+            with self.server.lock:
+                stats['logins'] += 1
+                tokens = self.server.issue_tokens()
+            self._send_json(200, dict(tokens, user={'id': 1, 'name': 'mock'}))
+        elif self.path.endswith('/auth/refresh'):
+            refresh_token = self._read_json().get('refresh_token')
+            with self.server.lock:
+                stats['refreshes'] += 1
+                tokens = self.server.issue_tokens() if self.server.refresh_tokens.pop(refresh_token, False) else None
+            if tokens:
+                self._send_json(200, tokens)
+            else:
+                self._send_json(401, {'error': 'invalid refresh token'})
+        elif self.path.endswith('/episodes/upload-audio'):
+            _, complete = self._drain_body(may_reset=True)
+            if complete:
+                self._send_json(200, {'episode_id': self._create_episode()})
+        elif self.path.endswith('/episodes/upload-audio/resumable') and self.server.chunked_uploads:
+            self._drain_body()
+            upload_id = uuid.uuid4().hex
+            with self.server.lock:
+                self.server.resumable_uploads[upload_id] = {
+                    'length': int(self.headers['Upload-Length']),
+                    'offset': 0,
+                }
+            self.send_response(201)
+            self.send_header('Location', f"{self.path}/{upload_id}")
+            self.send_header('Tus-Resumable', '1.0.0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path.endswith('/publish'):
+            self._drain_body()
+            with self.server.lock:
+                stats['publishes'] += 1
+            self._send_json(200, {})
+        else:
+            self._drain_body()
+            self._send_json(404, {'error': 'not found'})
+
+    def _create_episode(self):
+        episode_id = uuid.uuid4().hex
+        failed = random.random() < self.server.processing_failure_rate
+        with self.server.lock:
+            self.server.stats['uploads'] += 1
+            self.server.episodes[episode_id] = (time.monotonic() + self.server.processing_delay, failed)
+        return episode_id
+
+    def _resumable_upload(self):
+        upload_id = self.path.rsplit('/', 1)[-1]
+        with self.server.lock:
+            return self.server.resumable_uploads.get(upload_id)
+
+    def _send_offset(self, status, upload, data=None):
+        payload = json.dumps(data).encode('utf-8') if data is not None else b''
+        self.send_response(status)
+        self.send_header('Upload-Offset', str(upload['offset']))
+        self.send_header('Tus-Resumable', '1.0.0')
+        if data is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_PATCH(self):
+        if not self._start_request():
+            return
+        upload = self._resumable_upload()
+        if upload is None:
+            self._drain_body()
+            self._send_json(404, {'error': 'not found'})
+            return
+        if int(self.headers['Upload-Offset']) != upload['offset']:
+            # Answer without reading the misplaced chunk and drop the connection
+            self.close_connection = True
+            self._send_offset(409, upload)
+            return
+
+        # Like a tus server, keep whatever part of the chunk arrived before a reset
+        received, complete = self._drain_body(may_reset=True)
+        with self.server.lock:
+            upload['offset'] += received
+        if not complete:
+            return
+        if upload['offset'] >= upload['length']:
+            self._send_offset(200, upload, {'episode_id': self._create_episode()})
+        else:
+            self._send_offset(204, upload)
+
+    def do_HEAD(self):
+        if not self._start_request():
+            return
+        upload = self._resumable_upload()
+        if upload is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self._send_offset(200, upload)
+
+    def do_GET(self):
+        if not self._start_request():
+            return
+        if self.path.endswith('/audio-status'):
+            episode_id = self.path.split('/')[-2]
+            with self.server.lock:
+                self.server.stats['status_polls'] += 1
+                ready_at, failed = self.server.episodes.get(episode_id, (None, False))
+            if ready_at is None:
+                self._send_json(404, {'error': 'not found'})
+            elif time.monotonic() >= ready_at:
+                self._send_json(200, {'audio_status': 'error'} if failed else {'audio_status': 'success', 'duration': 0})
+            else:
+                self._send_json(200, {'audio_status': 'processing'})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+
+class MockMaveServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, processing_delay=0.0,
+                 reset_every_mb=0.0, chunked_uploads=True, rate_limit=None, token_ttl=None,
+                 bandwidth_mb=None, error_rate=0.0, error_statuses=(500, 503), processing_failure_rate=0.0):
+        super().__init__((host, port), MockMaveHandler)
+        self.latency = latency
+        self.processing_delay = processing_delay
+        self.bandwidth = bandwidth_mb * 1024 * 1024 if bandwidth_mb else None  # upload bytes/s shared by all clients
+        self._bandwidth_free_at = time.monotonic()
+        self.error_rate = error_rate  # probability that an authenticated request fails with one of error_statuses
+        self.error_statuses = error_statuses
+        self.processing_failure_rate = processing_failure_rate  # probability that an upload ends in audio_status 'error'
+
+        self.reset_every_mb = reset_every_mb  # mean MB of upload between injected resets, 0 for none
+        self.chunked_uploads = chunked_uploads
+        self.rate_limit = rate_limit  # requests per second before answering 429, None for unlimited
+        self._rate_tokens = rate_limit or 0
+        self._rate_updated = time.monotonic()
+        self.token_ttl = token_ttl  # seconds until an access token expires, None for never
+        self.access_tokens = {}  # access token -> expiry time
+        self.refresh_tokens = {}  # refresh token -> True until used
+        self.lock = threading.Lock()
+        self.episodes = {}  # episode_id -> time at which processing finishes
+        self.resumable_uploads = {}  # upload_id -> {length, offset}
+        self.stats = {'connections': 0, 'requests': 0, 'uploads': 0, 'bytes_received': 0,
+                      'status_polls': 0, 'publishes': 0, 'resets': 0, 'throttled': 0,
+                      'logins': 0, 'refreshes': 0, 'unauthorized': 0, 'injected_errors': 0}
+        self.thread = None
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.stats['connections'] += 1
+        super().process_request(request, client_address)
+
+    def issue_tokens(self):
+        # Caller holds the lock
+        access_token = f"mock-access-{uuid.uuid4().hex}"
+        refresh_token = f"mock-refresh-{uuid.uuid4().hex}"
+        self.access_tokens[access_token] = time.monotonic() + self.token_ttl if self.token_ttl else float('inf')
+        self.refresh_tokens[refresh_token] = True
+        return {'access_token': access_token, 'refresh_token': refresh_token}
+
+    def token_valid(self, authorization):
+        expires = self.access_tokens.get(authorization[len('Bearer '):])
+        return expires is not None and time.monotonic() < expires
+
+    def throttle_bandwidth(self, size):
+        """Sleep long enough that all uploads together stay under the bandwidth cap"""
+        if not self.bandwidth:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self._bandwidth_free_at = max(now, self._bandwidth_free_at) + size / self.bandwidth
+            wait = self._bandwidth_free_at - now
+        time.sleep(wait)
+
+    def take_rate_token(self):
+        # Caller holds the lock; token bucket allowing bursts of one second worth of requests
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._rate_tokens = min(self.rate_limit, self._rate_tokens + (now - self._rate_updated) * self.rate_limit)
+        self._rate_updated = now
+        if self._rate_tokens < 1:
+            return False
+        self._rate_tokens -= 1
+        return True
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local mock of the mave.digital API')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--processing-delay', type=float, default=0.0, help='Seconds until an upload is processed')
+    parser.add_argument('--bandwidth-mb', type=float, help='Upload bandwidth cap in MB/s shared by all clients')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Probability that an authenticated request fails with 500 or 503')
+    parser.add_argument('--processing-failure-rate', type=float, default=0.0,
+                        help='Probability that an upload ends in a processing error')
+    parser.add_argument('--reset-every-mb', type=float, default=0.0,
+                        help='Mean MB uploaded between injected connection resets (0 for none)')
+    parser.add_argument('--rate-limit', type=float, help='Requests per second before answering 429')
+    parser.add_argument('--token-ttl', type=float, help='Seconds until access tokens expire')
+    parser.add_argument('--no-chunked-uploads', action='store_true', help='Answer 404 to resumable upload requests')
+    args = parser.parse_args()
+
+    server = MockMaveServer(args.host, args.port, latency=args.latency, processing_delay=args.processing_delay,
+                            reset_every_mb=args.reset_every_mb, chunked_uploads=not args.no_chunked_uploads,
+                            rate_limit=args.rate_limit, token_ttl=args.token_ttl, bandwidth_mb=args.bandwidth_mb,
+                            error_rate=args.error_rate, processing_failure_rate=args.processing_failure_rate)
+    print(f"Mock mave.digital API listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
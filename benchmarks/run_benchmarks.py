@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the command-line flows against the local mock server.
+
+Each scenario runs native_execution.py or multiple_upload.py as a subprocess,
+exactly as a user would, against a fresh MockMaveServer. The suite reports wall
+time, upload throughput, requests per episode and peak RSS of the uploader
+process. Results can be saved with --json and compared against an earlier run
+with --baseline; the exit status is 1 when a scenario regressed.
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockMaveServer  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CREDENTIALS = ['--email', 'bench@example.com', '--password', 'password', '--podcast-id', 'podcast']
+
+
+def run_process(command):
+    """Run a command to completion; returns (exit code, peak RSS in MB) of that process alone"""
+    process = subprocess.Popen(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = rusage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return process.returncode, peak
+
+
+def single_file_commands(script, base_url, audio_files):
+    # One process per episode: the only way these single-episode flows can do a batch
+    extra = ['--no-session'] if script == 'multiple_upload.py' else []
+    return [[sys.executable, script, *CREDENTIALS, '--base-url', base_url, *extra,
+             '--audio-file', path, '--title', os.path.basename(path), '--description', 'Benchmark episode']
+            for path in audio_files]
+
+
+def batch_commands(base_url, audio_files, tmp_dir, concurrency):
+    manifest = os.path.join(tmp_dir, 'episodes.csv')
+    with open(manifest, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['audio_file', 'title', 'description', 'season', 'number', 'is_explicit', 'is_private'])
+        for number, path in enumerate(audio_files, 1):
+            writer.writerow([path, os.path.basename(path), 'Benchmark episode', 1, number, 'false', 'false'])
+    return [[sys.executable, 'multiple_upload.py', *CREDENTIALS, '--base-url', base_url, '--no-session', '--no-cache',
+             '--batch-csv', manifest, '--concurrency', str(concurrency), '--poll-base-delay', '0.5']]
+
+
+def run_scenario(name, audio_files, tmp_dir, args):
+    server = MockMaveServer(latency=args.latency, processing_delay=args.processing_delay,
+                            bandwidth_mb=args.bandwidth_mb, error_rate=args.error_rate).start()
+    if name == 'native':
+        commands = single_file_commands('native_execution.py', server.base_url, audio_files)
+    elif name == 'multiple-single':
+        commands = single_file_commands('multiple_upload.py', server.base_url, audio_files)
+    else:
+        commands = batch_commands(server.base_url, audio_files, tmp_dir, args.concurrency)
+
+    peak_rss = 0.0
+    failed_processes = 0
+    started = time.perf_counter()
+    for command in commands:
+        exit_code, peak = run_process(command)
+        peak_rss = max(peak_rss, peak)
+        failed_processes += exit_code != 0
+    elapsed = time.perf_counter() - started
+    server.stop()
+
+    stats = server.stats
+    episodes = len(audio_files)
+    return {
+        'episodes': episodes,
+        'published': stats['publishes'],
+        'failed_processes': failed_processes,
+        'wall_s': round(elapsed, 3),
+        'upload_mb_per_s': round(stats['bytes_received'] / 1024 ** 2 / elapsed, 2),
+        'requests_per_episode': round(stats['requests'] / episodes, 2),
+        'connections': stats['connections'],
+        'peak_rss_mb': round(peak_rss, 1),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Compare against a saved run; returns a list of human-readable regressions"""
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['published'] < result['episodes'] and base['published'] >= base['episodes']:
+            found.append(f"{name}: only {result['published']}/{result['episodes']} episodes published")
+        for metric, slack in (('wall_s', 0.05), ('requests_per_episode', 0.0), ('peak_rss_mb', 2.0)):
+            limit = base[metric] * (1 + tolerance) + slack
+            if result[metric] > limit:
+                found.append(f"{name}: {metric} {result[metric]} > {base[metric]} (+{tolerance:.0%})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the end-to-end benchmark suite against the mock server')
+    parser.add_argument('--episodes', type=int, default=5, help='Episodes per scenario')
+    parser.add_argument('--size-mb', type=float, default=16, help='Size of each audio file in MB')
+    parser.add_argument('--concurrency', type=int, default=4, help='--concurrency for the batch scenario')
+    parser.add_argument('--latency', type=float, default=0.02, help='Mock server latency per request in seconds')
+    parser.add_argument('--bandwidth-mb', type=float, help='Mock server upload bandwidth cap in MB/s')
+    parser.add_argument('--processing-delay', type=float, default=0.0, help='Seconds the mock server takes to process')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of an injected 500/503 per request')
+    parser.add_argument('--scenarios', nargs='+', default=['native', 'multiple-single', 'multiple-batch'],
+                        choices=['native', 'multiple-single', 'multiple-batch'], help='Scenarios to run')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Results file of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown relative to --baseline')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_files = []
+        for i in range(args.episodes):
+            path = os.path.join(tmp_dir, f'episode{i:03d}.mp3')
+            with open(path, 'wb') as f:
+                f.truncate(int(args.size_mb * 1024 ** 2))
+            audio_files.append(path)
+
+        print(f"{args.episodes} episodes x {args.size_mb:g} MB, {args.latency:g} s latency"
+              + (f", {args.bandwidth_mb:g} MB/s" if args.bandwidth_mb else '')
+              + (f", {args.error_rate:.0%} injected errors" if args.error_rate else ''))
+        print(f"{'scenario':<16} {'published':>9} {'wall s':>8} {'MB/s':>8} {'req/ep':>7} {'conns':>6} {'RSS MB':>7}")
+        for name in args.scenarios:
+            result = run_scenario(name, audio_files, tmp_dir, args)
+            results[name] = result
+            print(f"{name:<16} {result['published']:>4}/{result['episodes']:<4} {result['wall_s']:>8.2f} "
+                  f"{result['upload_mb_per_s']:>8.1f} {result['requests_per_episode']:>7.2f} "
+                  f"{result['connections']:>6} {result['peak_rss_mb']:>7.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
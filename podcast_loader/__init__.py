@@ -0,0 +1,49 @@
+"""Upload and publish podcast episodes on mave.digital.
+
+The names below are loaded from their modules on first use, so importing the package
+costs next to nothing until the client is actually needed:
+
+    from podcast_loader import MaveDigitalUploader
+
+    uploader = MaveDigitalUploader(log=None)
+    uploader.login('your@email.com', 'your_password')
+    report = uploader.process_episodes('YOUR_PODCAST_ID', episodes, concurrency=4)
+
+The command line is `python -m podcast_loader` (see podcast_loader.cli).
+"""
+import importlib
+
+_EXPORTS = {
+    'MaveDigitalUploader': 'podcast_loader.client',
+    'BatchReport': 'podcast_loader.client',
+    'EpisodeResult': 'podcast_loader.client',
+    'PublishReport': 'podcast_loader.client',
+    'PublishResult': 'podcast_loader.client',
+    'AsyncMaveDigitalUploader': 'podcast_loader.mave_async',
+    'PollPolicy': 'podcast_loader.mave_protocol',
+    'ConnectionPool': 'podcast_loader.mave_transport',
+    'UrllibTransport': 'podcast_loader.mave_transport',
+    'FakeTransport': 'podcast_loader.mave_transport',
+    'RetryPolicy': 'podcast_loader.mave_transport',
+    'TokenBucket': 'podcast_loader.mave_transport',
+    'ManifestError': 'podcast_loader.episode_manifest',
+    'read_manifest': 'podcast_loader.episode_manifest',
+    'validate_manifest': 'podcast_loader.episode_manifest',
+    'parse_mp3': 'podcast_loader.mp3_info',
+    'read_tags': 'podcast_loader.mp3_info',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+import sys
+
+from podcast_loader.cli import main
+
+sys.exit(main())
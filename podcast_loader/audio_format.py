@@ -0,0 +1,45 @@
+"""Audio container detection from the first bytes of a file or stream.
+
+Kept apart from audio_prep so the request builders can use it without loading the
+transcoding machinery.
+"""
+from typing import NamedTuple
+
+
+class AudioFormat(NamedTuple):
+    name: str          # 'mp3', 'wav', 'flac', ... or 'unknown'
+    content_type: str
+    lossless: bool     # worth transcoding before upload
+
+
+MP3 = AudioFormat('mp3', 'audio/mpeg', False)
+UNKNOWN = AudioFormat('unknown', 'audio/mpeg', False)  # what the uploader always sent before
+SNIFF_BYTES = 12
+
+
+def detect_audio_format(path: str) -> AudioFormat:
+    """Identify the container from the first bytes of the file, whatever its extension says"""
+    with open(path, 'rb') as f:
+        return sniff_audio_format(f.read(SNIFF_BYTES))
+
+
+def sniff_audio_format(head: bytes) -> AudioFormat:
+    """Identify the container from the first SNIFF_BYTES bytes of a file or stream"""
+    if head.startswith(b'ID3'):
+        return MP3
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return AudioFormat('wav', 'audio/wav', True)
+    if head[:4] == b'FORM' and head[8:12] in (b'AIFF', b'AIFC'):
+        return AudioFormat('aiff', 'audio/aiff', True)
+    if head.startswith(b'fLaC'):
+        return AudioFormat('flac', 'audio/flac', True)
+    if head.startswith(b'OggS'):
+        return AudioFormat('ogg', 'audio/ogg', False)
+    if head[4:8] == b'ftyp':
+        return AudioFormat('mp4', 'audio/mp4', False)
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        if head[1] & 0x06 == 0:
+            # Layer bits 00 mark an ADTS AAC stream rather than an MPEG audio frame
+            return AudioFormat('aac', 'audio/aac', False)
+        return MP3
+    return UNKNOWN
@@ -0,0 +1,139 @@
+"""Pre-upload audio stage: shrink lossless masters to MP3 (formats are detected by audio_format)"""
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, NamedTuple, Optional
+
+from podcast_loader.audio_format import MP3, AudioFormat, detect_audio_format
+from podcast_loader.upload_cache import hash_file
+
+MAX_SOURCE_HASHES = 5000  # sources whose hash is remembered in the transcode directory
+
+
+def find_encoder() -> Optional[str]:
+    return shutil.which('ffmpeg')
+
+
+def default_transcode_dir() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'podcast-loader', 'transcoded')
+
+
+class PreparedAudio(NamedTuple):
+    path: str               # file to upload: the original, or the transcoded MP3
+    format: AudioFormat     # format of `path`
+    transcoded: bool
+    original_size: int
+
+
+class AudioPreprocessor:
+    """Transcodes lossless audio (WAV, AIFF, FLAC) to MP3 at `bitrate` kbps before upload.
+
+    Encodes run as ffmpeg processes, up to `workers` at a time, so submit() can start
+    them well ahead of the uploads and they overlap with the uploads of earlier files.
+    Output is kept in `cache_dir` under the content hash of the source and the bitrate,
+    so later runs reuse it instead of encoding again. Source hashes are remembered there
+    with size and mtime, as in UploadCache, so unchanged masters are not read again to
+    find their encode. Without an encoder, or for
+    formats that are already compressed, the original file is uploaded unchanged.
+    Finished encodes are reported to `log` (None for silence).
+    """
+
+    def __init__(self, bitrate: int = 128, workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                 encoder: Optional[str] = None, log: Optional[Callable[[str], None]] = print):
+        self.bitrate = bitrate
+        self.log = log
+        self.cache_dir = cache_dir or default_transcode_dir()
+        self.encoder = encoder or find_encoder()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1))
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}  # absolute source path -> future PreparedAudio
+        self._hashes: Optional[Dict[str, Dict]] = None  # source path -> {size, mtime_ns, sha256, time}
+
+    def submit(self, audio_file: str) -> Future:
+        """Start preparing a file in the background; repeated calls for one file share the work"""
+        path = os.path.abspath(audio_file)
+        with self._lock:
+            future = self._pending.get(path)
+            if future is None:
+                future = self._pending[path] = self._executor.submit(self._prepare, path)
+        return future
+
+    def prepare(self, audio_file: str) -> PreparedAudio:
+        return self.submit(audio_file).result()
+
+    def forget(self, audio_file: str) -> None:
+        """Drop what is remembered about a file, e.g. once a watched file has been moved away"""
+        with self._lock:
+            self._pending.pop(os.path.abspath(audio_file), None)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _prepare(self, path: str) -> PreparedAudio:
+        audio_format = detect_audio_format(path)
+        size = os.path.getsize(path)
+        if not audio_format.lossless or self.encoder is None:
+            return PreparedAudio(path, audio_format, False, size)
+
+        output = os.path.join(self.cache_dir, f"{self._source_hash(path)}-{self.bitrate}k.mp3")
+        if not os.path.exists(output):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Encode to a temporary name so an interrupted encode is never mistaken for a finished one
+            tmp_output = f"{output}.{os.getpid()}.{threading.get_ident()}.tmp.mp3"
+            command = [self.encoder, '-nostdin', '-loglevel', 'error', '-y', '-i', path,
+                       '-vn', '-codec:a', 'libmp3lame', '-b:a', f"{self.bitrate}k", tmp_output]
+            try:
+                result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                if result.returncode != 0:
+                    raise Exception(f"Transcoding {path} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+                os.replace(tmp_output, output)
+            finally:
+                if os.path.exists(tmp_output):
+                    os.remove(tmp_output)
+            if self.log is not None:
+                self.log(f"Transcoded '{os.path.basename(path)}' ({audio_format.name}, {size / 1024 ** 2:.1f} MB) "
+                         f"to {self.bitrate} kbps MP3 ({os.path.getsize(output) / 1024 ** 2:.1f} MB)")
+        return PreparedAudio(output, MP3, True, size)
+
+    def _source_hash(self, path: str) -> str:
+        stat = os.stat(path)
+        with self._lock:
+            known = self._load_hashes().get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        sha256 = hash_file(path)
+        with self._lock:
+            self._hashes[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256,
+                                  'time': time.time()}
+            if len(self._hashes) > MAX_SOURCE_HASHES:
+                newest = sorted(self._hashes.items(), key=lambda item: item[1]['time'], reverse=True)
+                self._hashes = dict(newest[:MAX_SOURCE_HASHES])
+            self._save_hashes()
+        return sha256
+
+    def _hashes_path(self) -> str:
+        return os.path.join(self.cache_dir, 'sources.json')
+
+    def _load_hashes(self) -> Dict[str, Dict]:
+        # Caller holds the lock
+        if self._hashes is None:
+            try:
+                with open(self._hashes_path(), encoding='utf-8') as f:
+                    self._hashes = json.load(f)
+            except (OSError, ValueError):
+                self._hashes = {}
+        return self._hashes
+
+    def _save_hashes(self) -> None:
+        # Caller holds the lock; a lost update only means a file is hashed again
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self._hashes_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._hashes, f)
+        os.replace(tmp_path, self._hashes_path())
@@ -0,0 +1,76 @@
+"""Audio that upload_audio streams instead of reading a local file: HTTP(S) URLs and stdin"""
+import os
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import BinaryIO, Optional, Tuple
+
+from podcast_loader.mave_protocol import USER_AGENT
+
+STDIN = '-'
+
+
+def is_remote(audio_file: str) -> bool:
+    """True for audio that is streamed rather than read from a local path (URLs and '-' for stdin)"""
+    return audio_file == STDIN or urllib.parse.urlsplit(audio_file).scheme in ('http', 'https')
+
+
+class AudioSource:
+    """Audio that is streamed into the upload body as it is read, without a copy on local disk.
+
+    open() returns (binary stream, size in bytes or None if unknown). Sources that are
+    `replayable` can be opened again, so their uploads can be resent after a refused
+    request or an expired token; a pipe can only be read once.
+    """
+
+    name = 'audio'
+    replayable = True
+
+    def open(self) -> Tuple[BinaryIO, Optional[int]]:
+        raise NotImplementedError
+
+
+class URLSource(AudioSource):
+    """Audio served over HTTP(S), e.g. by an internal storage box; each open() is a new GET"""
+
+    def __init__(self, url: str, timeout: Optional[float] = 60):
+        self.url = url
+        self.timeout = timeout
+        self.name = os.path.basename(urllib.parse.unquote(urllib.parse.urlsplit(url).path)) or 'audio'
+
+    def open(self) -> Tuple[BinaryIO, Optional[int]]:
+        request = urllib.request.Request(self.url, headers={'User-Agent': USER_AGENT})
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.URLError as e:
+            # Not an HTTPError any more, so it cannot be mistaken for a response of the mave.digital API
+            raise Exception(f"Cannot read {self.url}: {e}")
+        length = response.headers.get('Content-Length')
+        return response, int(length) if length and not response.headers.get('Content-Encoding') else None
+
+
+class StdinSource(AudioSource):
+    """Audio piped into the process; `name` is the filename sent to the server"""
+
+    replayable = False
+
+    def __init__(self, name: str = 'episode.mp3', stream: Optional[BinaryIO] = None):
+        self.name = name
+        self.stream = stream or sys.stdin.buffer
+        self._opened = False
+        self._lock = threading.Lock()
+
+    def open(self) -> Tuple[BinaryIO, Optional[int]]:
+        with self._lock:
+            if self._opened:
+                raise Exception("Audio from stdin can only be sent once")
+            self._opened = True
+        return self.stream, None
+
+
+def open_audio_source(audio_file: str, stdin_name: str = 'episode.mp3') -> AudioSource:
+    if audio_file == STDIN:
+        return StdinSource(stdin_name)
+    return URLSource(audio_file)
@@ -0,0 +1,89 @@
+"""Append-only progress journal for --batch-csv runs, used by --resume"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Step recorded last for an episode -> what a resumed run still has to do
+STEPS_TO_POLL = ('uploaded',)
+STEPS_TO_PUBLISH = ('processed', 'publish_failed')
+STEPS_DONE = ('published',)
+
+
+class BatchJournal:
+    """JSONL journal of per-row batch progress.
+
+    Every state change of an episode is appended as one line
+    ({"row": 3, "audio_file": ..., "step": "uploaded", "episode_id": ...}) and
+    fsynced, so the file survives crashes and interruptions. Replaying it gives the
+    last known step and episode_id of each row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(csv_file: str) -> str:
+        return f"{csv_file}.journal.jsonl"
+
+    def reset(self) -> None:
+        """Start a new journal, discarding the progress of earlier runs"""
+        with self._lock:
+            open(self.path, 'w', encoding='utf-8').close()
+
+    def record(self, row: int, audio_file: Optional[str], step: str, **fields) -> None:
+        """Append a step; rows without an audio file (publish-only) are matched by episode_id"""
+        entry = {'row': row, 'audio_file': audio_file, 'step': step, 'time': time.time()}
+        entry.update(fields)
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def load(self) -> Dict[int, Dict]:
+        """Replay the journal into {row: latest entry}"""
+        state = {}
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+                previous = state.get(entry['row'], {})
+                if previous and _identity(previous) != _identity(entry):
+                    previous = {}
+                merged = dict(previous)
+                merged.update(entry)
+                state[entry['row']] = merged
+        return state
+
+    def apply(self, episodes_data: List[Dict]) -> None:
+        """Restore episode_id and status from the journal onto matching CSV rows.
+
+        Rows whose CSV already names a different episode_id are left alone.
+        """
+        for _ in self.restore(episodes_data):
+            pass
+
+    def restore(self, episodes: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazy version of apply() for manifests that are streamed into the pipeline"""
+        state = self.load()
+        for row, episode in enumerate(episodes):
+            entry = state.get(row)
+            if (entry is not None and _identity(entry) == _identity(episode) and entry.get('episode_id')
+                    and episode.get('episode_id', entry['episode_id']) == entry['episode_id']):
+                episode['episode_id'] = entry['episode_id']
+                episode['status'] = entry['step']
+            yield episode
+
+
+def _identity(item: Dict) -> Optional[str]:
+    # What a journal entry and a manifest row must share to be the same episode
+    return item.get('audio_file') or item.get('episode_id')
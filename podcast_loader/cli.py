@@ -0,0 +1,498 @@
+"""Command line of the uploader: `python -m podcast_loader <command> ...`.
+
+Only argparse is loaded up front. The client and the features a command needs are
+imported after the command line has been parsed, so --help and usage errors return
+at once. The option groups are shared with the flat-flag multiple_upload.py script.
+"""
+import argparse
+import datetime
+import os
+from typing import Dict, Optional
+
+from podcast_loader.upload_scheduler import ORDERS
+
+TRANSPORTS = ('pool', 'urllib')
+
+
+def publish_date(value: str) -> str:
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date like 2024-05-31, got {value!r}")
+
+
+def add_session_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('account and connection')
+    group.add_argument('--email', required=True, help='Your mave.digital email')
+    group.add_argument('--password', help='Your mave.digital password (optional while a saved session is valid)')
+    group.add_argument('--podcast-id',
+                       help='ID of the podcast to upload to (optional with manifest rows that have a podcast_id)')
+    group.add_argument('--accounts',
+                       help="JSON file mapping the emails in the manifest's account column to their passwords")
+    group.add_argument('--base-url', default=os.environ.get('MAVE_BASE_URL'),
+                       help='API base URL, e.g. of a local mock server (default: $MAVE_BASE_URL or the public API)')
+    group.add_argument('--transport', choices=TRANSPORTS, default='pool',
+                       help='pool: reused keep-alive connections; urllib: a new connection per request, '
+                            'honouring proxy environment variables')
+    group.add_argument('--session-file',
+                       help='Where login tokens are saved (default: ~/.config/podcast-loader/session.json)')
+    group.add_argument('--no-session', action='store_true',
+                       help='Always log in with the password and do not save tokens')
+
+
+def add_episode_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('episode metadata (single file)')
+    group.add_argument('--title', help='Episode title')
+    group.add_argument('--description', help='Episode description')
+    group.add_argument('--season', type=int, help='Season number (default: 1)')
+    group.add_argument('--number', type=int, help='Episode number within the season (default: 1)')
+    group.add_argument('--explicit', action='store_true', help='Mark episode as explicit')
+    group.add_argument('--private', action='store_true', help='Mark episode as private')
+    group.add_argument('--publish-date', type=publish_date, help='Publish date, YYYY-MM-DD (default: chosen by the server)')
+
+
+def add_audio_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('audio upload')
+    group.add_argument('--stdin-name', default='episode.mp3', help="Filename sent for audio read from stdin with '-'")
+    group.add_argument('--chunked-upload', action='store_true',
+                       help='Upload audio in resumable chunks, retrying failed chunks '
+                            '(falls back to a single request if unsupported)')
+    group.add_argument('--chunk-size', type=float, default=8, help='Chunk size in MB for --chunked-upload')
+    group.add_argument('--chunk-retries', type=int, default=5, help='Retries per chunk for --chunked-upload')
+    group.add_argument('--transcode', action='store_true',
+                       help='Transcode WAV, AIFF and FLAC audio to MP3 with ffmpeg before uploading')
+    group.add_argument('--bitrate', type=int, default=128, help='MP3 bitrate in kbps for --transcode')
+    group.add_argument('--transcode-workers', type=int, help='Encodes to run in parallel (default: number of CPUs)')
+    group.add_argument('--transcode-dir',
+                       help='Where transcoded files are kept for reuse (default: ~/.cache/podcast-loader/transcoded)')
+    group.add_argument('--check-audio', action='store_true',
+                       help='Parse MP3 files before uploading and refuse truncated or non-MP3 audio')
+
+
+def add_tag_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--fill-from-tags', action='store_true',
+                        help='Take blank titles, descriptions, seasons and numbers from the ID3 tags of the audio')
+
+
+def add_batch_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('batches')
+    group.add_argument('--concurrency', type=int, default=1, help='Number of files to upload in parallel')
+    group.add_argument('--max-concurrency', type=int,
+                       help='Add upload workers, up to this many, while throughput keeps improving')
+    group.add_argument('--order', choices=ORDERS,
+                       help="Upload order: as listed, smallest files first, by the manifest's priority column, or "
+                            "one episode per podcast in turn (default: fair when rows name several podcasts, "
+                            "otherwise as listed)")
+    group.add_argument('--publish-concurrency', type=int, default=8, help='Number of episodes to publish in parallel')
+    group.add_argument('--no-cache', action='store_true',
+                       help='Do not use the upload cache; always upload every file')
+    group.add_argument('--refresh', action='store_true',
+                       help='Ignore cached uploads and upload every file again, updating the cache')
+    group.add_argument('--cache-file', help='Path of the upload cache (default: ~/.cache/podcast-loader/uploads.json)')
+
+
+def add_journal_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--journal', help='Path of the batch progress journal (default: <manifest>.journal.jsonl)')
+
+
+def add_watch_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('watch folder')
+    group.add_argument('--watch-settle', type=float, default=5.0,
+                       help='Seconds a file must stay unchanged before it is uploaded')
+    group.add_argument('--watch-interval', type=float, default=2.0,
+                       help='Seconds between directory scans when inotify is not available')
+
+
+def add_polling_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('audio processing status polling')
+    group.add_argument('--poll-max-attempts', type=int, default=30, help='Maximum status polls per episode')
+    group.add_argument('--poll-base-delay', type=float, default=2.0, help='Initial delay between status polls in seconds')
+    group.add_argument('--poll-max-delay', type=float, default=10.0, help='Maximum delay between status polls in seconds')
+    group.add_argument('--poll-rate', type=float, help='Maximum status requests per second across all episodes')
+
+
+def add_network_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('retries and rate limits')
+    group.add_argument('--max-retries', type=int, default=5,
+                       help='Retries per request after throttling (429), server errors or connection failures')
+    group.add_argument('--rate-limit', type=float, help='Maximum API requests per second across all workers')
+    group.add_argument('--rate-burst', type=int,
+                       help='Requests allowed in a burst above --rate-limit (default: one second worth)')
+    group.add_argument('--max-bandwidth', type=float, help='Maximum upload rate in MB/s across all workers')
+
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('progress output and metrics')
+    group.add_argument('--quiet', action='store_true', help='Drop per-poll status messages and the live progress line')
+    group.add_argument('--no-progress', action='store_true', help='Do not show the live upload progress line')
+    group.add_argument('--metrics-json',
+                       help="Write a JSON summary of timings and request latencies to this file ('-' for stdout)")
+    group.add_argument('--events', help='Append a JSON line per request, phase and status change to this file')
+
+
+def build_script_parser() -> argparse.ArgumentParser:
+    """Parser of multiple_upload.py, where flags pick the mode instead of a command"""
+    parser = argparse.ArgumentParser(description='Upload podcasts to mave.digital')
+    add_session_arguments(parser)
+
+    modes = parser.add_argument_group('modes')
+    modes.add_argument('--audio-file',
+                       help="Path or HTTP(S) URL of the audio file to upload, or '-' to read it from stdin (single file mode)")
+    modes.add_argument('--audio-files', nargs='+', help='List of audio files or URLs to upload (without metadata)')
+    modes.add_argument('--batch-csv', help='Path to CSV (or .jsonl) manifest with batch upload data')
+    modes.add_argument('--publish-only', action='store_true',
+                       help='Only publish the --batch-csv metadata for episodes uploaded earlier '
+                            '(episode IDs from an episode_id column or the journal)')
+    modes.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted --batch-csv run from its journal instead of starting over')
+    modes.add_argument('--watch', metavar='DIR',
+                       help='Keep running and publish every audio file that appears in DIR, '
+                            'with metadata from a sidecar JSON file of the same name')
+    modes.add_argument('--status', nargs='+', metavar='EPISODE_ID',
+                       help='Print the audio processing status of uploaded episodes')
+
+    add_episode_arguments(parser)
+    add_audio_arguments(parser)
+    add_tag_arguments(parser)
+    add_batch_arguments(parser)
+    add_journal_arguments(parser)
+    add_watch_arguments(parser)
+    add_polling_arguments(parser)
+    add_network_arguments(parser)
+    add_output_arguments(parser)
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m podcast_loader', description='Upload podcasts to mave.digital')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    upload = commands.add_parser('upload', help='Upload and publish one episode, or upload several files',
+                                 description='Upload and publish one episode. Given several files, '
+                                             'only uploads them, without metadata.')
+    upload.add_argument('audio', nargs='+', help="Audio file path or HTTP(S) URL, or '-' to read from stdin")
+    for add in (add_session_arguments, add_episode_arguments, add_audio_arguments, add_tag_arguments,
+                add_batch_arguments, add_polling_arguments, add_network_arguments, add_output_arguments):
+        add(upload)
+
+    batch = commands.add_parser('batch', help='Upload and publish every row of a CSV or JSONL manifest')
+    batch.add_argument('manifest', help='CSV (or .jsonl) manifest with one episode per row')
+    batch.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted run from its journal instead of starting over')
+    for add in (add_session_arguments, add_audio_arguments, add_tag_arguments, add_batch_arguments,
+                add_journal_arguments, add_polling_arguments, add_network_arguments, add_output_arguments):
+        add(batch)
+
+    publish = commands.add_parser('publish', help='Publish the metadata of a manifest for episodes uploaded earlier',
+                                  description='Publish the metadata of a manifest for episodes uploaded earlier '
+                                              '(episode IDs from an episode_id column or the journal).')
+    publish.add_argument('manifest', help='CSV (or .jsonl) manifest with one episode per row')
+    publish.add_argument('--publish-concurrency', type=int, default=8, help='Number of episodes to publish in parallel')
+    for add in (add_session_arguments, add_tag_arguments, add_journal_arguments, add_network_arguments,
+                add_output_arguments):
+        add(publish)
+
+    watch = commands.add_parser('watch', help='Keep running and publish every audio file that appears in a folder',
+                                description='Publish every audio file that appears in DIR, with metadata '
+                                            'from a sidecar JSON file of the same name.')
+    watch.add_argument('directory', metavar='DIR')
+    for add in (add_session_arguments, add_audio_arguments, add_tag_arguments, add_batch_arguments,
+                add_watch_arguments, add_polling_arguments, add_network_arguments, add_output_arguments):
+        add(watch)
+
+    status = commands.add_parser('status', help='Print the audio processing status of uploaded episodes')
+    status.add_argument('episode_ids', nargs='+', metavar='EPISODE_ID')
+    for add in (add_session_arguments, add_network_arguments):
+        add(status)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    # Options a command does not take keep the defaults of the flat-flag script
+    options = vars(build_script_parser().parse_args(['--email', args.email]))
+    options.update(vars(args))
+    if args.command == 'upload':
+        options['audio_file'], options['audio_files'] = (args.audio[0], None) if len(args.audio) == 1 else (None, args.audio)
+    elif args.command in ('batch', 'publish'):
+        options['batch_csv'] = args.manifest
+        options['publish_only'] = args.command == 'publish'
+    elif args.command == 'watch':
+        options['watch'] = args.directory
+    elif args.command == 'status':
+        options['status'] = args.episode_ids
+
+    return run(argparse.Namespace(**options))
+
+
+def run(args: argparse.Namespace) -> int:
+    """Carry out a parsed command line; returns the exit status"""
+    import json
+    import signal
+    import urllib.error
+
+    from podcast_loader import mave_protocol
+    from podcast_loader.audio_source import is_remote, open_audio_source
+    from podcast_loader.batch_journal import STEPS_DONE, STEPS_TO_POLL, STEPS_TO_PUBLISH, BatchJournal
+    from podcast_loader.client import MaveDigitalUploader
+    from podcast_loader.episode_manifest import read_manifest, validate_manifest
+    from podcast_loader.mave_protocol import DEFAULT_BASE_URL, USER_AGENT, PollPolicy
+    from podcast_loader.mave_transport import TokenBucket, UrllibTransport
+    from podcast_loader.mp3_info import episode_fields_from_tags, read_tags
+    from podcast_loader.session_store import SessionStore
+    from podcast_loader.upload_cache import UploadCache
+    from podcast_loader.upload_metrics import UploadMetrics, default_progress_stream
+
+    transport = UrllibTransport(headers={'User-Agent': USER_AGENT}) if args.transport == 'urllib' else None
+    uploader = MaveDigitalUploader(transport)
+    uploader.base_url = (args.base_url or DEFAULT_BASE_URL).rstrip('/')
+    events_file = open(args.events, 'a', encoding='utf-8') if args.events else None
+    uploader.metrics = UploadMetrics(
+        events_file, progress_stream=None if args.quiet or args.no_progress else default_progress_stream())
+    uploader.verbose = not args.quiet
+    uploader.poll_policy = PollPolicy(max_attempts=args.poll_max_attempts,
+                                      base_delay=args.poll_base_delay,
+                                      max_delay=args.poll_max_delay)
+    uploader.poll_rate_limit = args.poll_rate
+    uploader.chunked_upload = args.chunked_upload
+    uploader.chunk_size = int(args.chunk_size * 1024 * 1024)
+    uploader.chunk_retries = args.chunk_retries
+    # Batch manifests are checked once up front instead
+    uploader.check_audio = args.check_audio and not args.batch_csv
+    uploader.transport.policy.max_retries = args.max_retries
+    if not args.no_session:
+        uploader.session_store = SessionStore(args.session_file)
+    if args.rate_limit:
+        uploader.transport.rate_limiter = TokenBucket(args.rate_limit, args.rate_burst)
+    if args.max_bandwidth:
+        uploader.bandwidth_limiter = TokenBucket(args.max_bandwidth * 1024 * 1024)
+
+    cache = None if args.no_cache else UploadCache(args.cache_file, refresh=args.refresh)
+    if args.transcode:
+        from podcast_loader.audio_prep import AudioPreprocessor, find_encoder
+        if find_encoder():
+            uploader.preprocessor = AudioPreprocessor(args.bitrate, workers=args.transcode_workers,
+                                                      cache_dir=args.transcode_dir, log=uploader.log)
+        else:
+            print("Warning: ffmpeg was not found, uploading audio without transcoding")
+
+    exit_status = 0
+    try:
+        if not args.podcast_id and not (args.batch_csv or args.watch or args.status):
+            print("Error: --podcast-id is required unless the --batch-csv rows name their podcast")
+            return 2
+        order = args.order or 'input'
+        if args.batch_csv:
+            # Report every bad row and missing audio file before anything is sent
+            check = validate_manifest(args.batch_csv, check_files=not args.publish_only,
+                                      require_podcast_id=not (args.podcast_id or args.publish_only),
+                                      check_audio=args.check_audio and not args.publish_only,
+                                      fill_from_tags=args.fill_from_tags, publish_only=args.publish_only)
+            if check.problems:
+                print(f"Found {len(check.problems)} problem(s) in {args.batch_csv}, nothing was uploaded:")
+                for problem in check.problems:
+                    print(f"  {problem}")
+                return 1
+            print(f"Checked {check.rows} episodes in {args.batch_csv}"
+                  + (f" ({check.audio_seconds / 60:.0f} min of MP3 audio)" if check.audio_seconds else ""))
+            uploader.metrics.plan(check.rows, check.audio_bytes)
+            if args.order is None and len(check.podcasts | ({args.podcast_id} if args.podcast_id else set())) > 1:
+                order = 'fair'
+        elif args.audio_files or args.audio_file:
+            audio_files = args.audio_files or [args.audio_file]
+            uploader.metrics.plan(len(audio_files), sum(os.path.getsize(path) for path in audio_files
+                                                        if os.path.isfile(path)))
+
+        # Step 1: Login, or reuse the tokens saved by an earlier run
+        uploader.start_session(args.email, args.password)
+        # One session per further account named by the manifest (or, for --watch, by the accounts file)
+        passwords = load_accounts(args.accounts) if args.accounts else {}
+        for email in sorted(check.accounts if args.batch_csv else passwords):
+            uploader.add_account(email, passwords.get(email))
+
+        if args.batch_csv and args.publish_only:
+            # Re-publish metadata only; episode IDs come from the CSV or an earlier run's journal
+            journal = BatchJournal(args.journal or BatchJournal.path_for(args.batch_csv))
+            episodes_data = journal.restore(read_manifest(args.batch_csv, args.fill_from_tags, publish_only=True))
+
+            def record(row, episode, result):
+                if not result.episode_id:
+                    return
+                if result.published:
+                    journal.record(row, episode.get('audio_file'), 'published', episode_id=result.episode_id)
+                else:
+                    journal.record(row, episode.get('audio_file'), 'publish_failed', episode_id=result.episode_id,
+                                   error=result.error)
+
+            report = uploader.publish_episodes(episodes_data, concurrency=args.publish_concurrency, on_result=record)
+            print(f"Published {len(report.published)}/{len(report)} episodes")
+            for result in report.failed:
+                print(f"  {result.title}: {result.error}")
+            if not report:
+                exit_status = 1
+
+        elif args.batch_csv:
+            # Batch mode with CSV file, streamed into the pipeline row by row
+            episodes_data = read_manifest(args.batch_csv, args.fill_from_tags)
+            journal = BatchJournal(args.journal or BatchJournal.path_for(args.batch_csv))
+            if args.resume:
+                episodes_data = journal.restore(episodes_data)
+                # Rows journaled as upload_failed are uploaded again, so they do not count
+                uploaded = sum(1 for entry in journal.load().values()
+                               if entry['step'] in STEPS_TO_POLL + STEPS_TO_PUBLISH + STEPS_DONE)
+                print(f"Resuming from {journal.path}: {uploaded}/{check.rows} episodes already uploaded")
+            else:
+                journal.reset()
+
+            # Upload, process and publish each episode as soon as its audio is ready
+            report = uploader.process_episodes(args.podcast_id, episodes_data, concurrency=args.concurrency,
+                                               journal=journal, cache=cache,
+                                               publish_concurrency=args.publish_concurrency,
+                                               order=order, max_concurrency=args.max_concurrency)
+            if not report:
+                exit_status = 1
+
+        elif args.watch:
+            # Long-running ingest: one session and connection pool for every file that shows up
+            from podcast_loader.watch_folder import FolderWatcher
+            watcher = FolderWatcher(args.watch, settle=args.watch_settle, interval=args.watch_interval,
+                                    fill_from_tags=args.fill_from_tags, log=uploader.log)
+
+            def stop_watching(signum, frame):
+                print("Stopping; waiting for episodes in progress to finish...")
+                watcher.stop()
+
+            signal.signal(signal.SIGINT, stop_watching)
+            signal.signal(signal.SIGTERM, stop_watching)
+
+            def on_status(row, episode, status):
+                if status == 'published' or status.endswith('_failed'):
+                    try:
+                        watcher.finish(episode['audio_file'], published=status == 'published')
+                    except OSError as e:
+                        print(f"Could not move {episode['audio_file']}: {str(e)}")
+
+            print(f"Watching {watcher.directory} for new episodes "
+                  f"({'inotify' if watcher.uses_inotify else f'scanning every {args.watch_interval:g}s'}); "
+                  f"press Ctrl+C to stop")
+            report = uploader.process_episodes(args.podcast_id, watcher.episodes(), concurrency=args.concurrency,
+                                               cache=cache, publish_concurrency=args.publish_concurrency,
+                                               max_concurrency=args.max_concurrency, on_status=on_status,
+                                               keep_results=False)
+            if not report:
+                exit_status = 1
+
+        elif args.audio_files:
+            # Batch mode with just audio files (no metadata)
+            episode_ids = uploader.upload_multiple_audios(args.podcast_id, args.audio_files,
+                                                          concurrency=args.concurrency, cache=cache,
+                                                          order=order, max_concurrency=args.max_concurrency)
+            print(f"Uploaded {len(episode_ids)}/{len(args.audio_files)} audio files successfully")
+            if len(episode_ids) < len(args.audio_files):
+                exit_status = 1
+
+        elif args.audio_file:
+            # Single file mode
+            audio = open_audio_source(args.audio_file, args.stdin_name) if is_remote(args.audio_file) else args.audio_file
+            metadata = {'title': args.title, 'description': args.description,
+                        'season': args.season, 'number': args.number}
+            if args.fill_from_tags and not is_remote(args.audio_file):
+                tags = episode_fields_from_tags(read_tags(args.audio_file))
+                metadata.update({field: tags[field] for field, value in metadata.items()
+                                 if value is None and field in tags})
+            if not metadata['title'] or not metadata['description']:
+                print("Error: --title and --description are required unless --fill-from-tags finds them in the audio")
+                return 2
+            episode_id = uploader.upload_audio(args.podcast_id, audio)
+            transcoded = (uploader.preprocessor is not None and not is_remote(args.audio_file)
+                          and uploader.preprocessor.prepare(args.audio_file).transcoded)
+            uploader.publish_episode(
+                episode_id,
+                metadata['title'],
+                metadata['description'],
+                is_explicit=args.explicit,
+                is_private=args.private,
+                season=int(metadata['season'] or 1),
+                number=int(metadata['number'] or 1),
+                optimize_bitrate=not transcoded,
+                publish_date=args.publish_date
+            )
+            print("Podcast episode uploaded and published successfully!")
+
+        elif args.status:
+            for episode_id in args.status:
+                try:
+                    status = uploader.audio_status(episode_id)
+                except urllib.error.HTTPError as e:
+                    print(f"{episode_id}: {e.code} - {mave_protocol.http_error_message(e)}")
+                    exit_status = 1
+                    continue
+                duration = f", {status['duration']} seconds" if status.get('duration') is not None else ""
+                print(f"{episode_id}: {status.get('audio_status')}{duration}")
+        else:
+            print("Error: You must specify either --audio-file or --batch-csv or --audio-files or --watch or --status")
+            return 2
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit_status = 1
+    finally:
+        # Also on the early returns: let encodes finish and remove their temporary files
+        if uploader.preprocessor is not None:
+            uploader.preprocessor.close()
+        if events_file is not None:
+            events_file.close()
+
+    uploader.metrics.finish_progress()
+    summary = uploader.metrics.summary()
+    summary['transport'] = uploader.transport.stats
+    print_phase_summary(summary)
+    print_podcast_summary(summary)
+    stats = uploader.transport.stats
+    if stats['retries'] or stats['throttle_waits']:
+        print(f"Requests: {stats['requests']}, retries: {stats['retries']}, throttled by server: {stats['throttled']}, "
+              f"rate limit waits: {stats['throttle_waits']} ({stats['throttle_wait_seconds']:.1f} s)")
+
+    if args.metrics_json == '-':
+        print(json.dumps(summary, indent=2))
+    elif args.metrics_json:
+        with open(args.metrics_json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return exit_status
+
+
+def print_phase_summary(summary: Dict) -> None:
+    """One line telling where the time went: login, upload, processing wait or publish"""
+    parts = []
+    for name in ('login', 'audio_check', 'transcode_wait', 'upload', 'processing_wait', 'publish'):
+        phase = summary['phases'].get(name)
+        if phase:
+            parts.append(f"{name.replace('_', ' ')} {phase['count']} x {phase['mean_s']:.2f}s avg (max {phase['max_s']:.2f}s)")
+    if parts:
+        print(f"Timing: {'; '.join(parts)}; uploaded {summary['bytes_sent'] / 1024 ** 2:.1f} MB "
+              f"at {summary['upload_mb_per_s']:.1f} MB/s over {summary['wall_s']:.1f}s")
+
+
+def print_podcast_summary(summary: Dict) -> None:
+    """Per-podcast outcome of a run that fanned out over several podcasts"""
+    podcasts = summary['podcasts']
+    if len(podcasts) < 2:
+        return
+    print("Podcasts:")
+    for podcast_id, counters in podcasts.items():
+        failed = sum(count for status, count in counters.items() if status.endswith('_failed'))
+        print(f"  {podcast_id}: {counters.get('uploaded', 0)} uploaded, {counters.get('published', 0)} published, "
+              f"{failed} failed")
+
+
+def load_accounts(path: str) -> Dict[str, Optional[str]]:
+    """Read {email: password} from a JSON file; a null password means the saved session is used"""
+    import json
+
+    with open(path, encoding='utf-8') as f:
+        accounts = json.load(f)
+    if not isinstance(accounts, dict):
+        raise Exception(f"{path}: expected a JSON object mapping emails to passwords")
+    return accounts
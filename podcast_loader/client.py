@@ -0,0 +1,894 @@
+"""The mave.digital client: login and sessions, audio upload, status polling and publishing"""
+import os
+import collections
+import contextlib
+import copy
+import heapq
+import urllib.parse
+import urllib.error
+import urllib.request
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from podcast_loader import mave_protocol
+from podcast_loader.audio_source import AudioSource, is_remote, open_audio_source
+from podcast_loader.batch_journal import STEPS_DONE, STEPS_TO_POLL, STEPS_TO_PUBLISH, BatchJournal
+from podcast_loader.episode_manifest import read_manifest
+from podcast_loader.mp3_info import check_mp3
+from podcast_loader.session_store import SessionStore
+from podcast_loader.upload_cache import UploadCache
+from podcast_loader.mave_protocol import DEFAULT_BASE_URL, USER_AGENT, PollPolicy
+from podcast_loader.mave_transport import ConnectionPool, RetryingTransport, TimingTransport, TokenBucket, is_replayable
+from podcast_loader.upload_metrics import UploadMetrics
+from podcast_loader.upload_scheduler import AdaptiveConcurrency, order_episodes
+
+if TYPE_CHECKING:
+    from podcast_loader.audio_prep import AudioPreprocessor
+
+# Left out above to keep `import podcast_loader.client` quick for embedders and single uploads:
+# concurrent.futures (imported by the batch methods) and the transcoding module (by the
+# command line, where its options are given).
+
+
+class AudioStatusPoller:
+    """Single background scheduler that polls the audio status of all pending episodes.
+
+    Episodes are kept in a deadline heap and each one is polled only when its own
+    backoff delay has elapsed; due polls are sent from a small worker pool so one
+    slow response does not hold up the rest. A global rate cap (requests per
+    second) bounds the load on the audio-status endpoint however many episodes
+    are in flight.
+    Completions are delivered to the callback given to add(), or, without one,
+    through iter_completed(). Episodes of other accounts are polled with the uploader
+    given to add(). Exceptions raised by a callback are collected in `errors`.
+    """
+
+    def __init__(self, uploader: 'MaveDigitalUploader', policy: Optional[PollPolicy] = None,
+                 max_requests_per_second: Optional[float] = None, workers: int = 4):
+        self.uploader = uploader
+        self.policy = policy or uploader.poll_policy
+        self.min_interval = 1.0 / max_requests_per_second if max_requests_per_second else 0.0
+        self._heap = []  # (due time, sequence, episode_id)
+        self._sequence = 0
+        self._pending = {}  # episode_id -> (attempt, callback, uploader)
+        self._completed = collections.deque()  # (episode_id, error) for episodes added without a callback
+        self.errors: List[Exception] = []
+        self._last_request = float('-inf')
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    def start(self) -> 'AudioStatusPoller':
+        self._thread.start()
+        return self
+
+    def add(self, episode_id: str, callback: Optional[Callable[[str, Optional[Exception]], None]] = None,
+            uploader: Optional['MaveDigitalUploader'] = None) -> None:
+        """Start tracking an episode; callback(episode_id, error) runs once it succeeds (error=None) or fails"""
+        with self._condition:
+            self._pending[episode_id] = (0, callback, uploader or self.uploader)
+            self._schedule(episode_id, time.monotonic())
+
+    def iter_completed(self) -> Iterator:
+        """Yield (episode_id, error) for callback-less episodes as they finish, until none are pending"""
+        while True:
+            with self._condition:
+                while not self._completed and self._pending:
+                    self._condition.wait()
+                if not self._completed:
+                    return
+                completed = self._completed.popleft()
+            yield completed
+
+    def join(self) -> None:
+        """Wait until every tracked episode has finished, then stop the polling thread"""
+        with self._condition:
+            while self._pending:
+                self._condition.wait()
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _schedule(self, episode_id: str, due: float) -> None:
+        # Caller holds the condition
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, episode_id))
+        self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    now = time.monotonic()
+                    if self._heap:
+                        due = max(self._heap[0][0], self._last_request + self.min_interval)
+                        if due <= now:
+                            break
+                        self._condition.wait(due - now)
+                    else:
+                        self._condition.wait()
+                _, _, episode_id = heapq.heappop(self._heap)
+                attempt, callback, uploader = self._pending[episode_id]
+                self._last_request = now
+
+            self._executor.submit(self._poll, episode_id, attempt, callback, uploader)
+
+    def _poll(self, episode_id: str, attempt: int,
+              callback: Optional[Callable[[str, Optional[Exception]], None]],
+              uploader: 'MaveDigitalUploader') -> None:
+        max_attempts = self.policy.max_attempts
+        error = None
+        try:
+            audio_status = uploader._check_audio_status(episode_id, attempt, max_attempts)
+        except Exception as e:
+            uploader._log(f"Error checking audio status: {str(e)}")
+            audio_status = None
+
+        if audio_status == 'error':
+            error = Exception("Audio processing failed")
+        elif audio_status != 'success':
+            if attempt + 1 < max_attempts:
+                with self._condition:
+                    self._pending[episode_id] = (attempt + 1, callback, uploader)
+                    self._schedule(episode_id, time.monotonic() + self.policy.delay(attempt))
+                return
+            error = Exception(f"Audio processing timed out after {max_attempts} attempts")
+
+        # Run the callback before dropping the episode so join() sees its follow-up work,
+        # but drop it even if the callback fails, or join() would wait forever
+        try:
+            if callback is not None:
+                callback(episode_id, error)
+        except Exception as e:
+            self.errors.append(e)
+        finally:
+            with self._condition:
+                if callback is None:
+                    self._completed.append((episode_id, error))
+                del self._pending[episode_id]
+                self._condition.notify_all()
+
+
+class PublishResult:
+    """Outcome of publishing one episode"""
+
+    def __init__(self, episode: Dict, error: Optional[str] = None):
+        self.episode = episode
+        self.episode_id = episode.get('episode_id')
+        self.title = episode.get('title')
+        self.error = error
+
+    @property
+    def published(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = 'published' if self.published else f"failed: {self.error}"
+        return f"<PublishResult {self.episode_id} {self.title!r} {outcome}>"
+
+
+class PublishReport:
+    """Per-episode results of MaveDigitalUploader.publish_episodes, in input order.
+
+    Truthy only when every episode was published, so it can stand in for the bool
+    that publish_multiple_episodes used to return.
+    """
+
+    def __init__(self, results: List[PublishResult]):
+        self.results = results
+
+    @property
+    def published(self) -> List[PublishResult]:
+        return [result for result in self.results if result.published]
+
+    @property
+    def failed(self) -> List[PublishResult]:
+        return [result for result in self.results if not result.published]
+
+    def __iter__(self) -> Iterator[PublishResult]:
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __bool__(self) -> bool:
+        return not self.failed
+
+
+class EpisodeResult:
+    """Outcome of one episode of MaveDigitalUploader.process_episodes; `row` is its index in the input"""
+
+    def __init__(self, episode: Dict, row: Optional[int] = None):
+        self.episode = episode
+        self.row = row
+        self.audio_file = episode.get('audio_file')
+        self.title = episode.get('title')
+        self.podcast_id = episode.get('podcast_id')
+        self.episode_id = episode.get('episode_id')
+        self.status = episode.get('status')
+        self.error = episode.get('error')
+
+    def __repr__(self) -> str:
+        outcome = self.status if self.error is None else f"{self.status}: {self.error}"
+        return f"<EpisodeResult {self.audio_file!r} {self.episode_id} {outcome}>"
+
+
+class BatchReport:
+    """Per-episode results of MaveDigitalUploader.process_episodes, in input order.
+
+    Truthy only when every episode reached the final step ('published', or 'processed'
+    without publishing), as the bool process_episodes used to return.
+    """
+
+    def __init__(self, results: List[EpisodeResult], final_status: str = 'published'):
+        self.results = results
+        self.final_status = final_status
+
+    @property
+    def completed(self) -> List[EpisodeResult]:
+        return [result for result in self.results if result.status == self.final_status]
+
+    @property
+    def failed(self) -> List[EpisodeResult]:
+        return [result for result in self.results if result.status != self.final_status]
+
+    def __iter__(self) -> Iterator[EpisodeResult]:
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __bool__(self) -> bool:
+        return not self.failed
+
+
+class MaveDigitalUploader:
+    """Client for the mave.digital API.
+
+    Requests go through `transport` (see mave_transport: a pooled http.client
+    ConnectionPool by default, or UrllibTransport, or FakeTransport for tests).
+    Methods return their results; progress messages go to `log`, which is print by
+    default and can be any callable taking a string, or None for silence.
+    """
+
+    def __init__(self, transport=None, log: Optional[Callable[[str], None]] = print):
+        self.base_url = DEFAULT_BASE_URL
+        self.access_token = None
+        self.refresh_token = None
+        self.user_id = None
+        # Phase timers, request latencies and upload progress; replace to change where output goes
+        self.metrics = UploadMetrics()
+        self.log = log
+        self.verbose = True  # False drops the per-poll status messages
+        # Keep-alive connections are reused across requests and shared by all workers;
+        # throttled and failed requests are retried according to transport.policy
+        self.transport = RetryingTransport(TimingTransport(transport or ConnectionPool(headers={'User-Agent': USER_AGENT}),
+                                                           self._observe_request))
+        self.poll_policy = PollPolicy()
+        self.poll_rate_limit = None  # max audio-status requests per second across all pending episodes
+        # Chunked (resumable) uploads; the single-request upload is used when disabled or unsupported
+        self.chunked_upload = False
+        self.chunk_size = 8 * 1024 * 1024
+        self.chunk_retries = 5
+        # Caps the upload rate of all workers together, in bytes per second (TokenBucket of bytes)
+        self.bandwidth_limiter: Optional[TokenBucket] = None
+        # Sessions of further accounts by email (see add_account); episodes name theirs in 'account'
+        self.accounts: Dict[str, 'MaveDigitalUploader'] = {}
+        # Optional pre-upload stage that transcodes lossless audio to MP3 (see audio_prep)
+        self.preprocessor: Optional['AudioPreprocessor'] = None
+        # Parse local MP3 files before uploading them and refuse truncated or non-MP3 audio (see mp3_info)
+        self.check_audio = False
+        # Tokens are saved here when set, and refreshed once for all workers when they expire
+        self.session_store: Optional[SessionStore] = None
+        self._email = None
+        self._password = None
+        # False while the access token comes from a saved session the server has not accepted yet
+        self._session_checked = False
+        self._auth_lock = threading.Lock()
+
+    def login(self, email: str, password: str) -> Dict:
+        """Login to mave.digital and get access token"""
+        request = mave_protocol.login_request(self.base_url, email, password)
+
+        try:
+            with self.metrics.phase('login'):
+                response = self.transport.open(request)
+            response_data = mave_protocol.parse_json(response.read())
+
+            self.access_token = response_data.get('access_token')
+            self.refresh_token = response_data.get('refresh_token')
+            self.user_id = response_data.get('user', {}).get('id')
+            self._email = email
+            self._password = password
+            self._session_checked = True
+            self._save_session()
+
+            self._log(f"Login successful for user: {response_data.get('user', {}).get('name')}")
+            return response_data
+
+        except urllib.error.HTTPError as e:
+            raise Exception(f"Login failed: {e.code} - {mave_protocol.http_error_message(e)}")
+
+    def _log(self, message: str) -> None:
+        if self.log is not None:
+            self.log(message)
+
+    def _observe_request(self, method: str, url: str, status: str, seconds: float) -> None:
+        self.metrics.record_request(method, url, status, seconds)
+
+    def start_session(self, email: str, password: Optional[str] = None) -> None:
+        """Reuse the tokens saved in session_store for this account, or log in if there are none"""
+        self._email = email
+        self._password = password
+        session = self.session_store.load(self.base_url, email) if self.session_store else None
+        if session:
+            self.access_token = session['access_token']
+            self.refresh_token = session.get('refresh_token')
+            self.user_id = session.get('user_id')
+            self._session_checked = False
+            self._log(f"Reusing saved session for {email}")
+            return
+        if not password:
+            raise Exception(f"No saved session for {email}; a password is required")
+        self.login(email, password)
+
+    def add_account(self, email: str, password: Optional[str] = None) -> 'MaveDigitalUploader':
+        """Start a session for another account, for episodes whose 'account' is this email.
+
+        The account's uploader is a copy of this one with its own tokens; it shares the
+        transport (and so the connection pool and rate limits), metrics and settings.
+        """
+        if email == self._email:
+            return self
+        account = copy.copy(self)
+        account.access_token = account.refresh_token = account.user_id = None
+        account._auth_lock = threading.Lock()
+        account.start_session(email, password)
+        self.accounts[email] = account
+        return account
+
+    def _uploader_for(self, episode: Dict) -> 'MaveDigitalUploader':
+        """The uploader holding the session of the episode's account"""
+        email = episode.get('account')
+        if not email or email == self._email:
+            return self
+        if email not in self.accounts:
+            raise Exception(f"No session for account {email}")
+        return self.accounts[email]
+
+    def _save_session(self) -> None:
+        if self.session_store and self._email:
+            self.session_store.save(self.base_url, self._email, self.access_token, self.refresh_token, self.user_id)
+
+    def _refresh_session(self, expired_token: Optional[str],
+                         message: str = "Access token expired, refreshed the session") -> None:
+        """Replace an access token the server rejected, using the refresh token or, failing that, the password.
+
+        Workers that hit a 401 at the same time wait on the lock; only the first one
+        refreshes, the others find a different token already in place and reuse it.
+        """
+        with self._auth_lock:
+            if self.access_token != expired_token:
+                return
+
+            if self.refresh_token:
+                try:
+                    response = self.transport.open(mave_protocol.refresh_request(self.base_url, self.refresh_token))
+                    response_data = mave_protocol.parse_json(response.read())
+                    self.access_token = response_data.get('access_token')
+                    self.refresh_token = response_data.get('refresh_token') or self.refresh_token
+                    self._session_checked = True
+                    self._save_session()
+                    self._log(message)
+                    return
+                except urllib.error.HTTPError as e:
+                    self._log(f"Session refresh failed: {e.code} - {mave_protocol.http_error_message(e)}")
+
+            if not self._password:
+                if self.session_store and self._email:
+                    self.session_store.clear(self.base_url, self._email)
+                raise Exception("Session expired and no password is available to log in again")
+            self.login(self._email, self._password)
+
+    def _open_authorized(self, build_request: Callable[[str], urllib.request.Request]):
+        """Send the request built for the current access token, refreshing the session once on a 401.
+
+        A request whose body cannot be sent twice is not rebuilt; see _check_session.
+        """
+        access_token = self.access_token
+        request = build_request(access_token)
+        try:
+            response = self.transport.open(request)
+            self._session_checked = True
+            return response
+        except urllib.error.HTTPError as e:
+            if e.code != 401 or not is_replayable(request):
+                raise
+        self._refresh_session(access_token)
+        return self.transport.open(build_request(self.access_token))
+
+    def _check_session(self) -> None:
+        """Make sure the server accepts the access token before an audio upload is sent.
+
+        There is no cheap endpoint to test a token with, so a token reused from a saved
+        session is renewed up front, with the refresh token or the password. Otherwise an
+        expired token would cost a whole upload (one per worker) before the 401, and audio
+        from stdin cannot be sent a second time at all.
+        """
+        if self._session_checked or not (self.refresh_token or self._password):
+            return
+        self._refresh_session(self.access_token, "Renewed the saved session before uploading")
+
+    def upload_audio(self, podcast_id: str, audio_file_path: Union[str, AudioSource],
+                     wait_for_processing: bool = True) -> str:
+        """Upload audio file to mave.digital, optionally waiting for the server to process it.
+
+        Besides a local path, audio_file_path may be an HTTP(S) URL, '-' for stdin or any
+        AudioSource; such audio is piped into the upload as it is read, without a local copy.
+        """
+        if not self.access_token:
+            raise Exception("Not logged in. Call login() first.")
+        self._check_session()
+
+        if isinstance(audio_file_path, str) and is_remote(audio_file_path):
+            audio_file_path = open_audio_source(audio_file_path)
+        if isinstance(audio_file_path, AudioSource):
+            episode_id = self._upload_audio_stream(podcast_id, audio_file_path)
+            self._log(f"Audio '{audio_file_path.name}' uploaded successfully. Episode ID: {episode_id}")
+        else:
+            episode_id = self._upload_audio_file(podcast_id, audio_file_path)
+            self._log(f"Audio '{os.path.basename(audio_file_path)}' uploaded successfully. Episode ID: {episode_id}")
+
+        if wait_for_processing:
+            self._wait_for_audio_processing(episode_id)
+        return episode_id
+
+    def _upload_audio_file(self, podcast_id: str, audio_file_path: str) -> Optional[str]:
+        if self.check_audio:
+            with self.metrics.phase('audio_check', audio_file=audio_file_path):
+                _, problem = check_mp3(audio_file_path)
+            if problem:
+                raise Exception(f"Not uploading {audio_file_path}: {problem}")
+        if self.preprocessor is not None:
+            # Usually already started ahead of time by process_episodes; this only waits for it
+            with self.metrics.phase('transcode_wait', audio_file=audio_file_path):
+                prepared = self.preprocessor.prepare(audio_file_path)
+            audio_file_path = prepared.path
+            if prepared.transcoded:
+                self.metrics.skip(prepared.original_size - os.path.getsize(audio_file_path))
+
+        with self.metrics.phase('upload', audio_file=audio_file_path, bytes=os.path.getsize(audio_file_path)):
+            episode_id = self._upload_audio_chunked(podcast_id, audio_file_path) if self.chunked_upload else None
+            if episode_id is None:
+                try:
+                    response = self._open_authorized(lambda access_token: mave_protocol.upload_audio_request(
+                        self.base_url, access_token, podcast_id, audio_file_path,
+                        progress=self._on_upload_chunk))
+                    episode_id = mave_protocol.parse_json(response.read()).get('episode_id')
+                except urllib.error.HTTPError as e:
+                    raise Exception(f"Upload failed for {audio_file_path}: {e.code} - {mave_protocol.http_error_message(e)}")
+        return episode_id
+
+    def _upload_audio_stream(self, podcast_id: str, source: AudioSource) -> Optional[str]:
+        """Pipe audio from a URL or stdin into a single upload request.
+
+        Chunked uploads and transcoding need a local file, so neither applies here.
+        """
+        with self.metrics.phase('upload', audio_file=source.name):
+            try:
+                response = self._open_authorized(lambda access_token: mave_protocol.upload_audio_stream_request(
+                    self.base_url, access_token, podcast_id, source, progress=self._on_upload_chunk))
+                return mave_protocol.parse_json(response.read()).get('episode_id')
+            except urllib.error.HTTPError as e:
+                message = f"Upload failed for {source.name}: {e.code} - {mave_protocol.http_error_message(e)}"
+                if not source.replayable:
+                    message += " (audio from stdin can only be sent once, so it was not retried)"
+                raise Exception(message)
+
+    def _on_upload_chunk(self, size: int) -> None:
+        """Called as each piece of an audio body is sent; holds the sender back to the bandwidth cap"""
+        self.metrics.upload_progress(size)
+        if self.bandwidth_limiter is not None:
+            self.bandwidth_limiter.acquire(size)
+
+    def _upload_audio_chunked(self, podcast_id: str, audio_file_path: str) -> Optional[str]:
+        """Upload audio in chunk_size ranges, retrying failed ranges from the server's acknowledged offset.
+
+        Returns the episode_id, or None if the server does not support chunked uploads.
+        """
+        size = os.path.getsize(audio_file_path)
+        try:
+            response = self._open_authorized(lambda access_token: mave_protocol.chunked_upload_create_request(
+                self.base_url, access_token, podcast_id, audio_file_path))
+        except urllib.error.HTTPError as e:
+            if e.code in (404, 405, 501):
+                self._log("Chunked uploads are not supported by the server, falling back to a single request")
+                return None
+            raise Exception(f"Upload failed for {audio_file_path}: {e.code} - {mave_protocol.http_error_message(e)}")
+        upload_url = urllib.parse.urljoin(response.url, response.headers['Location'])
+
+        offset = 0
+        failures = 0
+        offset_unknown = False
+        while True:
+            try:
+                if offset_unknown:
+                    response = self._open_authorized(lambda access_token: mave_protocol.chunked_upload_offset_request(
+                        upload_url, access_token))
+                    offset = int(response.headers['Upload-Offset'])
+                    offset_unknown = False
+
+                length = min(self.chunk_size, size - offset)
+                response = self._open_authorized(lambda access_token: mave_protocol.chunked_upload_patch_request(
+                    upload_url, access_token, audio_file_path, offset, length, progress=self._on_upload_chunk))
+                offset = int(response.headers['Upload-Offset'])
+                failures = 0
+                if offset >= size:
+                    return mave_protocol.parse_json(response.read()).get('episode_id')
+
+            except (urllib.error.URLError, ValueError, TypeError) as e:
+                # HTTPError is a URLError; only conflicts, throttling and server errors are worth retrying
+                if isinstance(e, urllib.error.HTTPError) and e.code != 409 and e.code != 429 and e.code < 500:
+                    raise Exception(f"Upload failed for {audio_file_path}: {e.code} - {mave_protocol.http_error_message(e)}")
+                failures += 1
+                if failures > self.chunk_retries:
+                    raise Exception(f"Upload failed for {audio_file_path} at byte {offset}/{size}: {str(e)}")
+                delay = min(0.5 * (2 ** (failures - 1)), 10)
+                self._log(f"Chunk upload interrupted at byte {offset}/{size} ({str(e)}), "
+                          f"retrying in {delay:.1f}s (attempt {failures}/{self.chunk_retries})")
+                time.sleep(delay)
+                offset_unknown = True
+
+    def upload_multiple_audios(self, podcast_id: str, audio_files: List[str], concurrency: int = 1,
+                               cache: Optional[UploadCache] = None, order: str = 'input',
+                               max_concurrency: Optional[int] = None) -> List[str]:
+        """Upload multiple audio files to mave.digital, up to `concurrency` at a time"""
+        episodes_data = [{'audio_file': audio_file} for audio_file in audio_files]
+        self.process_episodes(podcast_id, episodes_data, concurrency=concurrency, publish=False,
+                              failure_message="Failed to upload {audio_file}: {error}", cache=cache,
+                              order=order, max_concurrency=max_concurrency)
+        return [episode['episode_id'] for episode in episodes_data if episode['status'] == 'processed']
+
+    def process_episodes(self, podcast_id: str, episodes_data: Iterable[Dict], concurrency: int = 1,
+                         publish: bool = True,
+                         failure_message: str = "Skipping {audio_file} due to error: {error}",
+                         journal: Optional[BatchJournal] = None, cache: Optional[UploadCache] = None,
+                         publish_concurrency: Optional[int] = None, order: str = 'input',
+                         max_concurrency: Optional[int] = None,
+                         on_status: Optional[Callable[[int, Dict, str], None]] = None,
+                         keep_results: bool = True) -> BatchReport:
+        """Upload, process and publish episodes as a staged pipeline.
+
+        `episodes_data` may be a generator (see episode_manifest.read_manifest); it is
+        consumed as upload workers free up, so the first upload starts right away.
+        Uploads run on up to `concurrency` workers and never wait for transcoding: every
+        uploaded episode is handed to a shared AudioStatusPoller, and each episode is
+        published as soon as its audio is ready. Each episode dict gets its 'episode_id'
+        and a final 'status' ('published', 'processed' or the step that failed).
+
+        An episode's own 'podcast_id' and 'account' (see add_account) take precedence over
+        `podcast_id` and this uploader's session, so one run can fan out over many shows.
+
+        Episodes that already carry a 'status' from an earlier run (see BatchJournal.apply)
+        skip the steps they have completed. With a journal, every status change is recorded.
+        With an UploadCache, audio whose content was already uploaded and processed for this
+        podcast skips both the upload and the processing wait. Publishes run on their own
+        pool of `publish_concurrency` workers (default: `concurrency`). With a preprocessor,
+        transcoding starts as soon as an episode is read, ahead of its upload.
+
+        `order` ('input', 'size', 'priority' or 'fair', see upload_scheduler.order_episodes) sets
+        which episodes are uploaded first. With `max_concurrency` above `concurrency`,
+        upload slots are added while the measured throughput keeps improving.
+        on_status(row, episode, status) is called from the worker threads on every status change.
+        Returns a BatchReport with an EpisodeResult per episode; failed ones carry the 'error'.
+        With keep_results=False, as for a long-running watch folder, episodes that were
+        published are forgotten as they finish and the report only lists the failed ones.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        poller = AudioStatusPoller(self, max_requests_per_second=self.poll_rate_limit).start()
+        publish_executor = ThreadPoolExecutor(max_workers=max(1, publish_concurrency or concurrency))
+
+        final_status = 'published' if publish else 'processed'
+        episodes = {}  # row -> episode; with keep_results=False only those still in flight
+        failed = []  # (row, episode) of failed episodes already dropped from `episodes` (keep_results=False)
+        episodes_lock = threading.Lock()
+        uploaded_at = {}  # row -> time the upload finished, for the processing_wait phase
+        max_workers = max(1, concurrency, max_concurrency or 0)
+        adaptive = None
+        if max_workers > max(1, concurrency):
+            adaptive = AdaptiveConcurrency(lambda: self.metrics.bytes_sent, concurrency, max_workers,
+                                           log=self.log).start()
+        upload_gate = adaptive if adaptive is not None else contextlib.nullcontext()
+        errors = []  # unexpected exceptions of upload and publish workers, raised once the pipeline has drained
+
+        def set_status(row, episode, status, **fields):
+            episode['status'] = status
+            self.metrics.count(status, podcast_id=episode.get('podcast_id') or podcast_id)
+            self.metrics.event('status', row=row, audio_file=episode['audio_file'], status=status, **fields)
+            if journal is not None:
+                journal.record(row, episode['audio_file'], status, **fields)
+            if on_status is not None:
+                on_status(row, episode, status)
+            if status == final_status or status.endswith('_failed'):
+                finished(row, episode)
+
+        def finished(row, episode):
+            if keep_results:
+                return
+            with episodes_lock:
+                episodes.pop(row, None)
+                if episode.get('status') != final_status:
+                    failed.append((row, episode))
+            if self.preprocessor is not None and not is_remote(episode['audio_file']):
+                self.preprocessor.forget(episode['audio_file'])
+
+        def fail(row, episode, status, error):
+            episode['error'] = str(error)
+            set_status(row, episode, status, error=str(error))
+            self._log(failure_message.format(audio_file=episode['audio_file'], error=str(error)))
+
+        def submit_publish(row, episode):
+            publish_executor.submit(publish_next, row, episode)
+
+        def publish_next(row, episode):
+            try:
+                publish_ready(row, episode)
+            except Exception as e:
+                errors.append(e)
+
+        def publish_ready(row, episode):
+            result = self._publish_one(episode)
+            if result.published:
+                set_status(row, episode, 'published')
+            else:
+                episode['error'] = result.error
+                set_status(row, episode, 'publish_failed', error=result.error)
+
+        def on_processed(row, episode, error):
+            if row in uploaded_at:
+                self.metrics.add_phase('processing_wait', time.monotonic() - uploaded_at.pop(row),
+                                       episode_id=episode['episode_id'])
+            if error is not None:
+                fail(row, episode, 'processing_failed', error)
+                return
+            set_status(row, episode, 'processed')
+            if cache is not None and not is_remote(episode['audio_file']):
+                try:
+                    cache.store(episode.get('podcast_id') or podcast_id, episode['audio_file'], episode['episode_id'])
+                except OSError as e:
+                    self._log(f"Could not update upload cache: {str(e)}")
+            if publish:
+                submit_publish(row, episode)
+
+        def poll(row, episode):
+            try:
+                uploader = self._uploader_for(episode)
+            except Exception as e:
+                fail(row, episode, 'processing_failed', e)
+                return
+            uploaded_at[row] = time.monotonic()
+            poller.add(episode['episode_id'], lambda episode_id, error: on_processed(row, episode, error), uploader)
+
+        def skip_upload(episode):
+            try:
+                self.metrics.skip(os.path.getsize(episode['audio_file']))
+            except OSError:
+                pass
+
+        def start(row, episode):
+            status = episode.get('status')
+            # Rows restored at upload_failed or processing_failed are uploaded again
+            if status in STEPS_TO_POLL + STEPS_TO_PUBLISH + STEPS_DONE:
+                skip_upload(episode)
+            if status in STEPS_DONE or (status in STEPS_TO_PUBLISH and not publish):
+                finished(row, episode)
+                return
+            if status in STEPS_TO_PUBLISH:
+                submit_publish(row, episode)
+                return
+            if status in STEPS_TO_POLL:
+                poll(row, episode)
+                return
+
+            try:
+                episode_podcast_id = episode.get('podcast_id') or podcast_id
+                if not episode_podcast_id:
+                    raise Exception("no podcast_id for this episode")
+                uploader = self._uploader_for(episode)
+                cached_episode_id = None
+                if cache is not None and not is_remote(episode['audio_file']):
+                    cached_episode_id = cache.lookup(episode_podcast_id, episode['audio_file'])
+                if cached_episode_id:
+                    skip_upload(episode)
+                    self.metrics.count('cache_hits')
+                    self._log(f"Audio '{os.path.basename(episode['audio_file'])}' is unchanged, "
+                              f"reusing Episode ID: {cached_episode_id}")
+                    episode['episode_id'] = cached_episode_id
+                    set_status(row, episode, 'processed', episode_id=cached_episode_id)
+                    if publish:
+                        submit_publish(row, episode)
+                    return
+                with upload_gate:
+                    episode['episode_id'] = uploader.upload_audio(episode_podcast_id, episode['audio_file'],
+                                                                  wait_for_processing=False)
+                if (self.preprocessor is not None and not is_remote(episode['audio_file'])
+                        and self.preprocessor.prepare(episode['audio_file']).transcoded):
+                    # Already encoded to the target bitrate; the server need not encode it again
+                    episode['optimize_bitrate'] = False
+            except Exception as e:
+                fail(row, episode, 'upload_failed', e)
+                return
+            set_status(row, episode, 'uploaded', episode_id=episode['episode_id'])
+            poll(row, episode)
+
+        # Take episodes from the (possibly lazy) input only as upload workers free up
+        upload_slots = threading.BoundedSemaphore(max_workers * 2)
+
+        def start_next(row, episode):
+            try:
+                start(row, episode)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                upload_slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as upload_executor:
+                for row, episode in order_episodes(enumerate(episodes_data), order):
+                    upload_slots.acquire()
+                    if (self.preprocessor is not None and episode.get('status') is None
+                            and not is_remote(episode['audio_file'])):
+                        self.preprocessor.submit(episode['audio_file'])
+                    with episodes_lock:
+                        episodes[row] = episode
+                    upload_executor.submit(start_next, row, episode)
+        finally:
+            # If reading the input fails midway, episodes already uploaded are still polled and published
+            if adaptive is not None:
+                adaptive.stop()
+            poller.join()
+            publish_executor.shutdown(wait=True)
+        errors.extend(poller.errors)
+        if errors:
+            raise errors[0]
+
+        # Uploads run in --order and finish in any order; report them as they were given
+        results = sorted(failed + list(episodes.items()), key=lambda item: item[0])
+        return BatchReport([EpisodeResult(episode, row) for row, episode in results], final_status)
+
+    def _wait_for_audio_processing(self, episode_id: str, max_attempts: Optional[int] = None) -> bool:
+        """Wait for audio processing to complete by polling the audio-status endpoint"""
+        self._log("Waiting for audio processing to complete...")
+        max_attempts = max_attempts or self.poll_policy.max_attempts
+
+        with self.metrics.phase('processing_wait', episode_id=episode_id):
+            for attempt in range(max_attempts):
+                audio_status = self._check_audio_status(episode_id, attempt, max_attempts)
+                if audio_status == 'success':
+                    return True
+                elif audio_status == 'error':
+                    raise Exception("Audio processing failed")
+
+                time.sleep(self.poll_policy.delay(attempt))
+
+            raise Exception(f"Audio processing timed out after {max_attempts} attempts")
+
+    def audio_status(self, episode_id: str) -> Dict:
+        """The server's view of an uploaded episode's audio, e.g. {'audio_status': 'success', 'duration': 1834}.
+
+        'audio_status' is 'success' or 'error' once processing has finished. Raises
+        urllib.error.HTTPError (404) while the server does not know the episode yet.
+        """
+        response = self._open_authorized(lambda access_token: mave_protocol.audio_status_request(
+            self.base_url, access_token, episode_id))
+        return mave_protocol.parse_json(response.read())
+
+    def _check_audio_status(self, episode_id: str, attempt: int, max_attempts: int) -> Optional[str]:
+        """Poll the audio-status endpoint once and return the reported status, or None if unavailable"""
+        try:
+            response_data = self.audio_status(episode_id)
+
+            audio_status = response_data.get('audio_status')
+
+            if audio_status == 'success':
+                self._log(f"Audio processing completed successfully. Duration: {response_data.get('duration')} seconds")
+            elif audio_status != 'error' and self.verbose:
+                self._log(f"Audio processing in progress... (attempt {attempt + 1}/{max_attempts})")
+            return audio_status
+
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                if self.verbose:
+                    self._log(f"Audio status not found yet, retrying... (attempt {attempt + 1}/{max_attempts})")
+            else:
+                self._log(f"Error checking audio status: {e.code} - {mave_protocol.http_error_message(e)}")
+            return None
+
+    def publish_episode(self, episode_id: str, title: str, description: str, 
+                       is_explicit: bool = False, is_private: bool = False, 
+                       season: int = 1, number: int = 1, optimize_bitrate: bool = True,
+                       publish_date: Optional[str] = None) -> bool:
+        """Publish an episode on mave.digital; optimize_bitrate=False keeps the uploaded audio as it is.
+
+        publish_date is a YYYY-MM-DD date; by default the server picks it.
+        """
+        if not self.access_token:
+            raise Exception("Not logged in. Call login() first.")
+
+        try:
+            with self.metrics.phase('publish', episode_id=episode_id):
+                self._open_authorized(lambda access_token: mave_protocol.publish_request(
+                    self.base_url, access_token, episode_id, title, description,
+                    is_explicit=is_explicit, is_private=is_private, season=season, number=number,
+                    optimize_bitrate=optimize_bitrate, publish_date=publish_date))
+            self._log(f"Episode '{title}' published successfully!")
+            return True
+
+        except urllib.error.HTTPError as e:
+            raise Exception(f"Publishing failed: {e.code} - {mave_protocol.http_error_message(e)}")
+
+    def publish_multiple_episodes(self, episodes_data: List[Dict], concurrency: int = 8) -> PublishReport:
+        """Publish multiple episodes on mave.digital"""
+        return self.publish_episodes(episodes_data, concurrency=concurrency)
+
+    def publish_episodes(self, episodes: Iterable[Dict], concurrency: int = 8,
+                         on_result: Optional[Callable[[int, Dict, PublishResult], None]] = None) -> PublishReport:
+        """Publish already processed episodes, up to `concurrency` at a time.
+
+        `episodes` may be any iterable (it is consumed lazily, a few episodes ahead of
+        the workers); each needs an 'episode_id' plus the metadata publish_episode takes,
+        and gets a 'status' of 'published' or 'publish_failed'. on_result(index, episode,
+        result) is called from the worker thread as each publish finishes.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        slots = threading.BoundedSemaphore(max(1, concurrency) * 2)
+
+        def run(index, episode):
+            try:
+                result = self._publish_one(episode)
+                episode['status'] = 'published' if result.published else 'publish_failed'
+                if on_result is not None:
+                    on_result(index, episode, result)
+                return result
+            finally:
+                slots.release()
+
+        futures = []
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            for index, episode in enumerate(episodes):
+                slots.acquire()
+                futures.append(executor.submit(run, index, episode))
+        return PublishReport([future.result() for future in futures])
+
+    def _publish_one(self, episode: Dict) -> PublishResult:
+        if not episode.get('episode_id'):
+            error = "no episode_id to publish"
+        else:
+            try:
+                self._uploader_for(episode).publish_episode(
+                    episode_id=episode['episode_id'],
+                    title=episode['title'],
+                    description=episode['description'],
+                    is_explicit=episode.get('is_explicit', False),
+                    is_private=episode.get('is_private', False),
+                    season=episode.get('season', 1),
+                    number=episode.get('number', 1),
+                    optimize_bitrate=episode.get('optimize_bitrate', True),
+                    publish_date=episode.get('publish_date')
+                )
+                return PublishResult(episode)
+            except Exception as e:
+                error = str(e)
+        self._log(f"Failed to publish episode {episode.get('title')}: {error}")
+        return PublishResult(episode, error)
+
+
+def process_episodes_from_csv(csv_file: str) -> List[Dict]:
+    """Helper function to process episode data from CSV file"""
+    return list(read_manifest(csv_file))
@@ -0,0 +1,227 @@
+"""Streaming reader and pre-flight validation for batch manifests (CSV or JSONL)"""
+import csv
+import datetime
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from podcast_loader.audio_source import is_remote
+from podcast_loader.mp3_info import check_mp3, episode_fields_from_tags, read_tags
+
+REQUIRED_FIELDS = ('audio_file', 'title', 'description')
+# Publishing only needs an episode_id, or an audio_file to look it up in the journal
+PUBLISH_REQUIRED_FIELDS = ('title', 'description')
+TAG_FIELDS = ('title', 'description', 'season', 'number')  # what fill_from_tags may take from ID3 tags
+TRUE_VALUES = ('true', '1', 'yes')
+FALSE_VALUES = ('false', '0', 'no', '')
+
+
+class ManifestError(ValueError):
+    """A manifest row that cannot be turned into an episode"""
+
+    def __init__(self, path: str, line: int, message: str):
+        super().__init__(f"{path}, line {line}: {message}")
+        self.path = path
+        self.line = line
+
+
+def is_jsonl(path: str) -> bool:
+    return path.lower().endswith(('.jsonl', '.ndjson'))
+
+
+def iter_rows(path: str, publish_only: bool = False) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, raw row) pairs without loading the whole manifest"""
+    with open(path, mode='r', encoding='utf-8', newline=None if is_jsonl(path) else '') as f:
+        if is_jsonl(path):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise ManifestError(path, line_number, f"invalid JSON ({e})")
+                if not isinstance(row, dict):
+                    raise ManifestError(path, line_number, "expected a JSON object")
+                yield line_number, row
+        else:
+            reader = csv.DictReader(f)
+            columns = reader.fieldnames or []
+            missing = [field for field in (PUBLISH_REQUIRED_FIELDS if publish_only else REQUIRED_FIELDS)
+                       if field not in columns]
+            if publish_only and 'episode_id' not in columns and 'audio_file' not in columns:
+                missing.append('episode_id')
+            if missing:
+                raise ManifestError(path, 1, f"missing column(s): {', '.join(missing)}")
+            for row in reader:
+                yield reader.line_num, row
+
+
+def parse_episode(path: str, line: int, row: Dict, fill_from_tags: bool = False,
+                  publish_only: bool = False) -> Dict:
+    """Turn a raw manifest row into an episode dict, raising ManifestError for bad fields.
+
+    With fill_from_tags, blank title, description, season and number fields are taken
+    from the ID3 tags of a local audio file (title, comment, disc and track number).
+    With publish_only, a row may name an episode_id instead of an audio_file.
+    """
+    if fill_from_tags:
+        row = _fill_from_tags(row)
+    for field in (PUBLISH_REQUIRED_FIELDS if publish_only else REQUIRED_FIELDS):
+        if row.get(field) in (None, ''):
+            raise ManifestError(path, line, f"'{field}' is empty")
+    if publish_only and row.get('episode_id') in (None, '') and row.get('audio_file') in (None, ''):
+        raise ManifestError(path, line, "'episode_id' is empty and there is no 'audio_file' to look it up by")
+
+    episode = {} if row.get('audio_file') in (None, '') else {'audio_file': str(row['audio_file'])}
+    episode.update({
+        'title': str(row['title']),
+        'description': str(row['description']),
+        'season': _parse_int(path, line, row, 'season'),
+        'number': _parse_int(path, line, row, 'number'),
+        'is_explicit': _parse_bool(path, line, row, 'is_explicit'),
+        'is_private': _parse_bool(path, line, row, 'is_private'),
+    })
+    # Optional; lets --publish-only update episodes uploaded outside of a journaled run
+    if row.get('episode_id'):
+        episode['episode_id'] = str(row['episode_id'])
+    # Optional; route the row to another podcast and/or another account than the command line's
+    for field in ('podcast_id', 'account'):
+        if row.get(field) not in (None, ''):
+            episode[field] = str(row[field])
+    # Optional; higher priorities are uploaded first with --order priority
+    if row.get('priority') not in (None, ''):
+        episode['priority'] = _parse_int(path, line, row, 'priority', default=0)
+    # Optional; the publish date sent to the server
+    if row.get('publish_date') not in (None, ''):
+        episode['publish_date'] = _parse_date(path, line, row, 'publish_date')
+    return episode
+
+
+def read_manifest(path: str, fill_from_tags: bool = False, publish_only: bool = False) -> Iterator[Dict]:
+    """Yield one episode dict per manifest row, parsing lazily as the pipeline asks for them"""
+    for line, row in iter_rows(path, publish_only):
+        yield parse_episode(path, line, row, fill_from_tags, publish_only)
+
+
+def _fill_from_tags(row: Dict) -> Dict:
+    audio_file = row.get('audio_file')
+    blank = [field for field in TAG_FIELDS if row.get(field) in (None, '')]
+    if not blank or not audio_file or is_remote(str(audio_file)):
+        return row
+    try:
+        tags = read_tags(str(audio_file))
+    except (OSError, ValueError):
+        # A missing or unreadable file is reported by check_audio_file
+        return row
+    found = episode_fields_from_tags(tags)
+    return dict(row, **{field: found[field] for field in blank if field in found})
+
+
+def check_audio_file(audio_file: str) -> Optional[str]:
+    """Cheap checks that an audio file can be uploaded; returns the problem, if any"""
+    if is_remote(audio_file):
+        # URLs and stdin are only read when their upload starts
+        return None
+    try:
+        stat = os.stat(audio_file)
+    except FileNotFoundError:
+        return f"audio file '{audio_file}' does not exist"
+    except OSError as e:
+        return f"audio file '{audio_file}' cannot be accessed ({e.strerror})"
+    if not os.path.isfile(audio_file):
+        return f"audio file '{audio_file}' is not a regular file"
+    if stat.st_size == 0:
+        return f"audio file '{audio_file}' is empty"
+    if not os.access(audio_file, os.R_OK):
+        return f"audio file '{audio_file}' is not readable"
+    return None
+
+
+class ManifestCheck:
+    """Result of validate_manifest"""
+
+    def __init__(self):
+        self.rows = 0
+        self.audio_bytes = 0  # total size of the audio files that passed the checks
+        self.audio_seconds = 0.0  # total duration of the MP3 files, with check_audio
+        self.podcasts = set()  # podcast_id values named by rows
+        self.accounts = set()  # account values named by rows
+        self.problems: List[str] = []
+
+
+def validate_manifest(path: str, check_files: bool = True, require_podcast_id: bool = False,
+                      check_audio: bool = False, fill_from_tags: bool = False,
+                      publish_only: bool = False) -> ManifestCheck:
+    """Pre-flight pass over the whole manifest without sending anything.
+
+    Only stat() is used on the audio files, so this stays fast even for manifests
+    with thousands of rows. With check_audio, local MP3 files are also parsed to catch
+    truncated or non-MP3 audio (see mp3_info.check_mp3). With require_podcast_id,
+    every row needs a podcast_id. With publish_only, rows may name an episode_id
+    instead of an audio file (see parse_episode).
+    """
+    check = ManifestCheck()
+    try:
+        for line, row in iter_rows(path, publish_only):
+            check.rows += 1
+            try:
+                episode = parse_episode(path, line, row, fill_from_tags, publish_only)
+            except ManifestError as e:
+                check.problems.append(str(e))
+                continue
+            if 'podcast_id' in episode:
+                check.podcasts.add(episode['podcast_id'])
+            elif require_podcast_id:
+                check.problems.append(f"{path}, line {line}: 'podcast_id' is empty and no --podcast-id was given")
+            if 'account' in episode:
+                check.accounts.add(episode['account'])
+            if not check_files or 'audio_file' not in episode:
+                continue
+            problem = check_audio_file(episode['audio_file'])
+            if not problem and check_audio and not is_remote(episode['audio_file']):
+                info, problem = check_mp3(episode['audio_file'])
+                if info is not None:
+                    check.audio_seconds += info.duration
+            if problem:
+                check.problems.append(f"{path}, line {line}: {problem}")
+            elif not is_remote(episode['audio_file']):
+                check.audio_bytes += os.path.getsize(episode['audio_file'])
+    except ManifestError as e:
+        # The rest of the file cannot be read (broken header or JSON line)
+        check.problems.append(str(e))
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        check.problems.append(f"{path}: {e}")
+    return check
+
+
+def _parse_int(path: str, line: int, row: Dict, field: str, default: int = 1) -> int:
+    value = row.get(field)
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ManifestError(path, line, f"'{field}' must be a whole number, got {value!r}")
+    if number < 1:
+        raise ManifestError(path, line, f"'{field}' must be at least 1, got {number}")
+    return number
+
+
+def _parse_date(path: str, line: int, row: Dict, field: str) -> str:
+    value = str(row[field]).strip()
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ManifestError(path, line, f"'{field}' must be a date like 2024-05-31, got {value!r}")
+
+
+def _parse_bool(path: str, line: int, row: Dict, field: str) -> bool:
+    value = row.get(field)
+    if isinstance(value, bool):
+        return value
+    text = '' if value is None else str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ManifestError(path, line, f"'{field}' must be true or false, got {value!r}")
@@ -0,0 +1,359 @@
+"""asyncio version of the mave.digital uploader.
+
+AsyncMaveDigitalUploader sends the same requests as MaveDigitalUploader (both are
+built by mave_protocol), but over a small keep-alive HTTP/1.1 client on asyncio
+streams. One event loop can therefore drive hundreds of episodes at once without
+a thread per upload. Standard library only, like the rest of the project.
+"""
+import asyncio
+import http.client
+import io
+import os
+import ssl
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from podcast_loader import mave_protocol
+from podcast_loader.mave_protocol import DEFAULT_BASE_URL, USER_AGENT, PollPolicy
+from podcast_loader.mave_transport import ConnectionPool, PooledResponse
+
+if TYPE_CHECKING:
+    from podcast_loader.client import BatchReport
+
+# A connection is a (reader, writer) pair of asyncio streams
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncConnectionPool:
+    """Keep-alive HTTP/1.1 client on asyncio streams, the async counterpart of ConnectionPool.
+
+    `open()` takes urllib.request.Request objects and raises urllib.error.HTTPError
+    for error statuses, exactly like the synchronous transports. As there, only
+    RESEND_METHODS are resent when a reused connection turns out to be dead.
+    """
+
+    RESEND_METHODS = ConnectionPool.RESEND_METHODS
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, max_idle_per_host: int = 32,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.headers = headers or {}
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.connections_opened = 0
+        self._idle = {}  # (scheme, host, port) -> list of idle connections
+
+    async def open(self, request: urllib.request.Request) -> PooledResponse:
+        """Send a request over a pooled connection and return the fully read response"""
+        parts = urllib.parse.urlsplit(request.full_url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+
+        method = request.get_method()
+        while True:
+            connection, reused = await self._acquire(key)
+            reader, writer = connection
+            try:
+                await self._send(writer, request, parts.netloc)
+                status, reason, headers, body, will_close = await self._read_response(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                # The server dropped an idle keep-alive connection. Only requests that cannot
+                # have changed anything are resent: a POST may already have been applied.
+                if reused and method in self.RESEND_METHODS:
+                    continue
+                raise urllib.error.URLError(e)
+            except (OSError, http.client.HTTPException) as e:
+                writer.close()
+                raise urllib.error.URLError(e)
+            break
+
+        if will_close:
+            writer.close()
+        else:
+            self._release(key, connection)
+
+        if status >= 400:
+            raise urllib.error.HTTPError(request.full_url, status, reason, headers, io.BytesIO(body))
+        return PooledResponse(request.full_url, status, reason, headers, body)
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _, writer in connections:
+                writer.close()
+
+    async def _acquire(self, key: Tuple[str, str, int]) -> Tuple[Connection, bool]:
+        connections = self._idle.get(key)
+        while connections:
+            reader, writer = connection = connections.pop()
+            # A connection the server has closed while it was idle has already seen EOF
+            if not (reader.at_eof() or writer.is_closing()):
+                return connection, True
+            writer.close()
+
+        self.connections_opened += 1
+        scheme, host, port = key
+        try:
+            if scheme == 'https':
+                connection = await asyncio.open_connection(host, port, ssl=self.ssl_context, server_hostname=host)
+            else:
+                connection = await asyncio.open_connection(host, port)
+        except OSError as e:
+            raise urllib.error.URLError(e)
+        return connection, False
+
+    def _release(self, key: Tuple[str, str, int], connection: Connection) -> None:
+        connections = self._idle.setdefault(key, [])
+        if len(connections) < self.max_idle_per_host:
+            connections.append(connection)
+        else:
+            connection[1].close()
+
+    async def _send(self, writer: asyncio.StreamWriter, request: urllib.request.Request, host: str) -> None:
+        headers = {'Host': host, 'Accept-Encoding': 'identity'}
+        headers.update(self.headers)
+        headers.update(request.header_items())
+        data = request.data
+        chunked = False
+        if isinstance(data, bytes):
+            headers['Content-Length'] = str(len(data))
+        elif data is not None and not request.has_header('Content-length'):
+            headers['Transfer-Encoding'] = 'chunked'
+            chunked = True
+
+        head = f"{request.get_method()} {request.selector} HTTP/1.1\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write((head + '\r\n').encode('latin-1'))
+
+        if isinstance(data, bytes):
+            writer.write(data)
+        elif data is not None:
+            # Streaming bodies read from disk; keep those reads off the event loop
+            loop = asyncio.get_running_loop()
+            chunks = iter(data)
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                if chunked:
+                    chunk = b'%x\r\n%s\r\n' % (len(chunk), chunk)
+                writer.write(chunk)
+                await writer.drain()
+            if chunked:
+                writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    async def _read_response(self, reader: asyncio.StreamReader, method: str):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+        status = int(status)
+
+        header_lines = []
+        while True:
+            line = await reader.readline()
+            header_lines.append(line)
+            if line in (b'\r\n', b'\n', b''):
+                break
+        headers = http.client.parse_headers(io.BytesIO(b''.join(header_lines)))
+
+        will_close = version == 'HTTP/1.0' or headers.get('Connection', '').lower() == 'close'
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = await self._read_chunked(reader)
+        elif headers.get('Content-Length') is not None:
+            body = await reader.readexactly(int(headers['Content-Length']))
+        else:
+            body = await reader.read()
+            will_close = True
+        return status, reason, headers, body, will_close
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if size == 0:
+                # Skip trailers up to the final blank line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+
+class AsyncMaveDigitalUploader:
+    """Coroutine counterpart of MaveDigitalUploader.
+
+    Progress messages go to `log`, any function taking a string (None for silence).
+    """
+
+    def __init__(self, log: Optional[Callable[[str], None]] = print):
+        self.base_url = DEFAULT_BASE_URL
+        self.log = log
+        self.access_token = None
+        self.refresh_token = None
+        self.user_id = None
+        self.transport = AsyncConnectionPool(headers={'User-Agent': USER_AGENT})
+        self.poll_policy = PollPolicy()
+        self.poll_rate_limit = None  # max audio-status requests per second across all pending episodes
+        self._next_poll_slot = 0.0
+
+    async def login(self, email: str, password: str) -> Dict:
+        """Login to mave.digital and get access token"""
+        request = mave_protocol.login_request(self.base_url, email, password)
+
+        try:
+            response = await self.transport.open(request)
+            response_data = mave_protocol.parse_json(response.read())
+
+            self.access_token = response_data.get('access_token')
+            self.refresh_token = response_data.get('refresh_token')
+            self.user_id = response_data.get('user', {}).get('id')
+
+            self._log(f"Login successful for user: {response_data.get('user', {}).get('name')}")
+            return response_data
+
+        except urllib.error.HTTPError as e:
+            raise Exception(f"Login failed: {e.code} - {mave_protocol.http_error_message(e)}")
+
+    async def upload_audio(self, podcast_id: str, audio_file_path: str) -> str:
+        """Upload audio file to mave.digital and return the new episode_id without waiting for processing"""
+        if not self.access_token:
+            raise Exception("Not logged in. Call login() first.")
+
+        request = mave_protocol.upload_audio_request(self.base_url, self.access_token, podcast_id, audio_file_path)
+
+        try:
+            response = await self.transport.open(request)
+            episode_id = mave_protocol.parse_json(response.read()).get('episode_id')
+            self._log(f"Audio '{os.path.basename(audio_file_path)}' uploaded successfully. Episode ID: {episode_id}")
+            return episode_id
+
+        except urllib.error.HTTPError as e:
+            raise Exception(f"Upload failed for {audio_file_path}: {e.code} - {mave_protocol.http_error_message(e)}")
+
+    async def wait_for_processing(self, episode_id: str) -> bool:
+        """Poll the audio-status endpoint until processing succeeds, fails or runs out of attempts"""
+        max_attempts = self.poll_policy.max_attempts
+
+        for attempt in range(max_attempts):
+            await self._wait_for_poll_slot()
+            request = mave_protocol.audio_status_request(self.base_url, self.access_token, episode_id)
+            try:
+                response = await self.transport.open(request)
+                response_data = mave_protocol.parse_json(response.read())
+                audio_status = response_data.get('audio_status')
+
+                if audio_status == 'success':
+                    self._log(f"Audio processing completed successfully. Duration: {response_data.get('duration')} seconds")
+                    return True
+                elif audio_status == 'error':
+                    raise Exception("Audio processing failed")
+                else:
+                    self._log(f"Audio processing in progress... (attempt {attempt + 1}/{max_attempts})")
+
+            except urllib.error.HTTPError as e:
+                if e.code == 404:
+                    self._log(f"Audio status not found yet, retrying... (attempt {attempt + 1}/{max_attempts})")
+                else:
+                    self._log(f"Error checking audio status: {e.code} - {mave_protocol.http_error_message(e)}")
+
+            await asyncio.sleep(self.poll_policy.delay(attempt))
+
+        raise Exception(f"Audio processing timed out after {max_attempts} attempts")
+
+    async def publish_episode(self, episode_id: str, title: str, description: str,
+                              is_explicit: bool = False, is_private: bool = False,
+                              season: int = 1, number: int = 1, publish_date: Optional[str] = None) -> bool:
+        """Publish an episode on mave.digital"""
+        if not self.access_token:
+            raise Exception("Not logged in. Call login() first.")
+
+        request = mave_protocol.publish_request(self.base_url, self.access_token, episode_id, title, description,
+                                                is_explicit=is_explicit, is_private=is_private,
+                                                season=season, number=number, publish_date=publish_date)
+
+        try:
+            await self.transport.open(request)
+            self._log(f"Episode '{title}' published successfully!")
+            return True
+
+        except urllib.error.HTTPError as e:
+            raise Exception(f"Publishing failed: {e.code} - {mave_protocol.http_error_message(e)}")
+
+    async def process_episodes(self, podcast_id: str, episodes_data: List[Dict], concurrency: int = 8,
+                               publish: bool = True) -> 'BatchReport':
+        """Upload, process and publish episodes concurrently on the running event loop.
+
+        At most `concurrency` uploads are in flight at once; processing waits and
+        publishes do not hold an upload slot. Each episode dict gets its 'episode_id'
+        and a final 'status', and failed ones their 'error'. Returns a BatchReport in
+        input order, as MaveDigitalUploader.process_episodes does.
+        """
+        from podcast_loader.client import BatchReport, EpisodeResult
+
+        upload_slots = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(episode):
+            try:
+                async with upload_slots:
+                    episode['episode_id'] = await self.upload_audio(podcast_id, episode['audio_file'])
+            except Exception as e:
+                episode['status'], episode['error'] = 'upload_failed', str(e)
+                self._log(f"Skipping {episode['audio_file']} due to error: {str(e)}")
+                return
+            episode['status'] = 'uploaded'
+
+            try:
+                await self.wait_for_processing(episode['episode_id'])
+            except Exception as e:
+                episode['status'], episode['error'] = 'processing_failed', str(e)
+                self._log(f"Skipping {episode['audio_file']} due to error: {str(e)}")
+                return
+            episode['status'] = 'processed'
+            if not publish:
+                return
+
+            try:
+                await self.publish_episode(
+                    episode_id=episode['episode_id'],
+                    title=episode['title'],
+                    description=episode['description'],
+                    is_explicit=episode.get('is_explicit', False),
+                    is_private=episode.get('is_private', False),
+                    season=episode.get('season', 1),
+                    number=episode.get('number', 1),
+                    publish_date=episode.get('publish_date')
+                )
+                episode['status'] = 'published'
+            except Exception as e:
+                episode['status'], episode['error'] = 'publish_failed', str(e)
+                self._log(f"Failed to publish episode {episode.get('title')}: {str(e)}")
+
+        await asyncio.gather(*(run(episode) for episode in episodes_data))
+
+        return BatchReport([EpisodeResult(episode, row) for row, episode in enumerate(episodes_data)],
+                           'published' if publish else 'processed')
+
+    def _log(self, message: str) -> None:
+        if self.log is not None:
+            self.log(message)
+
+    async def _wait_for_poll_slot(self) -> None:
+        """Space audio-status requests out to respect poll_rate_limit across all episodes"""
+        if not self.poll_rate_limit:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_poll_slot)
+        self._next_poll_slot = slot + 1.0 / self.poll_rate_limit
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def close(self) -> None:
+        self.transport.close()
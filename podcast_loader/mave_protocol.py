@@ -0,0 +1,315 @@
+"""Request building and response parsing for the mave.digital API.
+
+Shared by the synchronous MaveDigitalUploader and AsyncMaveDigitalUploader so the
+request shapes only exist once; each uploader only decides how requests are sent.
+"""
+import base64
+import json
+import os
+import random
+import string
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from podcast_loader.audio_format import SNIFF_BYTES, detect_audio_format, sniff_audio_format
+
+DEFAULT_BASE_URL = "https://api.mave.digital/v1"
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
+
+
+def _multipart_parts(boundary: str, filename: str, content_type: str, fields: Dict[str, str]):
+    """(head, tail) of a multipart form whose file part content goes between them"""
+    # File part header; the file bytes follow it directly
+    head = b'\r\n'.join([
+        f'--{boundary}'.encode('utf-8'),
+        f'Content-Disposition: form-data; name="audio"; filename="{filename}"'.encode('utf-8'),
+        f'Content-Type: {content_type}'.encode('utf-8'),
+        b'',
+        b'',
+    ])
+
+    # Remaining form fields and the closing boundary
+    tail = []
+    for name, value in fields.items():
+        tail.append(f'--{boundary}'.encode('utf-8'))
+        tail.append(f'Content-Disposition: form-data; name="{name}"'.encode('utf-8'))
+        tail.append(b'')
+        tail.append(value.encode('utf-8'))
+    tail.append(f'--{boundary}--'.encode('utf-8'))
+    return head, b'\r\n' + b'\r\n'.join(tail)
+
+
+class MultipartFileBody:
+    """Multipart form body that streams the audio file from disk in fixed-size chunks"""
+
+    def __init__(self, boundary: str, file_path: str, fields: Dict[str, str],
+                 content_type: str = 'audio/mpeg', chunk_size: int = 1024 * 1024,
+                 progress: Optional[Callable[[int], None]] = None):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.progress = progress  # called with the size of each file chunk as it is sent
+        self.head, self.tail = _multipart_parts(boundary, os.path.basename(file_path), content_type, fields)
+        self.file_size = os.path.getsize(file_path)
+        self.content_length = len(self.head) + self.file_size + len(self.tail)
+
+    def __len__(self) -> int:
+        return self.content_length
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.head
+        yield from _read_file(self.file_path, 0, self.file_size, self.chunk_size, self.progress)
+        yield self.tail
+
+
+class MultipartStreamBody:
+    """Multipart form body that pipes audio from an AudioSource (see audio_source) as it is read.
+
+    The source is opened right away so its first bytes can be sniffed for the content
+    type; at most `chunk_size` bytes are held in memory, and reading only continues as
+    fast as the connection takes the body. content_length is None when the source
+    does not know its size, and the body is then sent with chunked transfer encoding.
+    Iterating again reopens the source, which fails for sources that are not replayable.
+    """
+
+    def __init__(self, boundary: str, source, fields: Dict[str, str], content_type: Optional[str] = None,
+                 chunk_size: int = 1024 * 1024, progress: Optional[Callable[[int], None]] = None):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._stream, size = source.open()
+        self._first = self._stream.read(SNIFF_BYTES)
+        content_type = content_type or sniff_audio_format(self._first).content_type
+        self.head, self.tail = _multipart_parts(boundary, source.name, content_type, fields)
+        self.size = size
+        self.content_length = len(self.head) + size + len(self.tail) if size is not None else None
+
+    @property
+    def replayable(self) -> bool:
+        return self.source.replayable
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._stream is None:
+            self._stream, size = self.source.open()
+            self._first = b''
+            if size != self.size:
+                self._stream.close()
+                raise Exception(f"{self.source.name} changed size between attempts")
+        stream, self._stream = self._stream, None
+        sent = 0
+        try:
+            yield self.head
+            chunk = self._first
+            while True:
+                if chunk:
+                    sent += len(chunk)
+                    yield chunk
+                    if self.progress is not None:
+                        self.progress(len(chunk))
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+        finally:
+            stream.close()
+        if self.size is not None and sent != self.size:
+            raise Exception(f"{self.source.name} ended after {sent} of {self.size} bytes")
+        yield self.tail
+
+
+class FileRange:
+    """Request body that streams `length` bytes of a file starting at `offset`"""
+
+    def __init__(self, file_path: str, offset: int, length: int, chunk_size: int = 1024 * 1024,
+                 progress: Optional[Callable[[int], None]] = None):
+        self.file_path = file_path
+        self.offset = offset
+        self.length = length
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        return _read_file(self.file_path, self.offset, self.length, self.chunk_size, self.progress)
+
+
+def _read_file(file_path: str, offset: int, length: int, chunk_size: int,
+               progress: Optional[Callable[[int], None]]) -> Iterator[bytes]:
+    """Yield exactly `length` bytes of a file from `offset`; the request declared that many.
+
+    A file that is cut short while it is read raises OSError instead of leaving the
+    server waiting for the rest of the Content-Length.
+    """
+    remaining = length
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                raise OSError(f"{file_path} ended after {length - remaining} of {length} bytes; "
+                              f"was it changed during the upload?")
+            remaining -= len(chunk)
+            yield chunk
+            if progress is not None:
+                progress(len(chunk))
+
+
+class PollPolicy:
+    """Backoff settings for audio-status polling"""
+
+    def __init__(self, max_attempts: int = 30, base_delay: float = 2.0, max_delay: float = 10.0,
+                 factor: float = 1.5, jitter: float = 0.1):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given (zero-based) attempt, with +/- jitter to spread polls out"""
+        delay = min(self.base_delay * (self.factor ** attempt), self.max_delay)
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(delay, self.max_delay)
+
+
+def _json_request(url: str, method: str, data: Optional[Dict] = None,
+                  access_token: Optional[str] = None) -> urllib.request.Request:
+    request = urllib.request.Request(url, method=method)
+    if access_token:
+        request.add_header('Authorization', f'Bearer {access_token}')
+    if data is not None:
+        request.add_header('Content-Type', 'application/json')
+        request.data = json.dumps(data).encode('utf-8')
+    request.add_header('Accept', 'application/json')
+    return request
+
+
+def parse_json(body: bytes) -> Dict[str, Any]:
+    return json.loads(body.decode('utf-8'))
+
+
+def http_error_message(error: urllib.error.HTTPError) -> str:
+    return error.read().decode('utf-8')
+
+
+def login_request(base_url: str, email: str, password: str) -> urllib.request.Request:
+    return _json_request(f"{base_url}/auth/login", 'POST', {
+        'email': email,
+        'password': password
+    })
+
+
+def refresh_request(base_url: str, refresh_token: str) -> urllib.request.Request:
+    # Assumed to mirror /auth/login: returns a new access_token (and possibly a new refresh_token)
+    return _json_request(f"{base_url}/auth/refresh", 'POST', {
+        'refresh_token': refresh_token
+    })
+
+
+def upload_audio_request(base_url: str, access_token: str, podcast_id: str, audio_file_path: str,
+                         progress: Optional[Callable[[int], None]] = None,
+                         content_type: Optional[str] = None) -> urllib.request.Request:
+    # Without an explicit content type, the one matching the file's actual header is sent
+    content_type = content_type or detect_audio_format(audio_file_path).content_type
+    boundary = '----WebKitFormBoundary' + ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(16))
+    body = MultipartFileBody(boundary, audio_file_path, {'podcast_id': podcast_id},
+                             content_type=content_type, progress=progress)
+
+    request = urllib.request.Request(f"{base_url}/episodes/upload-audio", method='POST')
+    request.add_header('Authorization', f'Bearer {access_token}')
+    request.add_header('Content-Type', f'multipart/form-data; boundary={boundary}')
+    # Assigning data resets Content-Length, so the header has to be added afterwards
+    request.data = body
+    request.add_header('Content-Length', str(len(body)))
+    return request
+
+
+def upload_audio_stream_request(base_url: str, access_token: str, podcast_id: str, source,
+                                progress: Optional[Callable[[int], None]] = None,
+                                content_type: Optional[str] = None) -> urllib.request.Request:
+    """Like upload_audio_request, but the audio is piped from an AudioSource while it is sent"""
+    boundary = '----WebKitFormBoundary' + ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(16))
+    body = MultipartStreamBody(boundary, source, {'podcast_id': podcast_id},
+                               content_type=content_type, progress=progress)
+
+    request = urllib.request.Request(f"{base_url}/episodes/upload-audio", method='POST')
+    request.add_header('Authorization', f'Bearer {access_token}')
+    request.add_header('Content-Type', f'multipart/form-data; boundary={boundary}')
+    request.data = body
+    if body.content_length is not None:
+        request.add_header('Content-Length', str(body.content_length))
+    # Otherwise http.client sends the body with Transfer-Encoding: chunked
+    return request
+
+
+def audio_status_request(base_url: str, access_token: str, episode_id: str) -> urllib.request.Request:
+    return _json_request(f"{base_url}/episodes/{episode_id}/audio-status", 'GET', access_token=access_token)
+
+
+def publish_request(base_url: str, access_token: str, episode_id: str, title: str, description: str,
+                    is_explicit: bool = False, is_private: bool = False,
+                    season: int = 1, number: int = 1, optimize_bitrate: bool = True,
+                    publish_date: Optional[str] = None) -> urllib.request.Request:
+    data = {
+        'title': title,
+        'description': description,
+        'type': 'full',
+        'season': season,
+        'number': number,
+        'is_explicit': is_explicit,
+        'is_optimize_bitrate': optimize_bitrate,
+        'is_private': is_private,
+        'plans': []
+    }
+    # YYYY-MM-DD; left to the server when not given
+    if publish_date is not None:
+        data['publish_date'] = publish_date
+    return _json_request(f"{base_url}/episodes/{episode_id}/publish", 'POST', data, access_token=access_token)
+
+
+# Chunked uploads follow the tus 1.0 resumable upload protocol: a POST creates an upload
+# session, PATCH requests append ranges at the offset the server has acknowledged, and
+# HEAD reports that offset after a failure. The PATCH completing the file returns the
+# same JSON body as the single-request upload ({"episode_id": ...}).
+TUS_VERSION = '1.0.0'
+
+
+def chunked_upload_create_request(base_url: str, access_token: str, podcast_id: str, audio_file_path: str,
+                                  content_type: Optional[str] = None) -> urllib.request.Request:
+    metadata = {
+        'filename': os.path.basename(audio_file_path),
+        'podcast_id': podcast_id,
+        'content_type': content_type or detect_audio_format(audio_file_path).content_type,
+    }
+    request = urllib.request.Request(f"{base_url}/episodes/upload-audio/resumable", method='POST')
+    request.add_header('Authorization', f'Bearer {access_token}')
+    request.add_header('Tus-Resumable', TUS_VERSION)
+    request.add_header('Upload-Length', str(os.path.getsize(audio_file_path)))
+    request.add_header('Upload-Metadata', ','.join(
+        f"{key} {base64.b64encode(value.encode('utf-8')).decode('ascii')}" for key, value in metadata.items()
+    ))
+    request.data = b''
+    return request
+
+
+def chunked_upload_patch_request(upload_url: str, access_token: str, audio_file_path: str,
+                                 offset: int, length: int,
+                                 progress: Optional[Callable[[int], None]] = None) -> urllib.request.Request:
+    body = FileRange(audio_file_path, offset, length, progress=progress)
+    request = urllib.request.Request(upload_url, method='PATCH')
+    request.add_header('Authorization', f'Bearer {access_token}')
+    request.add_header('Tus-Resumable', TUS_VERSION)
+    request.add_header('Upload-Offset', str(offset))
+    request.add_header('Content-Type', 'application/offset+octet-stream')
+    request.data = body
+    request.add_header('Content-Length', str(len(body)))
+    return request
+
+
+def chunked_upload_offset_request(upload_url: str, access_token: str) -> urllib.request.Request:
+    request = urllib.request.Request(upload_url, method='HEAD')
+    request.add_header('Authorization', f'Bearer {access_token}')
+    request.add_header('Tus-Resumable', TUS_VERSION)
+    return request
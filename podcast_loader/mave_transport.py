@@ -0,0 +1,418 @@
+import email.message
+import email.utils
+import http.client
+import io
+import json
+import random
+import select
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class PooledResponse:
+    """Fully read HTTP response returned by ConnectionPool.open"""
+
+    def __init__(self, url: str, status: int, reason: str, headers: http.client.HTTPMessage, body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def read(self) -> bytes:
+        return self.body
+
+    def getcode(self) -> int:
+        return self.status
+
+
+def is_replayable(request: urllib.request.Request) -> bool:
+    """False when the request body streams from a source that cannot be read twice, such as stdin"""
+    return getattr(request.data, 'replayable', True)
+
+
+# A transport is any object with open(request) and close(). open() takes a
+# urllib.request.Request, returns a response with `status`, `headers` and read(), and
+# raises urllib.error.HTTPError for 4xx/5xx answers and URLError when no answer
+# arrived. MaveDigitalUploader accepts any of ConnectionPool (the default),
+# UrllibTransport and FakeTransport, and wraps it in TimingTransport and RetryingTransport.
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive http.client connections.
+
+    `open()` accepts the same urllib.request.Request objects as an OpenerDirector
+    and raises the same urllib.error.HTTPError/URLError exceptions, so it can be
+    used as a drop-in transport. Idle connections are kept per scheme/host/port
+    and handed to one worker at a time.
+
+    An idle connection the server has already closed is discarded before it is
+    reused. Only GET and HEAD requests are resent by the pool itself when a reused
+    connection turns out to be dead; any other request may already have been
+    applied, so whether to resend it is left to RetryingTransport.
+
+    Requests to hosts that the environment routes through a proxy (HTTP_PROXY,
+    HTTPS_PROXY, NO_PROXY) are handed to a UrllibTransport, as the pool cannot
+    tunnel through one. Pass proxies={} to always connect directly.
+    """
+
+    RESEND_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, max_idle_per_host: int = 8,
+                 timeout: Optional[float] = None, ssl_context: Optional[ssl.SSLContext] = None,
+                 proxies: Optional[Dict[str, str]] = None):
+        self.headers = headers or {}
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._ssl_context = ssl_context
+        self.connections_opened = 0
+        self.proxies = urllib.request.getproxies() if proxies is None else proxies
+        self._idle = {}  # (scheme, host, port) -> list of idle connections
+        self._direct = {}  # (scheme, host) -> False when requests go through a proxy
+        self._proxy_transport: Optional['UrllibTransport'] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        # Loading the CA certificates takes tens of milliseconds, so only HTTPS hosts pay for it
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    def open(self, request: urllib.request.Request) -> PooledResponse:
+        """Send a request over a pooled connection and return the fully read response"""
+        parts = urllib.parse.urlsplit(request.full_url)
+        if not self._is_direct(parts.scheme, parts.hostname):
+            return self._proxied().open(request)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        headers = dict(self.headers)
+        headers.update(request.header_items())
+        method = request.get_method()
+
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request(method, request.selector, body=request.data, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                connection.close()
+                # The server dropped an idle keep-alive connection; resend on a fresh one
+                # unless the request may have been applied before the connection died
+                if reused and method in self.RESEND_METHODS:
+                    continue
+                raise urllib.error.URLError(e)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise urllib.error.URLError(e)
+            except Exception:
+                # e.g. a streamed request body that failed to read; the connection is mid-request
+                connection.close()
+                raise
+            break
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+
+        if response.status >= 400:
+            raise urllib.error.HTTPError(request.full_url, response.status, response.reason,
+                                         response.headers, io.BytesIO(body))
+        return PooledResponse(request.full_url, response.status, response.reason, response.headers, body)
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _is_direct(self, scheme: str, host: str) -> bool:
+        direct = self._direct.get((scheme, host))
+        if direct is None:
+            direct = scheme not in self.proxies or bool(urllib.request.proxy_bypass(host))
+            self._direct[(scheme, host)] = direct
+        return direct
+
+    def _proxied(self) -> 'UrllibTransport':
+        with self._lock:
+            if self._proxy_transport is None:
+                self._proxy_transport = UrllibTransport(self.headers, self.timeout)
+            return self._proxy_transport
+
+    def _acquire(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        while True:
+            with self._lock:
+                connections = self._idle.get(key)
+                if not connections:
+                    self.connections_opened += 1
+                    break
+                connection = connections.pop()
+            if not _is_dropped(connection):
+                return connection, True
+            connection.close()
+
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def _release(self, key: Tuple[str, str, int], connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            connections: List[http.client.HTTPConnection] = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+
+def _is_dropped(connection: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket has nothing to read; if it is readable the server
+    # has closed it (or sent something unsolicited) and it must not be reused
+    if connection.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class UrllibTransport:
+    """Sends every request through a urllib OpenerDirector, on a new connection each time.
+
+    Honours proxy settings from the environment; ConnectionPool uses one for the
+    hosts that have a proxy.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
+        self.opener = urllib.request.build_opener()
+        self.opener.addheaders = list((headers or {}).items())
+        self.timeout = timeout
+
+    def open(self, request: urllib.request.Request) -> PooledResponse:
+        kwargs = {} if self.timeout is None else {'timeout': self.timeout}
+        with self.opener.open(request, **kwargs) as response:
+            return PooledResponse(request.full_url, response.status, response.reason, response.headers,
+                                  response.read())
+
+    def close(self) -> None:
+        pass
+
+
+class FakeTransport:
+    """In-memory transport for tests and demos: requests never leave the process.
+
+    handler(method, url, headers, body) returns (status, body) or (status, body,
+    headers); the body may be bytes or a JSON-serialisable value. Streamed request
+    bodies are read in full first, so upload progress callbacks fire as on the wire.
+    Every request is kept in `requests` as (method, url, headers, body).
+    """
+
+    def __init__(self, handler: Callable[[str, str, Dict[str, str], bytes], tuple]):
+        self.handler = handler
+        self.requests: List[Tuple[str, str, Dict[str, str], bytes]] = []
+        self._lock = threading.Lock()
+
+    def open(self, request: urllib.request.Request) -> PooledResponse:
+        data = request.data
+        if data is None or isinstance(data, bytes):
+            body = data or b''
+        else:
+            body = b''.join(data)
+        method, headers = request.get_method(), dict(request.header_items())
+        with self._lock:
+            self.requests.append((method, request.full_url, headers, body))
+        status, response_body, *rest = self.handler(method, request.full_url, headers, body)
+        if not isinstance(response_body, bytes):
+            response_body = json.dumps(response_body).encode('utf-8')
+        response_headers = email.message.Message()
+        for name, value in (rest[0] if rest else {}).items():
+            response_headers[name] = str(value)
+        reason = http.client.responses.get(status, '')
+        if status >= 400:
+            raise urllib.error.HTTPError(request.full_url, status, reason, response_headers,
+                                         io.BytesIO(response_body))
+        return PooledResponse(request.full_url, status, reason, response_headers, response_body)
+
+    def close(self) -> None:
+        pass
+
+
+class RetryPolicy:
+    """When and how long to wait before resending a failed request.
+
+    Idempotent methods are retried after connection errors and 408/429/5xx responses.
+    POST and PATCH are only retried when the server refused the request outright
+    (429, 503), so an upload or publish is never sent twice after it may have been
+    applied. Backoff grows exponentially with full jitter; a Retry-After header from
+    the server takes precedence, capped at max_retry_after.
+    """
+
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+    RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+    REFUSED_STATUSES = (429, 503)
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 max_retry_after: float = 120.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, method: str, error: urllib.error.URLError) -> bool:
+        idempotent = method in self.IDEMPOTENT_METHODS
+        if isinstance(error, urllib.error.HTTPError):
+            return error.code in (self.RETRY_STATUSES if idempotent else self.REFUSED_STATUSES)
+        return idempotent
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the given (zero-based) retry"""
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.base_delay * (2 ** attempt), self.max_delay))
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe client-side rate limiter allowing `rate` requests per second with bursts of `burst`.
+
+    `pause()` holds every caller back until a server-requested Retry-After has passed,
+    so one 429 slows down all workers rather than only the one that received it.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """Take `amount` tokens, sleeping until they are available; returns the seconds waited.
+
+        An amount larger than the burst is let through once the bucket is full and
+        leaves it in debt, so later callers wait until the rate has paid it off.
+        """
+        waited = 0.0
+        needed = min(amount, self.burst)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._not_before and self._tokens >= needed:
+                    self._tokens -= amount
+                    return waited
+                wait = max(self._not_before - now, (needed - self._tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._not_before = max(self._not_before, time.monotonic() + seconds)
+
+
+class RetryingTransport:
+    """Wraps a transport with a RetryPolicy and an optional TokenBucket.
+
+    Exposes the same `open(request)` interface and raises the last error once the
+    policy gives up, or at once for a body that cannot be sent again (is_replayable).
+    `stats` counts requests sent, retries and time spent waiting on the rate limiter.
+    """
+
+    def __init__(self, transport, policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
+        self.transport = transport
+        self.policy = policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'throttle_waits': 0, 'throttle_wait_seconds': 0.0}
+        self._lock = threading.Lock()
+
+    def open(self, request: urllib.request.Request):
+        method = request.get_method()
+        attempt = 0
+        while True:
+            self._throttle()
+            self._count('requests')
+            try:
+                return self.transport.open(request)
+            except urllib.error.URLError as e:
+                throttled = isinstance(e, urllib.error.HTTPError) and e.code == 429
+                if throttled:
+                    self._count('throttled')
+                if (attempt >= self.policy.max_retries or not self.policy.should_retry(method, e)
+                        or not is_replayable(request)):
+                    raise
+                retry_after = retry_after_seconds(e.headers) if isinstance(e, urllib.error.HTTPError) else None
+                delay = self.policy.delay(attempt, retry_after)
+                if throttled and self.rate_limiter is not None:
+                    self.rate_limiter.pause(delay)
+                attempt += 1
+                self._count('retries')
+                time.sleep(delay)
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def _throttle(self) -> None:
+        if self.rate_limiter is None:
+            return
+        waited = self.rate_limiter.acquire()
+        if waited:
+            with self._lock:
+                self.stats['throttle_waits'] += 1
+                self.stats['throttle_wait_seconds'] += waited
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+
+class TimingTransport:
+    """Wraps a transport and reports every request to observer(method, url, status, seconds).
+
+    status is the HTTP status code as a string, or 'error' when no response arrived.
+    """
+
+    def __init__(self, transport, observer: Callable[[str, str, str, float], None]):
+        self.transport = transport
+        self.observer = observer
+
+    def open(self, request: urllib.request.Request):
+        started = time.monotonic()
+        status = 'error'
+        try:
+            response = self.transport.open(request)
+            status = str(response.status)
+            return response
+        except urllib.error.HTTPError as e:
+            status = str(e.code)
+            raise
+        finally:
+            self.observer(request.get_method(), request.full_url, status, time.monotonic() - started)
+
+    def close(self) -> None:
+        self.transport.close()
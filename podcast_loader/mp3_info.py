@@ -0,0 +1,362 @@
+"""MP3 frame and tag parser for checking audio before upload, standard library only.
+
+The file is memory-mapped and only frame headers are decoded, so even multi-hour
+files are checked without reading the audio into Python objects.
+"""
+import mmap
+import os
+from typing import Dict, List, Optional, Tuple
+
+from podcast_loader.audio_format import MP3, UNKNOWN, detect_audio_format
+
+# Bitrates in kbps by (MPEG-1?, layer) and bitrate index
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1) and sample rate index
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+# Bits of a frame header that every frame of one stream shares: sync, version, layer, sample rate
+_STREAM_MASK = 0xFFFE0C00
+# Bits that decide a frame's length: the above plus bitrate and padding (protection and mode do not)
+_FRAME_MASK = 0xFFFEFE00
+
+# ID3v2 frame IDs (v2.3/2.4 and v2.2) of the tags used for episode metadata
+_TAG_FRAMES = {
+    'TIT2': 'title', 'TT2': 'title',
+    'TIT3': 'subtitle', 'TT3': 'subtitle',
+    'TRCK': 'track', 'TRK': 'track',
+    'TPOS': 'disc', 'TPA': 'disc',
+    'TALB': 'album', 'TAL': 'album',
+    'TPE1': 'artist', 'TP1': 'artist',
+    'COMM': 'comment', 'COM': 'comment',
+}
+_TEXT_ENCODINGS = ('latin-1', 'utf-16', 'utf-16-be', 'utf-8')
+
+
+class Mp3Error(ValueError):
+    """The file is not an MP3 that can be parsed"""
+
+
+class Mp3Info:
+    """What parse_mp3 found; `problems` lists what would make the upload fail or sound wrong"""
+
+    def __init__(self):
+        self.version = None         # 1, 2 or 2.5
+        self.layer = None
+        self.sample_rate = 0
+        self.channels = 0
+        self.frames = 0
+        self.samples = 0
+        self.audio_bytes = 0        # bytes of the MPEG frames, without tags
+        self.junk_bytes = 0         # bytes between frames that are not frames
+        self.vbr_header = None      # 'Xing', 'Info' or 'VBRI'
+        self.tags: Dict[str, str] = {}
+        self.problems: List[str] = []
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def bitrate(self) -> int:
+        """Average bitrate in kbps"""
+        return round(self.audio_bytes * 8 / self.duration / 1000) if self.duration else 0
+
+    @property
+    def truncated(self) -> bool:
+        return any(problem.startswith('truncated') for problem in self.problems)
+
+
+def _frame_size(header: int) -> Optional[Tuple[int, int]]:
+    """(frame length in bytes, samples in the frame) for a 4-byte frame header, or None if invalid"""
+    if header & 0xFFE00000 != 0xFFE00000:
+        return None
+    version_bits = (header >> 19) & 3
+    layer = 4 - ((header >> 17) & 3)
+    bitrate_index = (header >> 12) & 15
+    rate_index = (header >> 10) & 3
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        # Reserved values; free-format streams (bitrate index 0) are not supported either
+        return None
+    mpeg1 = version_bits == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][rate_index]
+    padding = (header >> 9) & 1
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384
+    if layer == 3 and not mpeg1:
+        return 72 * bitrate // sample_rate + padding, 576
+    return 144 * bitrate // sample_rate + padding, 1152
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _split_text(encoding: int, data: bytes) -> Tuple[str, bytes]:
+    """Decode the first null-terminated string of an ID3v2 text field; returns (text, what follows)"""
+    codec = _TEXT_ENCODINGS[encoding] if encoding < len(_TEXT_ENCODINGS) else 'latin-1'
+    # The terminator is two bytes for UTF-16, and must start on an even offset
+    terminator = b'\0\0' if encoding in (1, 2) else b'\0'
+    end = data.find(terminator)
+    while end >= 0 and len(terminator) == 2 and end % 2:
+        end = data.find(terminator, end + 1)
+    if end < 0:
+        return data.decode(codec, 'replace').strip(), b''
+    return data[:end].decode(codec, 'replace').strip(), data[end + len(terminator):]
+
+
+def _parse_id3v2(tag: bytes, major: int, tags: Dict[str, str]) -> None:
+    """Collect the text frames listed in _TAG_FRAMES from the body of an ID3v2 tag"""
+    pos = 0
+    id_size, header_size = (3, 6) if major == 2 else (4, 10)
+    while pos + header_size <= len(tag):
+        frame_id = tag[pos:pos + id_size].decode('latin-1')
+        if not frame_id.strip('\0') or not frame_id.isalnum():
+            break  # padding
+        if major == 2:
+            size = int.from_bytes(tag[pos + 3:pos + 6], 'big')
+        elif major == 4:
+            size = _syncsafe(tag[pos + 4:pos + 8])
+        else:
+            size = int.from_bytes(tag[pos + 4:pos + 8], 'big')
+        body = tag[pos + header_size:pos + header_size + size]
+        pos += header_size + size
+
+        name = _TAG_FRAMES.get(frame_id)
+        if name is None or name in tags or not body:
+            continue
+        encoding = body[0]
+        if name == 'comment':
+            # Language (3 bytes) and a short description precede the comment text
+            _, text = _split_text(encoding, body[4:])
+            value, _ = _split_text(encoding, text)
+        else:
+            # Text frames may hold several null-separated values; keep the first
+            value, _ = _split_text(encoding, body[1:])
+        if value:
+            tags[name] = value
+
+
+def _read_id3v2(data, tags: Dict[str, str]) -> int:
+    """Parse the ID3v2 tags at the start of the file; returns the offset where the audio begins"""
+    pos = 0
+    while data[pos:pos + 3] == b'ID3' and len(data) >= pos + 10:
+        major, flags = data[pos + 3], data[pos + 5]
+        size = _syncsafe(data[pos + 6:pos + 10])
+        body = bytes(data[pos + 10:pos + 10 + size])
+        if flags & 0x80 and major < 4:
+            body = body.replace(b'\xff\x00', b'\xff')  # whole-tag unsynchronisation
+        if flags & 0x40:
+            # Skip the extended header; its size excludes itself in v2.3 only
+            extended = _syncsafe(body[:4]) if major == 4 else int.from_bytes(body[:4], 'big') + 4
+            body = body[extended:]
+        if major in (2, 3, 4):
+            _parse_id3v2(body, major, tags)
+        pos += 10 + size + (10 if flags & 0x10 else 0)
+    return pos
+
+
+def _read_trailing_tags(data, end: int, tags: Dict[str, str]) -> int:
+    """Skip an ID3v1 and/or APEv2 tag at the end of the file; returns where the audio ends"""
+    if end >= 128 and data[end - 128:end - 125] == b'TAG':
+        v1 = bytes(data[end - 128:end])
+        fields = {'title': v1[3:33], 'artist': v1[33:63], 'album': v1[63:93], 'comment': v1[97:127]}
+        if v1[125] == 0 and v1[126]:
+            # ID3v1.1: the last byte of the comment is the track number
+            fields['comment'] = v1[97:125]
+            tags.setdefault('track', str(v1[126]))
+        for name, value in fields.items():
+            value = value.split(b'\0', 1)[0].decode('latin-1').strip()
+            if value:
+                tags.setdefault(name, value)
+        end -= 128
+    if end >= 32 and data[end - 32:end - 24] == b'APETAGEX':
+        size = int.from_bytes(data[end - 20:end - 16], 'little')
+        flags = int.from_bytes(data[end - 12:end - 8], 'little')
+        end -= size + (32 if flags & 0x80000000 else 0)
+    return end
+
+
+def read_tags(path: str) -> Dict[str, str]:
+    """Only the ID3 tags of a file ('title', 'track', 'disc', 'comment', ...), without scanning the audio"""
+    tags: Dict[str, str] = {}
+    size = os.path.getsize(path)
+    if size == 0:
+        return tags
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        _read_id3v2(data, tags)
+        _read_trailing_tags(data, size, tags)
+    return tags
+
+
+def _find_stream(data, pos: int, end: int) -> int:
+    """Offset of the first frame header that is followed by a second, matching one, or -1"""
+    while True:
+        pos = data.find(b'\xff', pos, end - 3)
+        if pos < 0:
+            return -1
+        header = int.from_bytes(data[pos:pos + 4], 'big')
+        frame = _frame_size(header)
+        if frame is not None:
+            following = pos + frame[0]
+            if following + 4 > end:
+                return pos  # a single frame at the end of the file
+            if int.from_bytes(data[following:following + 4], 'big') & _STREAM_MASK == header & _STREAM_MASK:
+                return pos
+        pos += 1
+
+
+def _read_vbr_header(data, pos: int, header: int, info: Mp3Info) -> Tuple[Optional[int], Optional[int]]:
+    """Recognise a Xing/Info or VBRI header in the first frame; returns the declared (frames, bytes)"""
+    mpeg1 = (header >> 19) & 3 == 3
+    mono = (header >> 6) & 3 == 3
+    xing = pos + 4 + ((17 if mono else 32) if mpeg1 else (9 if mono else 17))
+    if data[xing:xing + 4] in (b'Xing', b'Info'):
+        info.vbr_header = data[xing:xing + 4].decode('ascii')
+        flags = int.from_bytes(data[xing + 4:xing + 8], 'big')
+        field = xing + 8
+        frames = total = None
+        if flags & 1:
+            frames = int.from_bytes(data[field:field + 4], 'big')
+            field += 4
+        if flags & 2:
+            total = int.from_bytes(data[field:field + 4], 'big')
+        return frames, total
+    if data[pos + 36:pos + 40] == b'VBRI':
+        info.vbr_header = 'VBRI'
+        return int.from_bytes(data[pos + 50:pos + 54], 'big'), int.from_bytes(data[pos + 46:pos + 50], 'big')
+    return None, None
+
+
+def _scan_frames(data, pos: int, end: int, stream: int, info: Mp3Info) -> None:
+    """Walk the frames from `pos` to `end`, adding them up in `info`"""
+    sizes: Dict[int, Optional[Tuple[int, int]]] = {}
+    frames = samples = audio_bytes = junk = 0
+    while pos + 4 <= end:
+        header = int.from_bytes(data[pos:pos + 4], 'big')
+        key = header & _FRAME_MASK
+        frame = sizes.get(key, False)
+        if frame is False:
+            frame = sizes[key] = _frame_size(header) if key & _STREAM_MASK == stream else None
+        if frame is None:
+            # Lost sync: skip to the next frame header of the same stream
+            following = _find_stream(data, pos + 1, end)
+            while following >= 0 and int.from_bytes(data[following:following + 4], 'big') & _STREAM_MASK != stream:
+                following = _find_stream(data, following + 1, end)
+            if following < 0:
+                following = end
+            junk += following - pos
+            pos = following
+            continue
+        length, frame_samples = frame
+        if pos + length > end:
+            info.problems.append(f"truncated: the last frame is missing {pos + length - end} bytes")
+            break
+        frames += 1
+        samples += frame_samples
+        audio_bytes += length
+        pos += length
+    else:
+        junk += end - pos
+    info.frames, info.samples, info.audio_bytes = frames, samples, audio_bytes
+    info.junk_bytes += junk
+
+
+def parse_mp3(path: str, scan: bool = True) -> Mp3Info:
+    """Read the tags and MPEG audio frames of a file: duration, bitrate and problems.
+
+    With scan=False, a Xing/Info or VBRI header (written by most encoders) is trusted
+    for the frame count, and truncation is only judged from its byte count, so the
+    check takes the same time for any length of file. Files without such a header,
+    or scan=True, have every frame header walked, which also finds damage in the middle.
+
+    Raises Mp3Error if no MPEG audio stream is found at all. Truncation (a last frame
+    cut short, or less audio than the VBR header declares) and large stretches of
+    data that are not frames are reported in `problems`.
+    """
+    info = Mp3Info()
+    size = os.path.getsize(path)
+    if size == 0:
+        raise Mp3Error(f"audio file '{path}' is empty")
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = _read_id3v2(data, info.tags)
+        end = _read_trailing_tags(data, size, info.tags)
+        pos = _find_stream(data, start, end)
+        if pos < 0:
+            raise Mp3Error(f"audio file '{path}' is not an MP3 file (no MPEG audio frames found)")
+        info.junk_bytes = pos - start
+
+        first = int.from_bytes(data[pos:pos + 4], 'big')
+        first_length, frame_samples = _frame_size(first)
+        version_bits = (first >> 19) & 3
+        info.version = {3: 1, 2: 2, 0: 2.5}[version_bits]
+        info.layer = 4 - ((first >> 17) & 3)
+        info.sample_rate = _SAMPLE_RATES[version_bits][(first >> 10) & 3]
+        info.channels = 1 if (first >> 6) & 3 == 3 else 2
+
+        declared_frames, declared_bytes = _read_vbr_header(data, pos, first, info)
+        if info.vbr_header is not None and not scan and declared_frames and declared_bytes:
+            # The declared byte count includes the header frame, which holds no audio
+            info.frames = declared_frames
+            info.samples = declared_frames * frame_samples
+            info.audio_bytes = min(declared_bytes, end - pos) - first_length
+            if end - pos < declared_bytes:
+                info.problems.append(f"truncated: {info.vbr_header} header declares {declared_bytes} bytes "
+                                     f"of audio but the file holds {end - pos}")
+            return info
+
+        if info.vbr_header is not None:
+            pos += first_length
+        _scan_frames(data, pos, end, first & _STREAM_MASK, info)
+
+    if info.frames == 0:
+        raise Mp3Error(f"audio file '{path}' is not an MP3 file (no complete MPEG audio frames)")
+    if declared_frames and info.frames < declared_frames:
+        info.problems.append(f"truncated: {info.vbr_header} header declares {declared_frames} frames "
+                             f"but only {info.frames} were found ({info.duration:.0f}s)")
+    if info.junk_bytes > max(64 * 1024, info.audio_bytes // 20):
+        info.problems.append(f"{info.junk_bytes} bytes of data between frames are not MPEG audio")
+    return info
+
+
+def check_mp3(path: str, scan: bool = False) -> Tuple[Optional[Mp3Info], Optional[str]]:
+    """(what parse_mp3 found, why the file should not be uploaded) for an audio file.
+
+    Files that start like another audio format (WAV, FLAC, ...) are not looked into
+    and give (None, None); anything else must be a readable MP3.
+    """
+    try:
+        if detect_audio_format(path) not in (MP3, UNKNOWN):
+            return None, None
+        info = parse_mp3(path, scan=scan)
+    except Mp3Error as e:
+        return None, str(e)
+    except OSError as e:
+        return None, f"audio file '{path}' cannot be read ({e.strerror})"
+    if info.problems:
+        return info, f"audio file '{path}' is damaged: {'; '.join(info.problems)}"
+    return info, None
+
+
+def episode_fields_from_tags(tags: Dict[str, str]) -> Dict[str, str]:
+    """Manifest fields (title, description, number, season) that the tags can provide"""
+    fields = {}
+    if tags.get('title'):
+        fields['title'] = tags['title']
+    description = tags.get('comment') or tags.get('subtitle')
+    if description:
+        fields['description'] = description
+    for field, tag in (('number', 'track'), ('season', 'disc')):
+        # "3/10" means the third of ten
+        value = tags.get(tag, '').split('/', 1)[0].strip()
+        if value.isdigit() and int(value) > 0:
+            fields[field] = value
+    return fields
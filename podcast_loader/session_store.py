@@ -0,0 +1,70 @@
+"""On-disk store of API session tokens, so CLI runs can skip the password login"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+def default_session_path() -> str:
+    config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(config_home, 'podcast-loader', 'session.json')
+
+
+class SessionStore:
+    """Maps (API base URL, account email) to the latest access and refresh tokens.
+
+    The file is created with mode 0600 and replaced atomically on every save, since
+    it holds credentials that are as good as the password until they expire.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_session_path()
+        self._lock = threading.Lock()
+
+    def load(self, base_url: str, email: str) -> Optional[Dict]:
+        """Return the saved {access_token, refresh_token, user_id} for this account, if any"""
+        with self._lock:
+            session = self._read().get(self._key(base_url, email))
+        if not session or not session.get('access_token'):
+            return None
+        return session
+
+    def save(self, base_url: str, email: str, access_token: str, refresh_token: Optional[str],
+             user_id=None) -> None:
+        with self._lock:
+            sessions = self._read()
+            sessions[self._key(base_url, email)] = {
+                'access_token': access_token,
+                'refresh_token': refresh_token,
+                'user_id': user_id,
+                'saved': time.time(),
+            }
+            self._write(sessions)
+
+    def clear(self, base_url: str, email: str) -> None:
+        with self._lock:
+            sessions = self._read()
+            if sessions.pop(self._key(base_url, email), None) is not None:
+                self._write(sessions)
+
+    @staticmethod
+    def _key(base_url: str, email: str) -> str:
+        return f"{base_url} {email.lower()}"
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, sessions: Dict[str, Dict]) -> None:
+        # Caller holds the lock; the temporary file is private before any token is written to it
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.chmod(tmp_path, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(sessions, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,104 @@
+"""Content-hash cache of uploaded audio, used to skip re-uploading unchanged files"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+def default_cache_path() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'podcast-loader', 'uploads.json')
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadCache:
+    """Maps (podcast_id, audio content hash) to the episode_id the audio was uploaded as.
+
+    File hashes are remembered per path together with size and mtime, so unchanged
+    files are not read again on the next run. Entries older than `max_age_days` are
+    dropped and at most `max_entries` of the most recent uploads are kept. With
+    `refresh=True` existing entries are ignored but new uploads are still recorded.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 5000, max_age_days: float = 90,
+                 refresh: bool = False):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 24 * 3600
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict] = {}    # absolute path -> {size, mtime_ns, sha256}
+        self._uploads: Dict[str, Dict] = {}  # "podcast_id:sha256" -> {episode_id, time}
+        self._load()
+
+    def lookup(self, podcast_id: str, audio_file: str) -> Optional[str]:
+        """Return the episode_id this exact audio was already uploaded as, if known"""
+        if self.refresh:
+            return None
+        key = f"{podcast_id}:{self.file_hash(audio_file)}"
+        with self._lock:
+            entry = self._uploads.get(key)
+        if entry is None or time.time() - entry['time'] > self.max_age:
+            return None
+        return entry['episode_id']
+
+    def store(self, podcast_id: str, audio_file: str, episode_id: str) -> None:
+        key = f"{podcast_id}:{self.file_hash(audio_file)}"
+        with self._lock:
+            self._uploads[key] = {'episode_id': episode_id, 'time': time.time()}
+            self._evict()
+            self._save()
+
+    def file_hash(self, audio_file: str) -> str:
+        """Content hash of a file, reusing the stored hash while size and mtime are unchanged"""
+        path = os.path.abspath(audio_file)
+        stat = os.stat(path)
+        with self._lock:
+            known = self._files.get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        sha256 = hash_file(path)
+        with self._lock:
+            self._files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        return sha256
+
+    def _evict(self) -> None:
+        # Caller holds the lock
+        cutoff = time.time() - self.max_age
+        uploads = sorted(((key, entry) for key, entry in self._uploads.items() if entry['time'] >= cutoff),
+                         key=lambda item: item[1]['time'], reverse=True)
+        self._uploads = dict(uploads[:self.max_entries])
+
+        hashes = {key.rsplit(':', 1)[1] for key in self._uploads}
+        self._files = {path: entry for path, entry in self._files.items() if entry['sha256'] in hashes}
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._files = data.get('files', {})
+        self._uploads = data.get('uploads', {})
+
+    def _save(self) -> None:
+        # Caller holds the lock; write to a temporary file so a crash never leaves a torn cache
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self._files, 'uploads': self._uploads}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,226 @@
+"""Phase timers, upload progress, request latency histograms and JSONL events for upload runs"""
+import bisect
+import contextlib
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional, TextIO
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Latencies kept per endpoint for percentiles; beyond this a uniform random sample is kept
+MAX_LATENCY_SAMPLES = 10000
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Group requests by endpoint: 'GET /episodes/{id}/audio-status' for any episode"""
+    segments = []
+    for segment in urllib.parse.urlsplit(url).path.strip('/').split('/'):
+        if segment == 'v1' and not segments:
+            continue
+        if len(segment) >= 8 and any(c.isdigit() for c in segment):
+            segment = '{id}'
+        segments.append(segment)
+    return f"{method} /{'/'.join(segments)}"
+
+
+class LatencyHistogram:
+    """Request latencies of one endpoint, with percentiles and fixed buckets.
+
+    Count, mean, max and buckets are exact. Percentiles are exact for the first
+    MAX_LATENCY_SAMPLES requests and estimated from a uniform sample of that many
+    after, so memory stays flat however long the uploader runs.
+    """
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, seconds: float, status: str) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if len(self.samples) < MAX_LATENCY_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling: every request so far is equally likely to be in the sample
+            index = random.randrange(self.count)
+            if index < MAX_LATENCY_SAMPLES:
+                self.samples[index] = seconds
+
+    def summary(self) -> Dict:
+        samples = sorted(self.samples)
+        if not samples:
+            return {'count': 0}
+
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+        buckets = {f"<={bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)}
+        buckets[f">{LATENCY_BUCKETS_MS[-1]}ms"] = self.buckets[-1]
+
+        return {
+            'count': self.count,
+            'statuses': dict(self.statuses),
+            'mean_ms': round(self.total / self.count * 1000, 1),
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(self.max * 1000, 1),
+            'buckets': buckets,
+        }
+
+
+class UploadMetrics:
+    """Thread-safe collector shared by all workers of an uploader.
+
+    - phase(name) times login, upload, processing_wait and publish steps
+    - upload_progress(n) counts body bytes as they are sent and drives the live
+      progress line (rate and ETA against the bytes given to plan())
+    - record_request() feeds per-endpoint latency histograms; it is called by the
+      TimingTransport that wraps the uploader's connection pool
+    - event() appends one JSON object per line to the events file, if one is open
+
+    summary() returns everything as a JSON-serialisable dict.
+    """
+
+    def __init__(self, events_file: Optional[TextIO] = None, progress_stream: Optional[TextIO] = None,
+                 progress_interval: float = 0.5):
+        self.events_file = events_file
+        self.progress_stream = progress_stream
+        self.progress_interval = progress_interval
+        self.started = time.monotonic()
+        self.planned_bytes = 0
+        self.planned_episodes = 0
+        self.bytes_sent = 0
+        self.counters: Dict[str, int] = {}
+        self.podcasts: Dict[str, Dict[str, int]] = {}  # podcast_id -> counters of that podcast alone
+        self._phases: Dict[str, List[float]] = {}  # name -> [count, total seconds, max seconds]
+        self._requests: Dict[str, LatencyHistogram] = {}
+        self._first_byte = None
+        self._last_progress = 0.0
+        self._lock = threading.Lock()
+
+    def plan(self, episodes: int, audio_bytes: int) -> None:
+        """Announce the work of the run so progress can show an ETA"""
+        with self._lock:
+            self.planned_episodes += episodes
+            self.planned_bytes += audio_bytes
+        self.event('plan', episodes=episodes, audio_bytes=audio_bytes)
+
+    def skip(self, audio_bytes: int) -> None:
+        """Remove audio that will not be uploaded after all (cache hits, resumed rows) from the plan"""
+        with self._lock:
+            self.planned_bytes = max(0, self.planned_bytes - audio_bytes)
+
+    def count(self, name: str, amount: int = 1, podcast_id: Optional[str] = None) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            if podcast_id is not None:
+                counters = self.podcasts.setdefault(podcast_id, {})
+                counters[name] = counters.get(name, 0) + amount
+
+    @contextlib.contextmanager
+    def phase(self, name: str, **fields):
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.add_phase(name, time.monotonic() - started, error=str(e), **fields)
+            raise
+        self.add_phase(name, time.monotonic() - started, **fields)
+
+    def add_phase(self, name: str, seconds: float, **fields) -> None:
+        with self._lock:
+            phase = self._phases.setdefault(name, [0, 0.0, 0.0])
+            phase[0] += 1
+            phase[1] += seconds
+            phase[2] = max(phase[2], seconds)
+        self.event('phase', phase=name, seconds=round(seconds, 4), **fields)
+
+    def record_request(self, method: str, url: str, status: str, seconds: float) -> None:
+        endpoint = endpoint_name(method, url)
+        with self._lock:
+            self._requests.setdefault(endpoint, LatencyHistogram()).add(seconds, status)
+        self.event('request', endpoint=endpoint, status=status, ms=round(seconds * 1000, 2))
+
+    def upload_progress(self, size: int) -> None:
+        with self._lock:
+            self.bytes_sent += size
+            now = time.monotonic()
+            if self._first_byte is None:
+                self._first_byte = now
+            if self.progress_stream is None or now - self._last_progress < self.progress_interval:
+                return
+            self._last_progress = now
+            line = self._progress_line(now)
+        self.progress_stream.write('\r' + line)
+        self.progress_stream.flush()
+
+    def finish_progress(self) -> None:
+        if self.progress_stream is not None and self._last_progress:
+            with self._lock:
+                line = self._progress_line(time.monotonic())
+            self.progress_stream.write('\r' + line + '\n')
+            self.progress_stream.flush()
+
+    def event(self, kind: str, **fields) -> None:
+        if self.events_file is None:
+            return
+        entry = {'time': round(time.time(), 4), 'event': kind}
+        entry.update(fields)
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            self.events_file.write(line)
+            self.events_file.flush()
+
+    def summary(self) -> Dict:
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            phases = {}
+            for name, (count, total, longest) in self._phases.items():
+                phases[name] = {
+                    'count': count,
+                    'total_s': round(total, 3),
+                    'mean_s': round(total / count, 3),
+                    'max_s': round(longest, 3),
+                }
+            requests = {endpoint: histogram.summary() for endpoint, histogram in sorted(self._requests.items())}
+            return {
+                'wall_s': round(elapsed, 3),
+                'episodes_planned': self.planned_episodes,
+                'bytes_sent': self.bytes_sent,
+                'upload_mb_per_s': round(self.bytes_sent / 1024 ** 2 / elapsed, 2) if elapsed else 0.0,
+                'counters': dict(self.counters),
+                'podcasts': {podcast_id: dict(counters) for podcast_id, counters in sorted(self.podcasts.items())},
+                'phases': phases,
+                'requests': requests,
+            }
+
+    def _progress_line(self, now: float) -> str:
+        # Caller holds the lock
+        elapsed = max(now - (self._first_byte or self.started), 1e-6)
+        rate = self.bytes_sent / elapsed
+        line = f"Uploaded {self.bytes_sent / 1024 ** 2:.1f}"
+        if self.planned_bytes:
+            remaining = max(0, self.planned_bytes - self.bytes_sent)
+            line += f"/{self.planned_bytes / 1024 ** 2:.1f} MB ({min(100.0, 100.0 * self.bytes_sent / self.planned_bytes):.0f}%)"
+            eta = f"{remaining / rate:.0f}s" if rate else '?'
+            line += f" at {rate / 1024 ** 2:.1f} MB/s, ETA {eta}"
+        else:
+            line += f" MB at {rate / 1024 ** 2:.1f} MB/s"
+        return line
+
+
+def default_progress_stream() -> Optional[TextIO]:
+    """Live progress goes to stderr, but only when it is a terminal"""
+    return sys.stderr if sys.stderr.isatty() else None
@@ -0,0 +1,126 @@
+"""Upload ordering and adaptive upload concurrency for the batch pipeline"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ORDERS = ('input', 'size', 'priority', 'fair')
+
+
+def _audio_size(episode: Dict) -> int:
+    # Rows without a local file (publish-only rows, URLs, missing files) sort as empty
+    audio_file = episode.get('audio_file')
+    if not audio_file:
+        return 0
+    try:
+        return os.path.getsize(audio_file)
+    except OSError:
+        return 0
+
+
+def order_episodes(rows: Iterable[Tuple[int, Dict]], order: str = 'input') -> Iterable[Tuple[int, Dict]]:
+    """Reorder (row, episode) pairs so that short uploads do not queue behind huge ones.
+
+    'size' puts the smallest audio files first; 'priority' sorts by the manifest's
+    priority column (highest first) and then by size; 'fair' takes one episode of each
+    podcast in turn, so a show with hundreds of episodes does not hold up the others
+    (episodes without a podcast_id count as one podcast). Row numbers are kept, so the
+    journal still refers to the manifest rows. Any order but 'input' has to read
+    the whole manifest before the first upload starts.
+    """
+    if order == 'input':
+        return rows
+    if order == 'size':
+        return sorted(rows, key=lambda item: _audio_size(item[1]))
+    if order == 'priority':
+        return sorted(rows, key=lambda item: (-item[1].get('priority', 0), _audio_size(item[1])))
+    if order == 'fair':
+        queues: Dict[Optional[str], List[Tuple[int, Dict]]] = {}
+        for item in rows:
+            queues.setdefault(item[1].get('podcast_id'), []).append(item)
+        # Round-robin: the n-th episode of every podcast before the (n+1)-th of any
+        return [item for _, item in sorted((turn, item) for queue in queues.values()
+                                           for turn, item in enumerate(queue))]
+    raise ValueError(f"Unknown upload order: {order}")
+
+
+class AdaptiveConcurrency:
+    """Upload slots that grow from `initial` towards `maximum` while aggregate throughput improves.
+
+    Every `interval` seconds the bytes reported by bytes_sent() are turned into an
+    upload rate. The rate is only judged while every slot is busy and uploads are
+    waiting for one, since otherwise more slots could not have helped. If the rate
+    beat the best one seen by at least `min_gain`, one more slot is opened; if the
+    last slot added did not pay off, it is closed again and the limit stays put.
+    Each change is reported to `log` (None for silence).
+    """
+
+    def __init__(self, bytes_sent: Callable[[], int], initial: int = 1, maximum: int = 8,
+                 interval: float = 5.0, min_gain: float = 0.1, log: Optional[Callable[[str], None]] = print):
+        self.bytes_sent = bytes_sent
+        self.log = log
+        self.initial = max(1, initial)
+        self.maximum = max(self.initial, maximum)
+        self.limit = self.initial
+        self.interval = interval
+        self.min_gain = min_gain
+        self.history: List[Tuple[int, float]] = []  # (limit, bytes per second) of every judged sample
+        self._best_rate = None
+        self._settled = self.initial >= self.maximum
+        self._active = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> 'AdaptiveConcurrency':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def __enter__(self):
+        with self._condition:
+            self._waiting += 1
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._waiting -= 1
+            self._active += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _log(self, message: str) -> None:
+        if self.log is not None:
+            self.log(message)
+
+    def _run(self) -> None:
+        last_time, last_bytes = time.monotonic(), self.bytes_sent()
+        while not self._stopped.wait(self.interval):
+            now, sent = time.monotonic(), self.bytes_sent()
+            rate = (sent - last_bytes) / (now - last_time)
+            last_time, last_bytes = now, sent
+            with self._condition:
+                if self._settled or self._active < self.limit or not self._waiting:
+                    continue
+                self.history.append((self.limit, rate))
+                if self._best_rate is None or rate >= self._best_rate * (1 + self.min_gain):
+                    self._best_rate = rate
+                    if self.limit < self.maximum:
+                        self.limit += 1
+                        self._log(f"Upload throughput {rate / 1024 ** 2:.1f} MB/s, "
+                                  f"raising upload concurrency to {self.limit}")
+                        self._condition.notify_all()
+                    else:
+                        self._settled = True
+                else:
+                    if self.limit > self.initial:
+                        self.limit -= 1
+                    self._settled = True
+                    self._log(f"Upload throughput stopped improving ({rate / 1024 ** 2:.1f} MB/s), "
+                              f"keeping upload concurrency at {self.limit}")
@@ -0,0 +1,187 @@
+"""Watch-folder ingest: turn audio files dropped into a directory into episodes for the pipeline"""
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import shutil
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from podcast_loader.episode_manifest import ManifestError, parse_episode
+
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.mp4', '.aac', '.ogg', '.wav', '.flac', '.aif', '.aiff')
+PUBLISHED_DIR = 'published'
+FAILED_DIR = 'failed'
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+
+def _open_inotify(directory: str) -> Optional[int]:
+    """inotify descriptor watching `directory` through libc, or None where it is not available"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def sidecar_path(audio_file: str) -> str:
+    return os.path.splitext(audio_file)[0] + '.json'
+
+
+class FolderWatcher:
+    """Yields an episode dict for every audio file that appears in `directory`.
+
+    A file is ready once its size and mtime have not changed for `settle` seconds and
+    its sidecar JSON (same name, .json extension) holds valid episode metadata, with
+    the same fields as a manifest row. The directory is watched with inotify where
+    available, so new files are noticed right away; elsewhere it is rescanned every
+    `interval` seconds. With fill_from_tags, fields the sidecar leaves blank are taken
+    from the ID3 tags of the audio. Call finish() when an episode is done to move its audio and
+    sidecar into the published/ or failed/ subdirectory, and stop() to end episodes().
+    Files that cannot be picked up yet are reported once each to `log` (None for silence).
+    """
+
+    def __init__(self, directory: str, settle: float = 5.0, interval: float = 2.0, fill_from_tags: bool = False,
+                 log: Optional[Callable[[str], None]] = print):
+        self.directory = os.path.abspath(directory)
+        self.log = log
+        self.settle = settle
+        self.interval = interval
+        self.fill_from_tags = fill_from_tags
+        self._seen: Dict[str, Tuple[int, int, float]] = {}  # path -> (size, mtime_ns, unchanged since)
+        self._submitted = set()
+        self._reported: Dict[str, str] = {}  # path -> last problem printed, so each is printed once
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._inotify = _open_inotify(self.directory)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def episodes(self) -> Iterator[Dict]:
+        """Yield ready episodes until stop() is called"""
+        try:
+            while not self._stopped.is_set():
+                ready, next_check = self._scan()
+                for episode in ready:
+                    yield episode
+                if not ready:
+                    self._wait(next_check)
+        finally:
+            if self._inotify is not None:
+                os.close(self._inotify)
+                self._inotify = None
+
+    def finish(self, audio_file: str, published: bool) -> None:
+        """Move a finished episode's audio and sidecar out of the watched directory"""
+        target = os.path.join(self.directory, PUBLISHED_DIR if published else FAILED_DIR)
+        os.makedirs(target, exist_ok=True)
+        for path in (audio_file, sidecar_path(audio_file)):
+            if os.path.exists(path):
+                shutil.move(path, os.path.join(target, os.path.basename(path)))
+        with self._lock:
+            self._submitted.discard(audio_file)
+            self._seen.pop(audio_file, None)
+
+    def _scan(self):
+        """Return (episodes that became ready, seconds until a pending file should be looked at again)"""
+        now = time.monotonic()
+        ready = []
+        next_check = self.interval
+        present = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                path = entry.path
+                present.add(path)
+                with self._lock:
+                    if path in self._submitted:
+                        continue
+                    size, mtime_ns, since = self._seen.get(path, (None, None, now))
+                    if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                        since = now
+                    self._seen[path] = (stat.st_size, stat.st_mtime_ns, since)
+                if stat.st_size == 0:
+                    continue
+                if now - since < self.settle:
+                    next_check = min(next_check, max(0.0, since + self.settle - now))
+                    continue
+
+                episode = self._read_sidecar(path)
+                if episode is not None:
+                    with self._lock:
+                        self._submitted.add(path)
+                    ready.append(episode)
+
+        with self._lock:
+            for path in list(self._seen):
+                if path not in present and path not in self._submitted:
+                    del self._seen[path]
+                    self._reported.pop(path, None)
+        return ready, next_check
+
+    def _read_sidecar(self, audio_file: str) -> Optional[Dict]:
+        sidecar = sidecar_path(audio_file)
+        try:
+            with open(sidecar, encoding='utf-8') as f:
+                row = json.load(f)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+            row['audio_file'] = audio_file
+            episode = parse_episode(sidecar, 1, row, self.fill_from_tags)
+        except FileNotFoundError:
+            self._report(audio_file, f"Waiting for metadata of '{os.path.basename(audio_file)}' "
+                                     f"in {os.path.basename(sidecar)}")
+            return None
+        except (OSError, ValueError) as e:
+            # Also covers ManifestError; the sidecar may still be being written, so keep watching it
+            message = str(e) if isinstance(e, ManifestError) else f"{sidecar}: {e}"
+            self._report(audio_file, f"Cannot use metadata for '{os.path.basename(audio_file)}': {message}")
+            return None
+        self._reported.pop(audio_file, None)
+        return episode
+
+    def _report(self, audio_file: str, message: str) -> None:
+        if self._reported.get(audio_file) != message:
+            self._reported[audio_file] = message
+            if self.log is not None:
+                self.log(message)
+
+    def _wait(self, timeout: float) -> None:
+        if self._inotify is None:
+            self._stopped.wait(timeout)
+            return
+        # Wake up on directory events, but at least once a second to notice stop()
+        readable, _, _ = select.select([self._inotify], [], [], min(timeout, 1.0))
+        if readable:
+            try:
+                while os.read(self._inotify, 65536):
+                    pass
+            except BlockingIOError:
+                pass
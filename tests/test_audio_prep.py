@@ -0,0 +1,81 @@
+"""AudioPreprocessor with a stand-in encoder, so ffmpeg is not needed"""
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from podcast_loader import audio_prep
+from podcast_loader.audio_prep import AudioPreprocessor
+
+# Called like ffmpeg; writes a fake MP3 to the last argument and counts its runs
+FAKE_ENCODER = '''#!/bin/sh
+for last; do :; done
+printf 'ID3' > "$last"
+echo run >> "$(dirname "$0")/runs"
+'''
+
+
+class AudioPreprocessorTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.encoder = os.path.join(self.dir, 'encoder')
+        with open(self.encoder, 'w') as f:
+            f.write(FAKE_ENCODER)
+        os.chmod(self.encoder, os.stat(self.encoder).st_mode | stat.S_IEXEC)
+        self.wav = os.path.join(self.dir, 'master.wav')
+        with open(self.wav, 'wb') as f:
+            f.write(b'RIFF\x00\x00\x00\x00WAVEfmt ' + bytes(4096))
+
+    def prepare(self):
+        """One run: a fresh preprocessor, as a new process would create"""
+        preprocessor = AudioPreprocessor(workers=1, cache_dir=os.path.join(self.dir, 'cache'),
+                                         encoder=self.encoder, log=None)
+        try:
+            with mock.patch.object(audio_prep, 'hash_file', wraps=audio_prep.hash_file) as hash_file:
+                return preprocessor.prepare(self.wav), hash_file.call_count
+        finally:
+            preprocessor.close()
+
+    def encoder_runs(self):
+        with open(os.path.join(self.dir, 'runs')) as f:
+            return len(f.readlines())
+
+    def test_unchanged_master_is_neither_hashed_nor_encoded_again(self):
+        first, hashed = self.prepare()
+        self.assertTrue(first.transcoded)
+        self.assertEqual(hashed, 1)
+
+        second, hashed = self.prepare()
+        self.assertEqual(second.path, first.path)
+        self.assertEqual(hashed, 0)
+        self.assertEqual(self.encoder_runs(), 1)
+
+    def test_master_with_a_new_mtime_is_hashed_again(self):
+        first, _ = self.prepare()
+        stat_result = os.stat(self.wav)
+        os.utime(self.wav, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10 ** 9))
+
+        second, hashed = self.prepare()
+        self.assertEqual(hashed, 1)
+        # Same content, so the encode is still reused
+        self.assertEqual(second.path, first.path)
+        self.assertEqual(self.encoder_runs(), 1)
+
+    def test_compressed_audio_is_uploaded_unchanged(self):
+        mp3 = os.path.join(self.dir, 'episode.mp3')
+        with open(mp3, 'wb') as f:
+            f.write(b'ID3' + bytes(100))
+        preprocessor = AudioPreprocessor(workers=1, cache_dir=os.path.join(self.dir, 'cache'),
+                                         encoder=self.encoder, log=None)
+        self.addCleanup(preprocessor.close)
+        prepared = preprocessor.prepare(mp3)
+        self.assertFalse(prepared.transcoded)
+        self.assertEqual(prepared.path, os.path.abspath(mp3))
+
+
+if __name__ == '__main__':
+    unittest.main()
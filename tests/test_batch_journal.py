@@ -0,0 +1,68 @@
+"""BatchJournal replay and what --resume restores from it"""
+import os
+import tempfile
+import unittest
+
+from podcast_loader.batch_journal import BatchJournal
+
+
+class BatchJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.journal = BatchJournal(BatchJournal.path_for(os.path.join(tmp.name, 'batch.csv')))
+
+    def restore(self, *episodes):
+        return list(self.journal.restore([dict(episode) for episode in episodes]))
+
+    def test_load_keeps_the_latest_step_of_each_row(self):
+        self.journal.record(0, 'a.mp3', 'uploaded', episode_id='e0')
+        self.journal.record(1, 'b.mp3', 'upload_failed')
+        self.journal.record(0, 'a.mp3', 'processed')
+        state = self.journal.load()
+        self.assertEqual((state[0]['step'], state[0]['episode_id']), ('processed', 'e0'))
+        self.assertEqual(state[1]['step'], 'upload_failed')
+
+    def test_truncated_last_line_is_ignored(self):
+        self.journal.record(0, 'a.mp3', 'uploaded', episode_id='e0')
+        with open(self.journal.path, 'a') as f:
+            f.write('{"row": 0, "audio_fi')
+        self.assertEqual(self.journal.load()[0]['step'], 'uploaded')
+
+    def test_matching_rows_get_their_episode_id_and_status_back(self):
+        self.journal.record(0, 'a.mp3', 'uploaded', episode_id='e0')
+        self.journal.record(1, None, 'published', episode_id='e1')
+        first, second = self.restore({'audio_file': 'a.mp3'}, {'episode_id': 'e1'})
+        self.assertEqual((first['episode_id'], first['status']), ('e0', 'uploaded'))
+        self.assertEqual(second['status'], 'published')
+
+    def test_row_that_now_names_another_file_is_not_restored(self):
+        self.journal.record(0, 'a.mp3', 'published', episode_id='e0')
+        self.journal.record(1, 'b.mp3', 'published', episode_id='e1')
+        # Rows reordered since the journal was written
+        first, second = self.restore({'audio_file': 'b.mp3'}, {'audio_file': 'a.mp3'})
+        self.assertNotIn('episode_id', first)
+        self.assertNotIn('status', second)
+
+    def test_row_that_names_another_episode_id_is_not_restored(self):
+        self.journal.record(0, 'a.mp3', 'uploaded', episode_id='e0')
+        episode, = self.restore({'audio_file': 'a.mp3', 'episode_id': 'other'})
+        self.assertEqual(episode['episode_id'], 'other')
+        self.assertNotIn('status', episode)
+
+    def test_new_file_at_a_row_discards_the_fields_of_the_old_one(self):
+        self.journal.record(0, 'a.mp3', 'uploaded', episode_id='e0')
+        self.journal.record(0, 'c.mp3', 'upload_failed')
+        self.assertNotIn('episode_id', self.journal.load()[0])
+        episode, = self.restore({'audio_file': 'c.mp3'})
+        self.assertNotIn('episode_id', episode)
+
+    def test_reset_discards_earlier_runs(self):
+        self.journal.record(0, 'a.mp3', 'uploaded', episode_id='e0')
+        self.journal.reset()
+        self.assertEqual(self.journal.load(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
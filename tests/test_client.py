@@ -0,0 +1,217 @@
+"""Client tests over FakeTransport: run with `python -m unittest` or `python -m pytest` from the repo root"""
+import io
+import itertools
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from podcast_loader import FakeTransport, MaveDigitalUploader, PollPolicy
+from podcast_loader.audio_source import StdinSource
+from podcast_loader.batch_journal import BatchJournal
+from podcast_loader.session_store import SessionStore
+
+BASE_URL = 'https://mave.test/v1'
+
+
+class FakeMave:
+    """Just enough of the API for the client: tokens, uploads, audio status and publishing"""
+
+    def __init__(self):
+        self.token = 'token-1'
+        self.upload_status = 200
+        self.failing_files = set()
+        self.published = {}
+        self._ids = itertools.count(1)
+
+    def __call__(self, method, url, headers, body):
+        path = url[len(BASE_URL):]
+        if path == '/auth/login':
+            return 200, {'access_token': self.token, 'refresh_token': 'refresh', 'user': {'id': 7, 'name': 'test'}}
+        if path == '/auth/refresh':
+            self.token = f'token-{next(self._ids)}'
+            return 200, {'access_token': self.token}
+        if headers.get('Authorization') != f'Bearer {self.token}':
+            return 401, {'error': 'token expired'}
+        if path == '/episodes/upload-audio':
+            if self.upload_status != 200 or any(name.encode() in body for name in self.failing_files):
+                return self.upload_status if self.upload_status != 200 else 500, {'error': 'upload rejected'}
+            return 200, {'episode_id': f'{next(self._ids):032x}'}
+        if path.endswith('/audio-status'):
+            return 200, {'audio_status': 'success', 'duration': 60}
+        if path.endswith('/publish'):
+            self.published[path.split('/')[2]] = json.loads(body)
+            return 200, {}
+        return 404, {'error': 'not found'}
+
+
+class ClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeMave()
+        self.transport = FakeTransport(self.server)
+        self.uploader = MaveDigitalUploader(self.transport, log=None)
+        self.uploader.base_url = BASE_URL
+        self.uploader.poll_policy = PollPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def audio_file(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(b'\xff\xfb\x90\x00' + bytes(1000))
+        return path
+
+    def requests_to(self, suffix):
+        return [request for request in self.transport.requests if request[1].endswith(suffix)]
+
+    def test_login(self):
+        self.uploader.login('a@b.c', 'secret')
+        self.assertEqual(self.uploader.access_token, 'token-1')
+        self.assertEqual(self.uploader.user_id, 7)
+        (method, url, headers, body), = self.transport.requests
+        self.assertEqual((method, url), ('POST', f'{BASE_URL}/auth/login'))
+        self.assertEqual(json.loads(body)['password'], 'secret')
+
+    def test_process_episodes_reports_failed_uploads(self):
+        self.uploader.login('a@b.c', 'secret')
+        self.server.failing_files.add('bad.mp3')
+        episodes = [{'audio_file': self.audio_file('good.mp3'), 'title': 'Good', 'description': 'd'},
+                    {'audio_file': self.audio_file('bad.mp3'), 'title': 'Bad', 'description': 'd'}]
+
+        report = self.uploader.process_episodes('podcast', episodes, concurrency=2)
+
+        self.assertFalse(report)
+        self.assertEqual([result.title for result in report.completed], ['Good'])
+        failed, = report.failed
+        self.assertEqual((failed.title, failed.status), ('Bad', 'upload_failed'))
+        self.assertIn('upload rejected', failed.error)
+        self.assertEqual([episode['title'] for episode in self.server.published.values()], ['Good'])
+
+    def test_report_is_in_input_order_whatever_the_upload_order(self):
+        self.uploader.login('a@b.c', 'secret')
+        episodes = []
+        for title, size in (('Large', 30000), ('Small', 10), ('Medium', 3000)):
+            path = self.audio_file(f'{title}.mp3')
+            with open(path, 'ab') as f:
+                f.write(bytes(size))
+            episodes.append({'audio_file': path, 'title': title, 'description': 'd'})
+
+        report = self.uploader.process_episodes('podcast', episodes, order='size')
+
+        self.assertEqual([(result.row, result.title) for result in report], [(0, 'Large'), (1, 'Small'), (2, 'Medium')])
+        self.assertEqual([episode['title'] for episode in self.server.published.values()], ['Small', 'Medium', 'Large'])
+
+    def test_only_rows_uploaded_earlier_are_skipped_in_the_byte_plan(self):
+        self.uploader.login('a@b.c', 'secret')
+        uploaded, failed = self.audio_file('uploaded.mp3'), self.audio_file('failed.mp3')
+        episodes = [{'audio_file': uploaded, 'title': 'Uploaded', 'description': 'd',
+                     'status': 'uploaded', 'episode_id': 'e' * 32},
+                    {'audio_file': failed, 'title': 'Failed', 'description': 'd', 'status': 'upload_failed'}]
+        self.uploader.metrics.plan(2, os.path.getsize(uploaded) + os.path.getsize(failed))
+
+        report = self.uploader.process_episodes('podcast', episodes)
+
+        self.assertTrue(report)
+        self.assertEqual(self.uploader.metrics.planned_bytes, os.path.getsize(failed))
+        self.assertEqual(len(self.requests_to('/episodes/upload-audio')), 1)
+
+    def run_batch(self, **kwargs):
+        """process_episodes on two files in a thread, so a hang fails the test instead of the run"""
+        self.uploader.login('a@b.c', 'secret')
+        episodes = [{'audio_file': self.audio_file(f'{n}.mp3'), 'title': str(n), 'description': 'd'} for n in (1, 2)]
+        outcome = {}
+
+        def target():
+            try:
+                outcome['report'] = self.uploader.process_episodes('podcast', episodes, concurrency=2, **kwargs)
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "process_episodes did not return")
+        return outcome
+
+    def test_failing_status_callback_is_raised_instead_of_hanging(self):
+        class BrokenJournal(BatchJournal):
+            def record(self, row, audio_file, step, **fields):
+                if step == 'processed':
+                    raise OSError('disk full')
+
+        outcome = self.run_batch(journal=BrokenJournal(os.path.join(self.tmp.name, 'journal.jsonl')))
+        self.assertIsInstance(outcome.get('error'), OSError)
+
+    def test_failing_publish_worker_is_raised(self):
+        def on_status(row, episode, status):
+            if status == 'published':
+                raise RuntimeError('hook failed')
+
+        outcome = self.run_batch(on_status=on_status)
+        self.assertEqual(str(outcome.get('error')), 'hook failed')
+        self.assertEqual(len(self.server.published), 2)
+
+    def test_publish_date_is_sent_only_when_given(self):
+        self.uploader.login('a@b.c', 'secret')
+        self.uploader.publish_episode('dated', 'Title', 'Description', publish_date='2024-05-31')
+        self.uploader.publish_episode('undated', 'Title', 'Description')
+        self.assertEqual(self.server.published['dated']['publish_date'], '2024-05-31')
+        self.assertNotIn('publish_date', self.server.published['undated'])
+
+    def test_audio_status(self):
+        self.uploader.login('a@b.c', 'secret')
+        self.assertEqual(self.uploader.audio_status('abc'), {'audio_status': 'success', 'duration': 60})
+
+    def test_expired_token_is_refreshed_and_the_request_resent(self):
+        self.uploader.login('a@b.c', 'secret')
+        self.server.token = 'token-rotated'
+
+        self.assertEqual(self.uploader.audio_status('abc')['audio_status'], 'success')
+
+        self.assertEqual(len(self.requests_to('/auth/refresh')), 1)
+        first, second = self.requests_to('/audio-status')
+        self.assertEqual(first[2]['Authorization'], 'Bearer token-1')
+        self.assertEqual(second[2]['Authorization'], f'Bearer {self.uploader.access_token}')
+
+    def test_stdin_upload_is_not_resent(self):
+        self.uploader.login('a@b.c', 'secret')
+        self.server.upload_status = 503
+
+        with self.assertRaisesRegex(Exception, 'can only be sent once'):
+            self.uploader.upload_audio('podcast', StdinSource(stream=io.BytesIO(b'audio')))
+
+        self.assertEqual(len(self.requests_to('/episodes/upload-audio')), 1)
+
+    def test_saved_session_is_renewed_before_a_stdin_upload(self):
+        store = SessionStore(os.path.join(self.tmp.name, 'session.json'))
+        store.save(BASE_URL, 'a@b.c', 'token-saved', 'refresh')
+        self.uploader.session_store = store
+        self.uploader.start_session('a@b.c')
+
+        self.uploader.upload_audio('podcast', StdinSource(stream=io.BytesIO(b'audio')))
+
+        (upload,) = self.requests_to('/episodes/upload-audio')
+        self.assertEqual(upload[2]['Authorization'], f'Bearer {self.server.token}')
+        self.assertIn(b'audio', upload[3])
+
+    def test_saved_session_is_renewed_once_before_batch_uploads(self):
+        messages = []
+        self.uploader.log = messages.append
+        store = SessionStore(os.path.join(self.tmp.name, 'session.json'))
+        store.save(BASE_URL, 'a@b.c', 'token-saved', 'refresh')
+        self.uploader.session_store = store
+        self.uploader.start_session('a@b.c')
+        episodes = [{'audio_file': self.audio_file(f'{n}.mp3'), 'title': str(n), 'description': 'd'} for n in (1, 2)]
+
+        self.assertTrue(self.uploader.process_episodes('podcast', episodes, concurrency=2))
+
+        self.assertEqual(len(self.requests_to('/auth/refresh')), 1)
+        self.assertEqual(len(self.requests_to('/episodes/upload-audio')), 2)
+        self.assertIn("Renewed the saved session before uploading", messages)
+        self.assertNotIn("Access token expired, refreshed the session", messages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Manifest parsing and the pre-flight check"""
+import os
+import tempfile
+import unittest
+
+from podcast_loader import ManifestError, read_manifest, validate_manifest
+
+HEADER = 'audio_file,title,description,season,number,is_explicit,publish_date,podcast_id\n'
+
+
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.audio = self.write('ep1.mp3', b'\xff\xfb\x90\x00' + bytes(1000), mode='wb')
+
+    def write(self, name, content, mode='w'):
+        path = os.path.join(self.dir, name)
+        with open(path, mode) as f:
+            f.write(content)
+        return path
+
+    def test_rows_are_parsed_into_episodes(self):
+        manifest = self.write('m.csv', HEADER + f'{self.audio},Title,Text,2,5,yes,2024-05-31,show\n'
+                                                f'{self.audio},Other,Text,,,,,\n')
+        first, second = read_manifest(manifest)
+        self.assertEqual(first, {'audio_file': self.audio, 'title': 'Title', 'description': 'Text', 'season': 2,
+                                 'number': 5, 'is_explicit': True, 'is_private': False,
+                                 'publish_date': '2024-05-31', 'podcast_id': 'show'})
+        self.assertEqual((second['season'], second['number'], second['is_explicit']), (1, 1, False))
+        self.assertNotIn('podcast_id', second)
+
+    def test_jsonl_rows(self):
+        manifest = self.write('m.jsonl', f'{{"audio_file": "{self.audio}", "title": "T", "description": "D", '
+                                         f'"is_private": true, "season": 3}}\n\n')
+        episode, = read_manifest(manifest)
+        self.assertEqual((episode['season'], episode['is_private']), (3, True))
+
+    def test_every_bad_row_is_reported_with_its_line(self):
+        missing = os.path.join(self.dir, 'missing.mp3')
+        empty = self.write('empty.mp3', '')
+        manifest = self.write('m.csv', HEADER + f'{self.audio},Good,Text,,,,,\n'
+                                                f'{self.audio},,Text,,,,,\n'
+                                                f'{self.audio},T,Text,two,,,,\n'
+                                                f'{self.audio},T,Text,0,,,,\n'
+                                                f'{self.audio},T,Text,,,maybe,,\n'
+                                                f'{self.audio},T,Text,,,,31/05/2024,\n'
+                                                f'{missing},T,Text,,,,,\n'
+                                                f'{empty},T,Text,,,,,\n')
+        check = validate_manifest(manifest)
+        self.assertEqual(check.rows, 8)
+        self.assertEqual(len(check.problems), 7)
+        for line, text in zip(range(3, 10), ("'title' is empty", "'season' must be a whole number",
+                                             "'season' must be at least 1", "'is_explicit' must be true or false",
+                                             "'publish_date' must be a date", 'missing.mp3', 'empty.mp3')):
+            self.assertIn(f'line {line}: ', check.problems[line - 3])
+            self.assertIn(text, check.problems[line - 3])
+        self.assertTrue(check.problems[5].endswith('does not exist'))
+        self.assertTrue(check.problems[6].endswith('is empty'))
+        self.assertEqual(check.audio_bytes, os.path.getsize(self.audio))
+
+    def test_missing_columns_and_broken_json_stop_the_check(self):
+        check = validate_manifest(self.write('m.csv', 'audio_file,title\nx,y\n'))
+        self.assertEqual(check.problems, [f"{self.dir}/m.csv, line 1: missing column(s): description"])
+        check = validate_manifest(self.write('m.jsonl', '{"title": "T"\n'))
+        self.assertIn('line 1: invalid JSON', check.problems[0])
+        with self.assertRaises(ManifestError):
+            list(read_manifest(self.write('list.jsonl', '[1, 2]\n')))
+
+    def test_podcast_id_required_when_not_given_on_the_command_line(self):
+        manifest = self.write('m.csv', HEADER + f'{self.audio},T,Text,,,,,show\n{self.audio},T,Text,,,,,\n')
+        check = validate_manifest(manifest, require_podcast_id=True)
+        self.assertEqual(check.podcasts, {'show'})
+        self.assertEqual(len(check.problems), 1)
+        self.assertIn("line 3: 'podcast_id' is empty", check.problems[0])
+
+    def test_check_audio_refuses_files_that_are_not_mp3(self):
+        not_mp3 = self.write('noise.mp3', bytes(range(256)) * 64, mode='wb')
+        manifest = self.write('m.csv', HEADER + f'{not_mp3},T,Text,,,,,\n')
+        self.assertEqual(validate_manifest(manifest).problems, [])
+        self.assertEqual(len(validate_manifest(manifest, check_audio=True).problems), 1)
+
+    def test_publish_only_rows_may_name_an_episode_id_instead_of_a_file(self):
+        manifest = self.write('m.csv', 'episode_id,title,description\nabc,T,D\n,T,D\n')
+        check = validate_manifest(manifest, publish_only=True)
+        self.assertEqual(len(check.problems), 1)
+        self.assertIn("line 3: 'episode_id' is empty", check.problems[0])
+        self.assertEqual(next(read_manifest(manifest, publish_only=True))['episode_id'], 'abc')
+
+
+if __name__ == '__main__':
+    unittest.main()
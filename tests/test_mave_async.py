@@ -0,0 +1,176 @@
+"""The asyncio client: AsyncConnectionPool against servers that drop connections, and a batch upload"""
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from podcast_loader import PollPolicy
+from podcast_loader.mave_async import AsyncConnectionPool, AsyncMaveDigitalUploader
+
+OK = b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok'
+
+
+def read_request(conn):
+    """Read one request with a Content-Length body; returns the body, or None at EOF"""
+    data = b''
+    while b'\r\n\r\n' not in data:
+        chunk = conn.recv(65536)
+        if not chunk:
+            return None
+        data += chunk
+    head, _, body = data.partition(b'\r\n\r\n')
+    length = next((int(line.split(b':')[1]) for line in head.split(b'\r\n')
+                   if line.lower().startswith(b'content-length:')), 0)
+    while len(body) < length:
+        body += conn.recv(65536)
+    return body
+
+
+class DroppingServer:
+    """Answers the first request of each connection, then reads the next one and hangs up"""
+
+    def __init__(self, close_after_response=False):
+        self.close_after_response = close_after_response
+        self.bodies = []
+        self.sock = socket.create_server(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                body = read_request(conn)
+                self.bodies.append(body)
+                conn.sendall(OK)
+                if self.close_after_response:
+                    continue
+                body = read_request(conn)
+                if body is not None:
+                    self.bodies.append(body)
+
+    def close(self):
+        self.sock.close()
+
+
+class AsyncConnectionPoolTest(unittest.TestCase):
+
+    def post(self, pool, server, body, method='POST'):
+        request = urllib.request.Request(f'http://127.0.0.1:{server.port}/x', data=body, method=method)
+        return pool.open(request)
+
+    def test_post_is_not_resent_when_a_reused_connection_dies(self):
+        server = DroppingServer()
+        self.addCleanup(server.close)
+
+        async def main():
+            pool = AsyncConnectionPool()
+            await self.post(pool, server, b'first')
+            with self.assertRaises(urllib.error.URLError):
+                await self.post(pool, server, b'second')
+            pool.close()
+
+        asyncio.run(main())
+        self.assertEqual(server.bodies, [b'first', b'second'])
+
+    def test_get_is_resent_when_a_reused_connection_dies(self):
+        server = DroppingServer()
+        self.addCleanup(server.close)
+
+        async def main():
+            pool = AsyncConnectionPool()
+            await self.post(pool, server, None, 'GET')
+            response = await self.post(pool, server, None, 'GET')
+            pool.close()
+            return response
+
+        self.assertEqual(asyncio.run(main()).read(), b'ok')
+
+    def test_connection_closed_while_idle_is_not_reused(self):
+        server = DroppingServer(close_after_response=True)
+        self.addCleanup(server.close)
+
+        async def main():
+            pool = AsyncConnectionPool()
+            await self.post(pool, server, b'first')
+            await asyncio.sleep(0.05)  # let the loop see the server's FIN
+            await self.post(pool, server, b'second')
+            pool.close()
+            return pool.connections_opened
+
+        self.assertEqual(asyncio.run(main()), 2)
+        self.assertEqual(server.bodies, [b'first', b'second'])
+
+
+class MaveHandler(BaseHTTPRequestHandler):
+    """Logs in anyone, rejects uploads of files named bad*.mp3 and processes the rest at once"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.endswith('/auth/login'):
+            self.reply(200, {'access_token': 'token', 'user': {'name': 'test'}})
+        elif self.path.endswith('/upload-audio'):
+            if b'filename="bad' in body:
+                self.reply(500, {'error': 'upload rejected'})
+            else:
+                self.reply(200, {'episode_id': os.urandom(16).hex()})
+        else:
+            self.reply(200, {})
+
+    def do_GET(self):
+        self.reply(200, {'audio_status': 'success', 'duration': 1})
+
+    def reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class AsyncUploaderTest(unittest.TestCase):
+
+    def test_process_episodes_returns_a_batch_report_in_input_order(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), MaveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        episodes = []
+        for name in ('bad.mp3', 'good.mp3'):
+            path = os.path.join(tmp.name, name)
+            with open(path, 'wb') as f:
+                f.write(b'ID3' + bytes(100))
+            episodes.append({'audio_file': path, 'title': name, 'description': 'd'})
+
+        async def main():
+            uploader = AsyncMaveDigitalUploader(log=None)
+            uploader.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+            uploader.poll_policy = PollPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01)
+            await uploader.login('a@b.c', 'secret')
+            report = await uploader.process_episodes('podcast', episodes)
+            await uploader.close()
+            return report
+
+        report = asyncio.run(main())
+        self.assertFalse(report)
+        self.assertEqual([(result.row, result.title, result.status) for result in report],
+                         [(0, 'bad.mp3', 'upload_failed'), (1, 'good.mp3', 'published')])
+        self.assertIn('upload rejected', report.failed[0].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Request bodies built by mave_protocol"""
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from podcast_loader import mave_protocol
+from podcast_loader.mave_protocol import FileRange, MultipartFileBody
+from podcast_loader.mave_transport import ConnectionPool
+
+
+class ReadingHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+class FileBodyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'episode.mp3')
+        with open(self.path, 'wb') as f:
+            f.write(bytes(range(256)) * 40)
+
+    def truncate(self, size):
+        with open(self.path, 'r+b') as f:
+            f.truncate(size)
+
+    def test_file_range_sends_exactly_its_length(self):
+        sent = []
+        body = FileRange(self.path, 100, 5000, chunk_size=1024, progress=sent.append)
+        data = b''.join(body)
+        self.assertEqual(len(data), len(body))
+        self.assertEqual(data[:3], bytes([100, 101, 102]))
+        self.assertEqual(sum(sent), 5000)
+
+    def test_file_range_of_a_file_cut_short_raises(self):
+        body = FileRange(self.path, 1000, 5000)
+        self.truncate(3000)
+        with self.assertRaisesRegex(OSError, 'ended after 2000 of 5000 bytes'):
+            b''.join(body)
+
+    def test_multipart_body_matches_its_content_length(self):
+        body = MultipartFileBody('boundary', self.path, {'podcast_id': 'p'})
+        self.assertEqual(len(b''.join(body)), len(body))
+
+    def test_multipart_body_of_a_file_that_changed_raises(self):
+        body = MultipartFileBody('boundary', self.path, {'podcast_id': 'p'})
+        self.truncate(100)
+        with self.assertRaises(OSError):
+            b''.join(body)
+
+    def test_pool_fails_fast_when_the_file_shrinks_during_upload(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), ReadingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        pool = ConnectionPool(timeout=30, proxies={})
+        self.addCleanup(pool.close)
+
+        request = mave_protocol.upload_audio_request(base_url, 'token', 'podcast', self.path)
+        self.truncate(100)
+        with self.assertRaises(urllib.error.URLError):
+            pool.open(request)
+
+
+if __name__ == '__main__':
+    unittest.main()
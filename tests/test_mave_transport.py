@@ -0,0 +1,138 @@
+"""Retries, Retry-After and the client-side rate limit, over FakeTransport"""
+import email.utils
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+from podcast_loader import FakeTransport, RetryPolicy, TokenBucket
+from podcast_loader.mave_transport import RetryingTransport, retry_after_seconds
+
+URL = 'https://mave.test/v1/episodes/e/audio-status'
+
+
+def scripted(*replies):
+    """Handler answering with the given replies in turn; an exception is raised instead of answering"""
+    replies = list(replies)
+
+    def handler(method, url, headers, body):
+        reply = replies.pop(0) if len(replies) > 1 else replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+    return handler
+
+
+class RetryingTransportTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('podcast_loader.mave_transport.time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open(self, method, *replies, **policy):
+        fake = FakeTransport(scripted(*replies))
+        transport = RetryingTransport(fake, RetryPolicy(**policy))
+        request = urllib.request.Request(URL, data=None if method in ('GET', 'HEAD') else b'{}', method=method)
+        try:
+            return transport.open(request), fake, transport
+        except urllib.error.URLError as e:
+            return e, fake, transport
+
+    def test_get_is_retried_after_server_errors_and_connection_failures(self):
+        response, fake, transport = self.open('GET', (503, b''), urllib.error.URLError('reset'), (200, b'ok'))
+        self.assertEqual(response.read(), b'ok')
+        self.assertEqual(len(fake.requests), 3)
+        self.assertEqual(transport.stats['retries'], 2)
+
+    def test_post_is_not_retried_after_an_error_it_may_have_been_applied_before(self):
+        for reply in ((500, b''), (502, b''), urllib.error.URLError('reset')):
+            error, fake, _ = self.open('POST', reply, (200, b'ok'))
+            self.assertIsInstance(error, urllib.error.URLError)
+            self.assertEqual(len(fake.requests), 1, reply)
+
+    def test_post_is_retried_when_the_server_refused_it(self):
+        for status in (429, 503):
+            response, fake, _ = self.open('POST', (status, b''), (200, b'ok'))
+            self.assertEqual(response.status, 200)
+            self.assertEqual(len(fake.requests), 2)
+
+    def test_client_errors_are_not_retried(self):
+        error, fake, _ = self.open('GET', (404, b''), (200, b'ok'))
+        self.assertEqual(error.code, 404)
+        self.assertEqual(len(fake.requests), 1)
+
+    def test_gives_up_after_max_retries(self):
+        error, fake, _ = self.open('GET', (503, b''), max_retries=3)
+        self.assertEqual(error.code, 503)
+        self.assertEqual(len(fake.requests), 4)
+
+    def test_retry_after_is_honoured_and_capped(self):
+        self.open('GET', (429, b'', {'Retry-After': '7'}), (429, b'', {'Retry-After': '600'}), (200, b'ok'),
+                  max_retry_after=60)
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [7.0, 60])
+
+    def test_backoff_grows_with_full_jitter(self):
+        self.open('GET', (503, b''), max_retries=6, base_delay=1, max_delay=10)
+        delays = [call.args[0] for call in self.sleep.call_args_list]
+        self.assertEqual(len(delays), 6)
+        for attempt, delay in enumerate(delays):
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(2 ** attempt, 10))
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def test_seconds_and_http_dates(self):
+        self.assertEqual(retry_after_seconds({'Retry-After': '3'}), 3.0)
+        self.assertEqual(retry_after_seconds({'Retry-After': '-3'}), 0.0)
+        later = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(retry_after_seconds({'Retry-After': later}), 30, delta=2)
+        self.assertIsNone(retry_after_seconds({'Retry-After': 'soon'}))
+        self.assertIsNone(retry_after_seconds({}))
+        self.assertIsNone(retry_after_seconds(None))
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=20, burst=3)
+        started = time.monotonic()
+        waits = [bucket.acquire() for _ in range(5)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        # Two more tokens at 20 per second
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_amount_above_the_burst_leaves_the_bucket_in_debt(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        self.assertEqual(bucket.acquire(3), 0.0)
+        self.assertGreaterEqual(bucket.acquire(), 0.25)
+
+    def test_429_pauses_every_caller_for_its_retry_after(self):
+        bucket = TokenBucket(rate=100)
+        throttled = threading.Event()
+
+        def handler(method, url, headers, body):
+            if not throttled.is_set():
+                throttled.set()
+                return 429, b'', {'Retry-After': '0.3'}
+            return 200, b'ok'
+
+        transport = RetryingTransport(FakeTransport(handler), rate_limiter=bucket)
+        first = threading.Thread(target=transport.open, args=(urllib.request.Request(URL),))
+        first.start()
+        throttled.wait(5)
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        transport.open(urllib.request.Request(URL))
+        first.join(5)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(transport.stats['throttled'], 1)
+        self.assertGreaterEqual(transport.stats['throttle_waits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
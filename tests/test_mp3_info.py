@@ -0,0 +1,110 @@
+"""parse_mp3 and the tag reader on synthetic files"""
+import os
+import tempfile
+import unittest
+
+from podcast_loader import parse_mp3, read_tags
+from podcast_loader.mp3_info import Mp3Error, check_mp3, episode_fields_from_tags
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo: 417 bytes, 418 with padding
+FRAME_HEADER = 0xFFFB9040
+
+
+def frame(padding=0, body=b''):
+    header = (FRAME_HEADER | padding << 9).to_bytes(4, 'big')
+    return header + body + bytes(417 + padding - 4 - len(body))
+
+
+def info_frame(frames, total):
+    """First frame holding an Info header (at offset 36 for MPEG-1 stereo) with frame and byte counts"""
+    return frame(body=bytes(32) + b'Info' + (3).to_bytes(4, 'big') + frames.to_bytes(4, 'big')
+                 + total.to_bytes(4, 'big'))
+
+
+def id3_tag(*frames):
+    body = b''.join(frame_id + len(data).to_bytes(4, 'big') + b'\0\0' + data for frame_id, data in frames)
+    size = len(body)
+    syncsafe = bytes([(size >> 21) & 127, (size >> 14) & 127, (size >> 7) & 127, size & 127])
+    return b'ID3\x03\x00\x00' + syncsafe + body
+
+
+class Mp3InfoTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def write(self, content, name='episode.mp3'):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_constant_bitrate_stream(self):
+        info = parse_mp3(self.write(b''.join(frame(n % 2) for n in range(100))))
+        self.assertEqual((info.version, info.layer, info.sample_rate, info.channels), (1, 3, 44100, 2))
+        self.assertEqual(info.frames, 100)
+        self.assertAlmostEqual(info.duration, 100 * 1152 / 44100)
+        self.assertEqual(info.bitrate, 128)
+        self.assertEqual((info.problems, info.junk_bytes), ([], 0))
+
+    def test_last_frame_cut_short_is_truncated(self):
+        path = self.write(b''.join(frame() for _ in range(10))[:-100])
+        info = parse_mp3(path)
+        self.assertTrue(info.truncated)
+        self.assertEqual(info.frames, 9)
+        self.assertIn('is damaged: truncated', check_mp3(path, scan=True)[1])
+
+    def test_stream_shorter_than_its_info_header_is_truncated(self):
+        stream = info_frame(frames=20, total=21 * 417) + b''.join(frame() for _ in range(10))
+        quick = parse_mp3(self.write(stream), scan=False)
+        self.assertEqual(quick.vbr_header, 'Info')
+        self.assertTrue(quick.truncated)
+        scanned = parse_mp3(self.write(stream), scan=True)
+        self.assertEqual(scanned.frames, 10)
+        self.assertTrue(scanned.truncated)
+
+    def test_files_that_are_not_mp3(self):
+        for name, content in (('noise.mp3', bytes(range(256)) * 64), ('text.mp3', b'hello ' * 1000),
+                              ('lone-sync.mp3', b'\xff\xfb' + bytes(10))):
+            with self.assertRaisesRegex(Mp3Error, 'is not an MP3 file'):
+                parse_mp3(self.write(content, name))
+        with self.assertRaisesRegex(Mp3Error, 'is empty'):
+            parse_mp3(self.write(b'', 'empty.mp3'))
+
+    def test_check_mp3_leaves_other_formats_alone(self):
+        wav = self.write(b'RIFF\x00\x00\x00\x00WAVEfmt ' + bytes(4096), 'master.wav')
+        self.assertEqual(check_mp3(wav), (None, None))
+        _, problem = check_mp3(self.write(bytes(range(256)) * 64))
+        self.assertIn('is not an MP3 file', problem)
+
+    def test_junk_between_frames_is_reported(self):
+        stream = frame() * 10 + bytes(100 * 1024) + frame() * 10
+        info = parse_mp3(self.write(stream))
+        self.assertEqual(info.frames, 20)
+        self.assertEqual(info.junk_bytes, 100 * 1024)
+        self.assertIn('are not MPEG audio', info.problems[0])
+
+    def test_tags_fill_in_episode_fields(self):
+        tag = id3_tag((b'TIT2', b'\x03Episode title'), (b'TRCK', b'\x007/12'), (b'TPOS', b'\x002'),
+                      (b'COMM', b'\x01eng\xff\xfe\0\0\xff\xfe' + 'Long recording'.encode('utf-16-le')))
+        path = self.write(tag + frame() * 5)
+        tags = read_tags(path)
+        self.assertEqual(parse_mp3(path).tags, tags)
+        self.assertEqual(episode_fields_from_tags(tags), {'title': 'Episode title', 'number': '7', 'season': '2',
+                                                          'description': 'Long recording'})
+
+    def test_id3v1_tag_at_the_end_is_not_audio(self):
+        v1 = b'TAG' + b'Old title'.ljust(30, b'\0') + bytes(30 * 2 + 4 + 28) + b'\0\x03' + b'\x0c'
+        info = parse_mp3(self.write(frame() * 5 + v1))
+        self.assertEqual((info.frames, info.junk_bytes, info.problems), (5, 0, []))
+        self.assertEqual((info.tags['title'], info.tags['track']), ('Old title', '3'))
+
+    def test_tags_without_usable_numbers_are_skipped(self):
+        self.assertEqual(episode_fields_from_tags({'track': '0', 'disc': 'A', 'subtitle': 'Sub'}),
+                         {'description': 'Sub'})
+
+
+if __name__ == '__main__':
+    unittest.main()
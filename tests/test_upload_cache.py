@@ -0,0 +1,97 @@
+"""UploadCache hashing, invalidation and eviction"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from podcast_loader import upload_cache
+from podcast_loader.upload_cache import UploadCache
+
+
+class UploadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.path = os.path.join(self.dir, 'cache', 'uploads.json')
+        self.audio = self.write('a.mp3', b'first')
+
+    def write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def cache(self, **kwargs):
+        return UploadCache(self.path, **kwargs)
+
+    def hashes(self, call, *args):
+        with mock.patch.object(upload_cache, 'hash_file', wraps=upload_cache.hash_file) as hash_file:
+            return call(*args), hash_file.call_count
+
+    def test_stored_upload_is_found_again_by_a_new_process(self):
+        self.cache().store('show', self.audio, 'e1')
+        cache = self.cache()
+        self.assertEqual(cache.lookup('show', self.audio), 'e1')
+        self.assertIsNone(cache.lookup('other-show', self.audio))
+
+    def test_copy_with_the_same_content_matches(self):
+        self.cache().store('show', self.audio, 'e1')
+        self.assertEqual(self.cache().lookup('show', self.write('copy.mp3', b'first')), 'e1')
+
+    def test_unchanged_file_is_not_read_again(self):
+        self.cache().store('show', self.audio, 'e1')
+        episode_id, hashed = self.hashes(self.cache().lookup, 'show', self.audio)
+        self.assertEqual((episode_id, hashed), ('e1', 0))
+
+    def test_file_with_a_new_mtime_is_hashed_again(self):
+        self.cache().store('show', self.audio, 'e1')
+        stat = os.stat(self.audio)
+        os.utime(self.audio, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        episode_id, hashed = self.hashes(self.cache().lookup, 'show', self.audio)
+        self.assertEqual((episode_id, hashed), ('e1', 1))
+
+    def test_edited_file_is_not_matched(self):
+        self.cache().store('show', self.audio, 'e1')
+        stat = os.stat(self.audio)
+        self.write('a.mp3', b'other')
+        # Same size and mtime would hide the edit, so move the mtime as an editor would
+        os.utime(self.audio, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(self.cache().lookup('show', self.audio))
+
+    def test_only_the_most_recent_uploads_are_kept(self):
+        cache = self.cache(max_entries=2)
+        files = [self.write(f'{n}.mp3', str(n).encode()) for n in range(3)]
+        with mock.patch.object(upload_cache.time, 'time') as clock:
+            for n, path in enumerate(files):
+                clock.return_value = 100 * (n + 1)
+                cache.store('show', path, f'e{n}')
+            cache = self.cache(max_entries=2)
+            # The evicted upload's file hash is dropped with it
+            self.assertNotIn(os.path.abspath(files[0]), cache._files)
+            self.assertEqual([cache.lookup('show', path) for path in files], [None, 'e1', 'e2'])
+
+    def test_old_uploads_expire(self):
+        cache = self.cache(max_age_days=1)
+        with mock.patch.object(upload_cache.time, 'time', return_value=1000):
+            cache.store('show', self.audio, 'e1')
+        with mock.patch.object(upload_cache.time, 'time', return_value=1000 + 2 * 24 * 3600):
+            self.assertIsNone(cache.lookup('show', self.audio))
+
+    def test_refresh_ignores_entries_but_still_records(self):
+        self.cache().store('show', self.audio, 'e1')
+        cache = self.cache(refresh=True)
+        self.assertIsNone(cache.lookup('show', self.audio))
+        cache.store('show', self.audio, 'e2')
+        self.assertEqual(self.cache().lookup('show', self.audio), 'e2')
+
+    def test_unreadable_cache_starts_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{"uploads": ')
+        self.assertIsNone(self.cache().lookup('show', self.audio))
+
+
+if __name__ == '__main__':
+    unittest.main()
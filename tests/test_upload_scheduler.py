@@ -0,0 +1,50 @@
+"""Upload ordering of manifest rows"""
+import os
+import tempfile
+import unittest
+
+from podcast_loader.upload_scheduler import order_episodes
+
+
+class OrderEpisodesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def audio_file(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(bytes(size))
+        return path
+
+    def titles(self, episodes, order):
+        return [episode['title'] for _, episode in order_episodes(enumerate(episodes), order)]
+
+    def test_size_puts_small_files_first_and_rows_without_a_file_as_empty(self):
+        episodes = [{'title': 'big', 'audio_file': self.audio_file('big.mp3', 300)},
+                    {'title': 'no file', 'episode_id': 'abc'},
+                    {'title': 'small', 'audio_file': self.audio_file('small.mp3', 10)},
+                    {'title': 'missing', 'audio_file': os.path.join(self.tmp.name, 'missing.mp3')}]
+        self.assertEqual(self.titles(episodes, 'size'), ['no file', 'missing', 'small', 'big'])
+
+    def test_priority_then_size(self):
+        episodes = [{'title': 'low', 'priority': 0, 'audio_file': self.audio_file('a.mp3', 1)},
+                    {'title': 'high big', 'priority': 5, 'audio_file': self.audio_file('b.mp3', 100)},
+                    {'title': 'high small', 'priority': 5}]
+        self.assertEqual(self.titles(episodes, 'priority'), ['high small', 'high big', 'low'])
+
+    def test_fair_takes_one_episode_per_podcast_in_turn(self):
+        episodes = [{'title': f'{podcast}{n}', 'podcast_id': podcast} for podcast, n in
+                    (('a', 1), ('a', 2), ('a', 3), ('b', 1), ('b', 2))]
+        self.assertEqual(self.titles(episodes, 'fair'), ['a1', 'b1', 'a2', 'b2', 'a3'])
+
+    def test_input_order_and_unknown_order(self):
+        episodes = [{'title': 'x'}, {'title': 'y'}]
+        self.assertEqual(self.titles(episodes, 'input'), ['x', 'y'])
+        with self.assertRaises(ValueError):
+            order_episodes(enumerate(episodes), 'random')
+
+
+if __name__ == '__main__':
+    unittest.main()